@@ -1,11 +1,33 @@
 from b2sdk.v2 import InMemoryAccountInfo, B2Api
 import os
 import json
+import threading
 from loguru import logger
+from tracing import span
 import httpx
 
 logger.add("logs/cloud_manager.log", rotation="1 MB")
 
+_bucket = None
+_bucket_lock = threading.Lock()
+
+
+def get_bucket():
+    """
+    B2 bucket authorized once per process and shared by every upload
+    (`--mode both` uploads audio, scripts, charts and RSS of two shows).
+    Failures are not cached: the caller falls back to local paths and the next call retries.
+    """
+    global _bucket
+    with _bucket_lock:
+        if _bucket is None:
+            info = InMemoryAccountInfo()
+            b2_api = B2Api(info)
+            b2_api.authorize_account("production", os.getenv("B2_KEY_ID"), os.getenv("B2_APPLICATION_KEY"))
+            _bucket = b2_api.get_bucket_by_name(os.getenv("B2_BUCKET_NAME"))
+        return _bucket
+
+
 def upload_episode(date, mode, files):
     """
     上傳 podcast 音頻和腳本至 B2。
@@ -14,10 +36,7 @@ def upload_episode(date, mode, files):
        - Podcast 仍可在本地播放，但 RSS 無法提供有效的 CDN URL
     """
     try:
-        info = InMemoryAccountInfo()
-        b2_api = B2Api(info)
-        b2_api.authorize_account("production", os.getenv("B2_KEY_ID"), os.getenv("B2_APPLICATION_KEY"))
-        bucket = b2_api.get_bucket_by_name(os.getenv("B2_BUCKET_NAME"))
+        bucket = get_bucket()
     except Exception as e:
         logger.error(f"B2 初始化失敗: {e} → 降級到本地路徑")
         uploaded = {}
@@ -31,7 +50,8 @@ def upload_episode(date, mode, files):
     for file_type, file_path in files.items():
         file_name = os.path.basename(file_path)
         try:
-            bucket.upload_local_file(local_file=file_path, file_name=file_name)
+            with span("b2.upload", cat="upload", file=file_name, bytes=os.path.getsize(file_path)):
+                bucket.upload_local_file(local_file=file_path, file_name=file_name)
             uploaded[file_type] = f"https://f005.backblazeb2.com/file/{os.getenv('B2_BUCKET_NAME')}/{file_name}"
             logger.info(f"✅ B2 上傳: {file_type} → {file_name}")
         except Exception as e:
@@ -48,12 +68,10 @@ def upload_rss(rss_path):
     如果認證失敗，回傳 local:// URI 以避免崩潰。
     """
     try:
-        info = InMemoryAccountInfo()
-        b2_api = B2Api(info)
-        b2_api.authorize_account("production", os.getenv("B2_KEY_ID"), os.getenv("B2_APPLICATION_KEY"))
-        bucket = b2_api.get_bucket_by_name(os.getenv("B2_BUCKET_NAME"))
+        bucket = get_bucket()
         b2_file_name = "podcast.xml"
-        bucket.upload_local_file(local_file=rss_path, file_name=b2_file_name)
+        with span("b2.upload", cat="upload", file=b2_file_name):
+            bucket.upload_local_file(local_file=rss_path, file_name=b2_file_name)
         rss_url = f"https://f005.backblazeb2.com/file/{os.getenv('B2_BUCKET_NAME')}/{b2_file_name}"
         logger.info(f"✅ B2 RSS 上傳: {rss_url}")
         return rss_url
@@ -71,16 +89,31 @@ def upload_chart(local_file_path):
     圖表 URL 主要用於 Slack 通知中的可點擊連結。
     """
     try:
-        info = InMemoryAccountInfo()
-        b2_api = B2Api(info)
-        b2_api.authorize_account("production", os.getenv("B2_KEY_ID"), os.getenv("B2_APPLICATION_KEY"))
-        bucket = b2_api.get_bucket_by_name(os.getenv("B2_BUCKET_NAME"))
+        bucket = get_bucket()
         file_name = os.path.basename(local_file_path)
         b2_file_name = f"charts/{file_name}"
-        bucket.upload_local_file(local_file=local_file_path, file_name=b2_file_name)
+        with span("b2.upload", cat="upload", file=b2_file_name):
+            bucket.upload_local_file(local_file=local_file_path, file_name=b2_file_name)
         chart_url = f"https://f005.backblazeb2.com/file/{os.getenv('B2_BUCKET_NAME')}/{b2_file_name}"
         logger.info(f"✅ B2 圖表上傳: {chart_url}")
         return chart_url
     except Exception as e:
         logger.error(f"⚠️ B2 圖表上傳失敗 ({e.__class__.__name__}): {e}")
         return None  # 不阻斷策略流程
+
+def upload_charts(local_file_paths, max_workers=4):
+    """
+    批次上傳多張圖表：授權一次，再以執行緒並行上傳。
+    回傳 {local_file_path: chart_url or None}；授權失敗時全部為 None (不逐張重試)。
+    """
+    if not local_file_paths:
+        return {}
+    try:
+        get_bucket()
+    except Exception as e:
+        logger.error(f"⚠️ B2 圖表批次上傳授權失敗 ({e.__class__.__name__}): {e}")
+        return {path: None for path in local_file_paths}
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(local_file_paths)), thread_name_prefix="b2-chart") as pool:
+        urls = list(pool.map(upload_chart, local_file_paths))
+    return dict(zip(local_file_paths, urls))
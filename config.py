@@ -1,4 +1,7 @@
 # config.py
+import json
+from functools import lru_cache
+
 US_TICKERS = ['^IXIC', '^GSPC', 'QQQ', 'SPY', 'BTC-USD', 'GC=F']
 TW_TICKERS = ['^TWII', '0050.TW', '2330.TW']
 
@@ -20,10 +23,24 @@ TW_MARKET_NAMES = {
 DATA_DIR = 'data'
 DOCS_DIR = 'docs/podcast'
 
-def get_market_data_path(symbol: str, timeframe: str = 'daily') -> str:
+def get_market_data_path(symbol: str, timeframe: str = 'daily', ext: str = 'csv', market_dir: str = None) -> str:
     """
-    Generates the standardized path for market data CSV files.
+    Generates the standardized path for market data files.
     Example: get_market_data_path('0050.TW', 'daily') -> 'data/market/daily_0050_TW.csv'
+             get_market_data_path('0050.TW', 'daily', ext='parquet') -> 'data/market/daily_0050_TW.parquet'
     """
     sanitized_symbol = symbol.replace('^', '').replace('.', '_')
-    return f"{DATA_DIR}/market/{timeframe}_{sanitized_symbol}.csv"
\ No newline at end of file
+    return f"{market_dir or DATA_DIR + '/market'}/{timeframe}_{sanitized_symbol}.{ext}"
+
+
+CONFIG_PATH = 'config.json'
+
+
+@lru_cache(maxsize=None)
+def load_config(path: str = CONFIG_PATH) -> dict:
+    """
+    config.json parsed once per process and shared by every module (treat it as read-only).
+    Example: config = load_config(); config['data_paths']['market'] -> 'data/market'
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
@@ -9,8 +9,9 @@ content_creator.py - 投資Podcast腳本自動生成器 (v4 - 主動式質量提
   ✅ Hook開場鉤子 + 立場鮮明 + André Kostolany金句收尾
 """
 
-import os, json, re, datetime
+import os, json, re, datetime, threading
 from pathlib import Path
+from config import load_config
 
 # ── 日誌：loguru 不可用時降級為 print ────────────────────────────
 try:
@@ -33,6 +34,8 @@ _HIST    = PROMPT_DIR / "history.json"
 _SCORES  = PROMPT_DIR / "scores.json"
 _FB_LOG  = PROMPT_DIR / "fb_log.json"
 _F_CACHE = PROMPT_DIR / "fail_cache.json"
+# `--mode both` 兩個 mode 執行緒共用 prompt_versions/*.json：讀-改-寫一律在此鎖內，寫檔一律原子替換
+_STATE_LOCK = threading.RLock()
 
 # ── 強化版系統提示詞 (基於5天腳本質檢改進) ──────────────────────
 _D_TW = """你是一位專業的台灣財經Podcast主持人，風格親切專業，深受上班族和散戶投資者喜愛，你的名字是「幫幫忙」。
@@ -130,8 +133,7 @@ _D_US = """你是一位專業的台灣財經Podcast主持人，風格親切專
 """
 
 # ── 載入 Config ───────────────────────────────────────────────────
-with open('config.json', 'r', encoding='utf-8') as f:
-    config = json.load(f)
+config = load_config()
 
 # ── 股名對照表 ────────────────────────────────────────────────────
 STOCK_NAMES = {
@@ -153,25 +155,32 @@ def _lcfg():
         return json.loads(open(_CONFIG).read())
     return {"v":1,"bv":1,"bs":0,"sys_tw":_D_TW,"sys_us":_D_US,"ena":True,"use_best":True,"target":8.0}
 
+def _wjson(path, data):
+    tmp = Path(f"{path}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
 def _scfg(c):
-    open(_CONFIG,"w",encoding="utf-8").write(json.dumps(c,ensure_ascii=False,indent=2))
+    _wjson(_CONFIG, c)
 
 def _sver(vn,stw,sus,sc,note=""):
     p=PROMPT_DIR/("v%d.json"%vn)
-    open(p,"w",encoding="utf-8").write(json.dumps({
-        "v":vn,"date":datetime.date.today().isoformat(),
-        "stw":stw[:400],"sus":sus[:400],"score":sc,"note":note
-    },ensure_ascii=False,indent=2))
-    h=[]
-    if _HIST.exists(): h=json.loads(open(_HIST).read())
-    h.append({"v":vn,"date":datetime.date.today().isoformat(),"score":sc,"note":note})
-    open(_HIST,"w",encoding="utf-8").write(json.dumps(h[-30:],ensure_ascii=False,indent=2))
+    with _STATE_LOCK:
+        _wjson(p, {
+            "v":vn,"date":datetime.date.today().isoformat(),
+            "stw":stw[:400],"sus":sus[:400],"score":sc,"note":note
+        })
+        h=[]
+        if _HIST.exists(): h=json.loads(open(_HIST).read())
+        h.append({"v":vn,"date":datetime.date.today().isoformat(),"score":sc,"note":note})
+        _wjson(_HIST, h[-30:])
 
 def _lfl(mode,reason,prev):
-    lx=[]
-    if _FB_LOG.exists(): lx=json.loads(open(_FB_LOG).read())
-    lx.append({"dt":datetime.datetime.now().isoformat(),"mode":mode,"reason":reason,"prev":prev[:200]})
-    open(_FB_LOG,"w",encoding="utf-8").write(json.dumps(lx[-100:],ensure_ascii=False,indent=2))
+    with _STATE_LOCK:
+        lx=[]
+        if _FB_LOG.exists(): lx=json.loads(open(_FB_LOG).read())
+        lx.append({"dt":datetime.datetime.now().isoformat(),"mode":mode,"reason":reason,"prev":prev[:200]})
+        _wjson(_FB_LOG, lx[-100:])
 
 def _get_sys(mode):
     cfg=_lcfg()
@@ -303,10 +312,6 @@ def post_gen_eval(mode, script):
     cfg = _lcfg()
     q = validate_quality(script, mode)
     qs = q.get("score", 7.0)
-    scs = []
-    if _SCORES.exists():
-        scs = json.loads(open(_SCORES).read())
-
     entry = {
         "date": datetime.date.today().isoformat(),
         "mode": mode,
@@ -315,8 +320,12 @@ def post_gen_eval(mode, script):
         "issues": q.get("issues", []),
         "warnings": q.get("warnings", []),
     }
-    scs.append(entry)
-    open(_SCORES, "w", encoding="utf-8").write(json.dumps(scs[-50:], ensure_ascii=False, indent=2))
+    with _STATE_LOCK:
+        scs = []
+        if _SCORES.exists():
+            scs = json.loads(open(_SCORES).read())
+        scs.append(entry)
+        _wjson(_SCORES, scs[-50:])
     logger.info(f"  腳本質檢 score={qs:.1f} | 問題={q.get('issues',[])} | 警示={q.get('warnings',[])}")
 
     target = cfg.get("target", 8.0)
@@ -469,19 +478,20 @@ def _do_proactive_iter(mode, script, diag, cfg):
                 m = re.search(r'"improved"\s*:\s*"(.*?)"(?:,|\n|\s*\})', r, re.DOTALL)
             if m:
                 imp = m.group(1).replace('\\"', '"').replace('\\n', '\n').replace('\\r', '')
-                nv = cfg.get("v", 1) + 1
                 k = "sys_tw" if mode == "tw" else "sys_us"
-                old_prompt = cfg.get(k, "")
-                cfg[k] = imp
-                cfg["v"] = nv
-                _scfg(cfg)
-                _sver(nv, cfg.get("sys_tw", ""), cfg.get("sys_us", ""),
-                      diag.get("score", 0), f"[主動改進]{diag.get('issues', [])[:2]}")
-                logger.success(f"  ✅ Prompt v{nv} 已更新 | 改動: {r[:100]}")
-                if diag.get("score", 0) > cfg.get("bs", 0):
-                    cfg["bv"] = nv
-                    cfg["bs"] = diag.get("score", 0)
+                with _STATE_LOCK:
+                    # LLM 呼叫期間另一個 mode 可能已更新版本：在鎖內重新讀取後再遞增
+                    cfg = _lcfg()
+                    nv = cfg.get("v", 1) + 1
+                    cfg[k] = imp
+                    cfg["v"] = nv
+                    _sver(nv, cfg.get("sys_tw", ""), cfg.get("sys_us", ""),
+                          diag.get("score", 0), f"[主動改進]{diag.get('issues', [])[:2]}")
+                    if diag.get("score", 0) > cfg.get("bs", 0):
+                        cfg["bv"] = nv
+                        cfg["bs"] = diag.get("score", 0)
                     _scfg(cfg)
+                logger.success(f"  ✅ Prompt v{nv} 已更新 | 改動: {r[:100]}")
                 return
 
             # fallback: 嘗試解析變動描述
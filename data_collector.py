@@ -1,51 +1,107 @@
 import yfinance as yf
-import requests
-from bs4 import BeautifulSoup
 import os
 import re
 import json
 import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from loguru import logger
 from retry import retry
-from transformers import pipeline
 import pandas as pd
+import numpy as np
 import httpx
-from config import get_market_data_path
+from config import get_market_data_path, load_config
+from market_store import save_market_data
+from price_panel import update_panel
+from market_bundle import MarketBundle
+from news_fetcher import fetch_all_news
+from symbol_matcher import get_matcher
+from sentiment_cache import SentimentCache
+from sentiment_history import record_day
+from sentiment_lexicon import get_scorer
+from tracing import span
 
 # Load config.json
-with open("config.json", "r", encoding="utf-8") as f:
-    config = json.load(f)
+config = load_config()
 
 # Setup logging
 logger.add("logs/data_collector.log", rotation="1 MB")
 
 SYMBOLS = config["symbols"]
 NEWS_SOURCES = config["news_sources"]
+COLLECTION = config.get("collection", {})
+MARKET_SYNC = config.get("market_sync", {})
+
+# yfinance 所有請求都打到同一個 Yahoo 主機，以 semaphore 限制同主機併發數
+YAHOO_HOST = "query1.finance.yahoo.com"
+_host_semaphores = {}
+_host_lock = threading.Lock()
+
+
+@contextmanager
+def _host_slot(host):
+    """Limit concurrent requests per host (collection.per_host_limit)."""
+    with _host_lock:
+        semaphore = _host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(COLLECTION.get("per_host_limit", 4))
+            _host_semaphores[host] = semaphore
+    with semaphore:
+        yield
 
 # ─────────────────────────────────────────────
 # FinBERT Multi-Layer Fallback System
 # ─────────────────────────────────────────────
 _sentiment_analyzer = None   # lazy-loaded
-_finbert_layer = 0            # 0=unloaded, 1=ProsusAI, 2=yiyanghkust, 3=gemini/keyword
+_finbert_layer = 0            # 0=unloaded, 1=ProsusAI, 2=yiyanghkust, 3=gemini/keyword, 4=ProsusAI ONNX
+_sentiment_model_id = None    # cache key prefix, e.g. "ProsusAI/finbert" or "keyword"
+_sentiment_lock = threading.Lock()  # `--mode both`: the two collect threads share one model load
+SENTIMENT = config.get("sentiment", {})
 
 def get_sentiment_analyzer():
     """
     Attempt to load FinBERT models in order; fallback to None (keyword-based).
-    Layer 1: ProsusAI/finbert  --- most common
+    The number is the layer id returned (and stored as sentiment "layer"), listed in the order tried:
+    Layer 4: ProsusAI/finbert on ONNX Runtime (opt-in: sentiment.backend == "onnx" after
+             `python finbert_onnx.py --export`, or onnx_auto_export = true)
+    Layer 1: ProsusAI/finbert via transformers.pipeline  --- default
     Layer 2: yiyanghkust/finbert-pretrain
-    Layer 3: Gemini API (optional)
-    Layer 4: keyword (always available)
+    Layer 3: Gemini API (optional) / keyword (always available)
     """
-    global _sentiment_analyzer, _finbert_layer
-    if _sentiment_analyzer is not None:
+    if _finbert_layer != 0:
         return _sentiment_analyzer, _finbert_layer
+    with _sentiment_lock:
+        return _load_sentiment_analyzer()
+
+
+def _load_sentiment_analyzer():
+    global _sentiment_analyzer, _finbert_layer, _sentiment_model_id
+    if _finbert_layer != 0:
+        return _sentiment_analyzer, _finbert_layer
+
+    # ONNX Runtime path: no torch import, int8 weights
+    if SENTIMENT.get("backend") == "onnx":
+        try:
+            import finbert_onnx
+            started = time.perf_counter()
+            _sentiment_analyzer = finbert_onnx.load_analyzer()
+            _sentiment_model_id = f"{finbert_onnx.MODEL_NAME}:onnx" + ("-int8" if SENTIMENT.get("onnx_quantize", True) else "")
+            _finbert_layer = 4
+            logger.info(f"FinBERT ONNX loaded: {_sentiment_model_id} ({time.perf_counter() - started:.2f}s)")
+            return _sentiment_analyzer, _finbert_layer
+        except Exception as e:
+            logger.warning(f"FinBERT Layer 4 (ONNX) failed: {e}")
 
     # Try HuggingFace FinBERT models
     for layer_id, model_name in enumerate(
         ["ProsusAI/finbert", "yiyanghkust/finbert-pretrain"], start=1
     ):
         try:
+            from transformers import pipeline
             _sentiment_analyzer = pipeline("sentiment-analysis", model=model_name, device=-1)
+            _sentiment_model_id = model_name
             _finbert_layer = layer_id
             logger.info(f"FinBERT loaded: {model_name}")
             return _sentiment_analyzer, _finbert_layer
@@ -53,41 +109,72 @@ def get_sentiment_analyzer():
             logger.warning(f"FinBERT Layer {layer_id} ({model_name}) failed: {e}")
 
     logger.warning("HuggingFace FinBERT unavailable; using keyword fallback")
-    _finbert_layer = 3  # Gemini / keyword fallback
+    _sentiment_model_id = "keyword"
     _sentiment_analyzer = None
+    _finbert_layer = 3  # Gemini / keyword fallback (set last: readers outside the lock check it first)
     return None, _finbert_layer
 
 
-def keyword_sentiment(text):
-    """Keyword-based sentiment — always available, no external dependencies."""
-    bullish = ["牛市","多頭","買進","Buy","看好","漲","利多","成長","突破","創新高","盈利","反彈","超賣"]
-    bearish = ["熊市","空頭","賣出","Sell","看淡","跌","利空","衰退","跌破","新低","虧損","崩盤","超買"]
-    b = sum(1 for kw in bullish if kw in text)
-    r = sum(1 for kw in bearish if kw in text)
-    if b > r:
-        return {"label": "positive", "score": min(0.9, 0.55 + b * 0.05)}
-    elif r > b:
-        return {"label": "negative", "score": min(0.9, 0.55 + r * 0.05)}
-    return {"label": "neutral", "score": 0.5}
+def keyword_sentiment(text, market=None):
+    """Keyword-based sentiment — always available; weighted lexicon in data/lexicon/sentiment.json."""
+    return get_scorer(market).score([text])[0]
+
+
+def sentiment_score(results):
+    """Signed mean of {label, score} results (positive → +score, otherwise −score); 0.0 when empty."""
+    if not results:
+        return 0.0
+    return sum(s["score"] if s["label"] == "positive" else -s["score"] for s in results) / len(results)
+
+
+def get_sentiment_model_id(market=None):
+    """Identifier of the loaded sentiment layer, used to key the headline cache."""
+    get_sentiment_analyzer()
+    if _sentiment_model_id == "keyword":
+        scorer = get_scorer(market)
+        return f"keyword:{market or 'all'}:{scorer.digest}"
+    return _sentiment_model_id
 
 
-def analyze_sentiments(texts, analyzer):
+def analyze_sentiments(texts, analyzer, batch_size=None, market=None):
     """
     Unified sentiment analysis.
-    - analyzer is not None → Use FinBERT (HuggingFace transformers)
-    - analyzer is None → Use keyword fallback
+    - analyzer is not None → Use FinBERT (HuggingFace transformers), in explicit truncated batches
+    - analyzer is None → Use the lexicon fallback (one vectorized pass, market = tw/us vocabulary)
     """
     if not texts:
         return []
     if analyzer is not None:
-        return analyzer(texts)
+        batch_size = batch_size or SENTIMENT.get("batch_size", 16)
+        results = []
+        for i in range(0, len(texts), batch_size):
+            batch = texts[i:i + batch_size]
+            with span("sentiment.batch", cat="sentiment", size=len(batch)):
+                results.extend(analyzer(batch, batch_size=batch_size, truncation=True, max_length=SENTIMENT.get("max_length", 128)))
+        return results
     # Keyword fallback
-    return [keyword_sentiment(t) for t in texts]
+    with span("sentiment.lexicon", cat="sentiment", size=len(texts), market=market):
+        return get_scorer(market).score(texts)
 
 
 # ─────────────────────────────────────────────
 # DataQualityChecker
 # ─────────────────────────────────────────────
+HISTORY_FIELDS = ["open", "high", "low", "close", "volume"]
+HISTORY_CHECKS = ["gaps", "duplicates", "non_positive", "placeholder", "stale", "outliers", "lagging"]
+
+
+def _history_arrays(df):
+    """(datetime64[s] naive-UTC dates, float64 (n, 5) HISTORY_FIELDS) without per-row or reindex overhead."""
+    # tz-aware Series.values is already naive UTC datetime64; CSV string dates are parsed by NumPy
+    dates = np.asarray(df["date"].values, dtype="datetime64[s]")
+    values = np.column_stack([
+        df[field].values.astype(np.float64, copy=False) if field in df.columns else np.full(len(df), np.nan)
+        for field in HISTORY_FIELDS
+    ])
+    return dates, values
+
+
 class DataQualityChecker:
     def __init__(self):
         self.quality_thresholds = config["quality_thresholds"]
@@ -98,75 +185,320 @@ class DataQualityChecker:
         return present / total if total > 0 else 0
 
     def check_freshness(self, data_timestamp):
+        """
+        Age of the latest bar in business days (weekends don't make data stale).
+        A bar is labelled with its session date, so one extra session is allowed
+        before the next bar is due.
+        """
         now = datetime.datetime.now(datetime.timezone.utc)
-        age_hours = (now - data_timestamp).total_seconds() / 3600
-        return age_hours <= self.quality_thresholds["freshness_hours"]
+        ts = pd.Timestamp(data_timestamp)
+        bar_day = np.datetime64((ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")).date())
+        age_days = np.busday_count(bar_day, np.datetime64(now.date()))
+        return bool(age_days <= self.quality_thresholds["freshness_hours"] / 24 + 1)
 
     def check_volatility(self, data, symbol):
         change = abs(data.get(symbol, {}).get("change", 0))
         return change <= self.quality_thresholds["volatility_threshold"] * 100
 
-    def validate(self, data, symbols):
+    def trading_calendar(self, day_arrays):
+        """Days on which at least one symbol of the batch traded; market holidays drop out."""
+        if not day_arrays:
+            return np.array([], dtype="datetime64[D]")
+        return np.unique(np.concatenate(day_arrays))
+
+    def check_history(self, dates, values, calendar=None):
+        """
+        One vectorized pass over a symbol's full history.
+        dates: datetime64[s] (n,), values: float (n, 5) in HISTORY_FIELDS order.
+        Returns {check: count of offending bars} for HISTORY_CHECKS plus "rows".
+        """
+        n = len(dates)
+        issues = dict.fromkeys(HISTORY_CHECKS, 0)
+        issues["rows"] = n
+        if n == 0:
+            return issues
+        order = np.argsort(dates, kind="stable")
+        dates, values = dates[order], values[order]
+        prices, volume = values[:, :4], values[:, 4]
+
+        issues["duplicates"] = int(np.count_nonzero(dates[1:] == dates[:-1]))
+        placeholder = np.all(prices == 0, axis=1) & (volume == 0)
+        issues["placeholder"] = int(placeholder.sum())
+        issues["non_positive"] = int(np.count_nonzero(np.any(prices <= 0, axis=1) & ~placeholder))
+
+        valid = ~placeholder & np.all(prices > 0, axis=1)
+        bars = values[valid]
+        # 與前一根完全相同的 OHLCV (資料源卡住時會重複回傳同一根)
+        issues["stale"] = int(np.count_nonzero(np.all(bars[1:] == bars[:-1], axis=1)))
+        closes = bars[:, 3]
+        if len(closes) > 2:
+            returns = np.diff(np.log(closes))
+            median = np.median(returns)
+            mad = np.median(np.abs(returns - median)) * 1.4826
+            if mad > 0:
+                z = np.abs(returns - median) / mad
+                issues["outliers"] = int(np.count_nonzero(z > self.quality_thresholds.get("outlier_z", 10)))
+
+        if calendar is not None and valid.any():
+            days = np.unique(dates[valid].astype("datetime64[D]"))
+            # 標的自己的交易星期 (美股一~五、加密貨幣七天；台股日期存成 UTC 會落在日~四)
+            weekday = (days.astype(np.int64) + 3) % 7
+            counts = np.bincount(weekday, minlength=7)
+            trades_on = counts >= 0.2 * counts.max()
+            first, last = days[0], days[-1]
+            window_days = calendar[np.searchsorted(calendar, first):np.searchsorted(calendar, last, side="right")]
+            expected = np.count_nonzero(trades_on[(window_days.astype(np.int64) + 3) % 7])
+            issues["gaps"] = max(0, int(expected - np.count_nonzero(trades_on[weekday])))
+            later = calendar[np.searchsorted(calendar, last, side="right"):]
+            issues["lagging"] = int(np.count_nonzero(trades_on[(later.astype(np.int64) + 3) % 7]))
+        return issues
+
+    def score_history(self, issues):
+        """Share of checks passed; gap/stale/outlier checks tolerate a small ratio of bars."""
+        rows = max(issues["rows"], 1)
+        tolerance = self.quality_thresholds.get("history_issue_ratio", 0.02)
+        passed = [
+            issues["gaps"] / rows <= tolerance,
+            issues["duplicates"] == 0,
+            issues["non_positive"] == 0,
+            issues["placeholder"] == 0,
+            issues["stale"] / rows <= tolerance,
+            issues["outliers"] / rows <= tolerance,
+            issues["lagging"] == 0,
+        ]
+        return round(sum(passed) / len(passed), 4) if issues["rows"] else 0.0
+
+    def validate_history(self, frames):
+        """
+        frames: {symbol: {"daily": df, "hourly": df}}.
+        Gaps and lagging are measured on daily bars against the batch's trading calendar;
+        the other checks run on every timeframe. Returns {symbol: {"score", timeframe: issues}}.
+        """
+        arrays = {}
+        for symbol, by_tf in frames.items():
+            for timeframe, df in by_tf.items():
+                if df is None or df.empty:
+                    continue
+                arrays[symbol, timeframe] = _history_arrays(df)
+        calendar = self.trading_calendar([
+            d[(v[:, 3] > 0)].astype("datetime64[D]") for (s, tf), (d, v) in arrays.items() if tf == "daily"
+        ])
+        report = {}
+        for symbol, by_tf in frames.items():
+            entry = {}
+            for timeframe in by_tf:
+                if (symbol, timeframe) not in arrays:
+                    entry[timeframe] = {**dict.fromkeys(HISTORY_CHECKS, 0), "rows": 0}
+                    continue
+                dates, values = arrays[symbol, timeframe]
+                issues = self.check_history(dates, values, calendar if timeframe == "daily" else None)
+                entry[timeframe] = issues
+            scores = [self.score_history(issues) for issues in entry.values()]
+            entry["score"] = round(sum(scores) / len(scores), 4) if scores else 0.0
+            report[symbol] = entry
+        return report
+
+    def stale_symbols(self, data, symbols):
+        """Symbols whose latest bar is stale, or missing altogether (failed fetch / zero-close placeholder)."""
+        stale = []
+        for symbol in symbols:
+            latest = data.get(symbol, {})
+            if latest.get("timestamp") is None or not latest.get("close", 0) > 0 or not self.check_freshness(latest["timestamp"]):
+                stale.append(symbol)
+        return stale
+
+    def validate(self, data, symbols, symbol_reports=None):
+        # 每個標的各自檢查：以全體最新時間戳判斷時，一個新鮮的標的會掩蓋其他過期的標的
+        stale = self.stale_symbols(data, symbols)
+        if stale:
+            logger.warning(f"數據過期的標的: {stale}")
         checks = {
             "completeness": self.check_completeness(data, symbols),
-            "freshness": self.check_freshness(datetime.datetime.now(datetime.timezone.utc)),
+            "freshness": bool(symbols) and not stale,
             "volatility": all(self.check_volatility(data, symbol) for symbol in symbols),
         }
+        if symbol_reports:
+            checks["history"] = round(sum(r["score"] for r in symbol_reports.values()) / len(symbol_reports), 4)
         quality_score = sum(checks.values()) / len(checks)
         if quality_score < 0.8:
             logger.warning(f"數據品質不佳: {checks}, 分數: {quality_score}")
+        for symbol, report in (symbol_reports or {}).items():
+            if report["score"] < 1:
+                logger.warning(f"{symbol} 歷史數據品質 {report['score']}: { {tf: {k: v for k, v in r.items() if v and k != 'rows'} for tf, r in report.items() if tf != 'score'} }")
         return quality_score, checks
 
 
 # ─────────────────────────────────────────────
 # Data Fetching
 # ─────────────────────────────────────────────
+DATE_FORMATS = {"daily": "%Y-%m-%d", "hourly": "%Y-%m-%d %H:%M:%S"}
+PRICE_COLUMNS = ["open", "high", "low", "close", "change", "volume"]
+
+
+def _last_stored_timestamp(path):
+    """Return the UTC timestamp of the last valid stored bar, reading only the file tail."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            header = f.readline().decode("utf-8").strip().split(",")
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 4096))
+            lines = f.read().decode("utf-8", errors="ignore").strip().splitlines()
+        fields = lines[-1].split(",") if lines else []
+        if len(fields) != len(header) or fields[0] == "date":
+            return None
+        # 最後一筆是抓取失敗時寫入的 0 值佔位列 → 視同沒有歷史，改做完整下載
+        if float(fields[header.index("close")]) <= 0:
+            return None
+        ts = pd.Timestamp(fields[0])
+        return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+    except Exception as e:
+        logger.warning(f"讀取 {path} 最後時間戳失敗: {e} → 改做完整下載")
+        return None
+
+
+def _history_to_frame(hist, symbol, timeframe, placeholder=True):
+    """Convert a yfinance history frame into (latest bar dict, CSV-schema DataFrame)."""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    if hist.empty:
+        latest = {"open": 0, "high": 0, "low": 0, "close": 0, "change": 0, "volume": 0, "timestamp": now}
+        if not placeholder:
+            return latest, pd.DataFrame(columns=["date", "symbol"] + PRICE_COLUMNS)
+        return latest, pd.DataFrame([{"date": now.strftime(DATE_FORMATS[timeframe]), "symbol": symbol, "open": 0, "high": 0, "low": 0, "close": 0, "change": 0, "volume": 0}])
+    if hist.index.tz is None:
+        hist.index = hist.index.tz_localize("Asia/Taipei")
+    hist.index = hist.index.tz_convert("UTC")
+    latest = {"open": hist["Open"].iloc[-1], "high": hist["High"].iloc[-1], "low": hist["Low"].iloc[-1], "close": hist["Close"].iloc[-1], "change": hist["Close"].pct_change().iloc[-1] * 100 if len(hist) > 1 else 0, "volume": hist["Volume"].iloc[-1], "timestamp": hist.index[-1]}
+    df = pd.DataFrame({"date": hist.index.strftime(DATE_FORMATS[timeframe]), "symbol": symbol, "open": hist["Open"], "high": hist["High"], "low": hist["Low"], "close": hist["Close"], "change": hist["Close"].pct_change() * 100, "volume": hist["Volume"]}).dropna()
+    return latest, df
+
+
+def _fetch_history(ticker, symbol, timeframe, period, full_refresh):
+    """Fetch full `period` history, or only the bars after the stored tail plus an overlap window."""
+    interval = {"interval": "1h"} if timeframe == "hourly" else {}
+    last = None if full_refresh or not MARKET_SYNC.get("incremental", True) else _last_stored_timestamp(get_market_data_path(symbol, timeframe))
+    with _host_slot(YAHOO_HOST), span("yfinance.history", cat="fetch", symbol=symbol, timeframe=timeframe, incremental=last is not None):
+        if last is None:
+            hist = ticker.history(period=period, **interval)
+        else:
+            overlap = datetime.timedelta(hours=MARKET_SYNC.get("hourly_overlap_hours", 24)) if timeframe == "hourly" else datetime.timedelta(days=MARKET_SYNC.get("daily_overlap_days", 5))
+            hist = ticker.history(start=(last - overlap).strftime("%Y-%m-%d"), **interval)
+    if hist.empty:
+        logger.error(f"{symbol} {timeframe} data empty")
+    # 增量模式下抓不到新資料時保留既有歷史，不寫入佔位列
+    return _history_to_frame(hist, symbol, timeframe, placeholder=last is None)
+
+
 @retry(tries=3, delay=1, backoff=2)
-def fetch_market_data(symbol, period="1y"):
+def fetch_market_data(symbol, period="1y", full_refresh=False):
     ticker = yf.Ticker(symbol)
-    hist_daily = ticker.history(period=period)
-    if hist_daily.empty:
-        logger.error(f"{symbol} daily data empty")
-        daily_data = {"open": 0, "high": 0, "low": 0, "close": 0, "change": 0, "volume": 0, "timestamp": datetime.datetime.now(datetime.timezone.utc)}
-        daily_df = pd.DataFrame([{"date": datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d"), "symbol": symbol, "open": 0, "high": 0, "low": 0, "close": 0, "change": 0, "volume": 0}])
-    else:
-        if hist_daily.index.tz is None:
-            hist_daily.index = hist_daily.index.tz_localize("Asia/Taipei")
-        hist_daily.index = hist_daily.index.tz_convert("UTC")
-        daily_data = {"open": hist_daily["Open"].iloc[-1], "high": hist_daily["High"].iloc[-1], "low": hist_daily["Low"].iloc[-1], "close": hist_daily["Close"].iloc[-1], "change": hist_daily["Close"].pct_change().iloc[-1] * 100 if len(hist_daily) > 1 else 0, "volume": hist_daily["Volume"].iloc[-1], "timestamp": hist_daily.index[-1]}
-        daily_df = pd.DataFrame({"date": hist_daily.index.strftime("%Y-%m-%d"), "symbol": symbol, "open": hist_daily["Open"], "high": hist_daily["High"], "low": hist_daily["Low"], "close": hist_daily["Close"], "change": hist_daily["Close"].pct_change() * 100, "volume": hist_daily["Volume"]}).dropna()
-
-    hist_hourly = ticker.history(period="14d", interval="1h")
-    if hist_hourly.empty:
-        hourly_data = {"open": 0, "high": 0, "low": 0, "close": 0, "change": 0, "volume": 0, "timestamp": datetime.datetime.now(datetime.timezone.utc)}
-        hourly_df = pd.DataFrame([{"date": datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S"), "symbol": symbol, "open": 0, "high": 0, "low": 0, "close": 0, "change": 0, "volume": 0}])
+    daily_data, daily_df = _fetch_history(ticker, symbol, "daily", period, full_refresh)
+    hourly_data, hourly_df = _fetch_history(ticker, symbol, "hourly", "14d", full_refresh)
+    return daily_data, daily_df, hourly_data, hourly_df
+
+
+def sync_history(path, fresh_df, full_refresh=False):
+    """
+    Merge freshly fetched bars into the stored CSV history and persist it.
+    - Rows are deduplicated by date (fresh bars win, so overlap revisions are applied).
+    - When the stored rows are unchanged, only the new rows are appended;
+      the file is rewritten only if the overlap window carried revisions.
+    Returns the merged DataFrame.
+    """
+    if full_refresh or not os.path.exists(path):
+        fresh_df.to_csv(path, index=False)
+        return fresh_df
+    existing = pd.read_csv(path)
+    if fresh_df.empty:
+        return existing
+    stored = existing[existing["close"] > 0]
+    merged = pd.concat([stored, fresh_df], ignore_index=True)
+    merged = merged.drop_duplicates(subset="date", keep="last").sort_values("date").reset_index(drop=True)
+    change = merged["close"].pct_change() * 100
+    change.iloc[0] = merged["change"].iloc[0]
+    merged["change"] = change
+
+    n = len(existing)
+    unchanged = (
+        len(stored) == n
+        and len(merged) >= n
+        and merged["date"].iloc[:n].tolist() == existing["date"].tolist()
+        and np.allclose(merged[PRICE_COLUMNS].iloc[:n].to_numpy(dtype=float), existing[PRICE_COLUMNS].to_numpy(dtype=float), equal_nan=True)
+    )
+    if unchanged:
+        merged.iloc[n:].to_csv(path, mode="a", header=False, index=False)
+        logger.info(f"{path} 增量追加 {len(merged) - n} 筆")
     else:
-        if hist_hourly.index.tz is None:
-            hist_hourly.index = hist_hourly.index.tz_localize("Asia/Taipei")
-        hist_hourly.index = hist_hourly.index.tz_convert("UTC")
-        hourly_data = {"open": hist_hourly["Open"].iloc[-1], "high": hist_hourly["High"].iloc[-1], "low": hist_hourly["Low"].iloc[-1], "close": hist_hourly["Close"].iloc[-1], "change": hist_hourly["Close"].pct_change().iloc[-1] * 100 if len(hist_hourly) > 1 else 0, "volume": hist_hourly["Volume"].iloc[-1], "timestamp": hist_hourly.index[-1]}
-        hourly_df = pd.DataFrame({"date": hist_hourly.index.strftime("%Y-%m-%d %H:%M:%S"), "symbol": symbol, "open": hist_hourly["Open"], "high": hist_hourly["High"], "low": hist_hourly["Low"], "close": hist_hourly["Close"], "change": hist_hourly["Close"].pct_change() * 100, "volume": hist_hourly["Volume"]}).dropna()
+        merged.to_csv(path, index=False)
+        logger.info(f"{path} 重疊區間有修正，重寫 {len(merged)} 筆")
+    return merged
 
-    return daily_data, daily_df, hourly_data, hourly_df
 
+def _latest_from_frame(df, fallback):
+    """Build the latest-bar dict from a merged history frame."""
+    if df.empty or df["close"].iloc[-1] <= 0:
+        return fallback
+    row = df.iloc[-1]
+    ts = pd.Timestamp(row["date"])
+    return {"open": row["open"], "high": row["high"], "low": row["low"], "close": row["close"], "change": row["change"], "volume": row["volume"], "timestamp": ts.tz_localize("UTC") if ts.tzinfo is None else ts}
 
-@retry(tries=3, delay=1, backoff=2)
-def fetch_news(url):
+
+def fetch_news(url, limit=3):
+    """Fetch a single feed (see news_fetcher for the concurrent, cached implementation)."""
+    return fetch_all_news([url], limit=limit)[url]
+
+
+def _collect_symbol(symbol, full_refresh=False):
+    """Fetch one symbol and sync its CSVs; returns (symbol, daily_data, elapsed seconds, {timeframe: typed frame})."""
+    started = time.perf_counter()
+    frames = {}
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, "xml")
-        items = soup.find_all("item", limit=3)
-        return [{"title": item.title.text, "description": item.description.text} for item in items if item.title and item.description]
+        daily_data, daily_df, hourly_data, hourly_df = fetch_market_data(symbol, full_refresh=full_refresh)
+        daily_file = get_market_data_path(symbol, "daily")
+        daily_df = sync_history(daily_file, daily_df, full_refresh)
+        daily_data = _latest_from_frame(daily_df, daily_data)
+        frames["daily"] = save_market_data(symbol, "daily", daily_df, export_csv=False)
+        logger.info(f"每日數據儲存至: {daily_file}")
+        hourly_file = get_market_data_path(symbol, "hourly")
+        hourly_df = sync_history(hourly_file, hourly_df, full_refresh)
+        frames["hourly"] = save_market_data(symbol, "hourly", hourly_df, export_csv=False)
+        logger.info(f"每小時數據儲存至: {hourly_file}")
     except Exception as e:
-        logger.error(f"抓取新聞 {url} 失敗: {str(e)}")
-        return []
+        logger.error(f"抓取 {symbol} 市場數據失敗: {str(e)}")
+        daily_data = {"close": 0, "change": 0}
+    elapsed = time.perf_counter() - started
+    logger.info(f"{symbol} 抓取耗時 {elapsed:.2f}s")
+    return symbol, daily_data, elapsed, frames
+
+
+def refresh_streaming(symbols, bundle):
+    """Apply this run's new bars to the persisted streaming signal engines (config streaming)."""
+    settings = config.get("streaming", {})
+    if not settings.get("enabled", True):
+        return {}
+    targets = [symbol for symbol in settings.get("symbols", ["^TWII"]) if symbol in symbols]
+    if not targets:
+        return {}
+    timeframes = settings.get("timeframes", ["hourly"])
+    try:
+        from strategies.streaming import refresh
+        frames = {timeframe: bundle.timeframe_frames(timeframe) for timeframe in timeframes}
+        return refresh(targets, timeframes, frames=frames)
+    except Exception as e:
+        logger.error(f"串流訊號更新失敗: {e}")
+        return {}
 
 
 # ─────────────────────────────────────────────
 # Main: collect_data
 # ─────────────────────────────────────────────
-def collect_data(mode):
+def collect_data(mode, full_refresh=False):
+    """
+    Collect market data, news and sentiment for `mode`.
+    full_refresh=True re-downloads the full history instead of the incremental sync.
+    data["bundle"] is a MarketBundle with the typed daily/hourly frames of this run.
+    """
     data = {"market": {}, "news": [], "sentiment": {}}
     today = datetime.date.today().strftime("%Y-%m-%d")
     output_dir = f"data/news/{today}"
@@ -174,30 +506,34 @@ def collect_data(mode):
     os.makedirs(market_dir, exist_ok=True)
     os.makedirs(output_dir, exist_ok=True)
 
-    # Fetch market data
-    for symbol in SYMBOLS.get(mode, []):
+    # Fetch market data (bounded worker pool; one slow/failing ticker does not block the rest)
+    symbols = SYMBOLS.get(mode, [])
+    max_workers = max(1, min(COLLECTION.get("max_workers", 8), len(symbols) or 1))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="market") as executor:
+        results = list(executor.map(lambda symbol: _collect_symbol(symbol, full_refresh), symbols))
+    data["timings"] = {"market": {}}
+    bundle = MarketBundle(market_dir=market_dir)
+    for symbol, daily_data, elapsed, symbol_frames in results:
+        data["market"][symbol] = daily_data
+        for timeframe, df in symbol_frames.items():
+            bundle.add(symbol, timeframe, df, normalized=True)
+        data["timings"]["market"][symbol] = round(elapsed, 3)
+    data["bundle"] = bundle
+    logger.info(f"市場數據抓取完成: {len(symbols)} 個標的, {max_workers} workers, 耗時 {time.perf_counter() - started:.2f}s")
+    for timeframe in ("daily", "hourly"):
         try:
-            daily_data, daily_df, hourly_data, hourly_df = fetch_market_data(symbol)
-            data["market"][symbol] = daily_data
-            daily_file = get_market_data_path(symbol, "daily")
-            daily_df.to_csv(daily_file, index=False)
-            logger.info(f"每日數據儲存至: {daily_file}")
-            hourly_file = get_market_data_path(symbol, "hourly")
-            hourly_df.to_csv(hourly_file, index=False)
-            logger.info(f"每小時數據儲存至: {hourly_file}")
+            update_panel(mode, timeframe, frames=bundle.timeframe_frames(timeframe))
         except Exception as e:
-            logger.error(f"抓取 {symbol} 市場數據失敗: {str(e)}")
-            data["market"][symbol] = {"close": 0, "change": 0}
+            logger.error(f"價格面板 {mode}_{timeframe} 更新失敗: {e}")
+    data["streaming"] = refresh_streaming(symbols, bundle)
 
     # Fetch news
-    news_by_symbol = {symbol: [] for symbol in SYMBOLS.get(mode, [])}
-    for url in NEWS_SOURCES.get(mode, []):
-        news_items = fetch_news(url)
-        for item in news_items:
-            for symbol in SYMBOLS.get(mode, []):
-                if symbol in item["title"] or symbol in item["description"]:
-                    news_by_symbol[symbol].append(item)
+    feeds = fetch_all_news(NEWS_SOURCES.get(mode, []), limit=config.get("news_fetch", {}).get("limit", 3))
+    for news_items in feeds.values():
         data["news"].extend(news_items)
+    # 代碼 + 中英文名稱合併成單一 regex，每則新聞只掃描一次
+    news_by_symbol, data["news_matches"] = get_matcher(SYMBOLS.get(mode, [])).route(data["news"])
 
     # Save news
     news_path = f"{output_dir}/{mode}_news.json"
@@ -211,28 +547,35 @@ def collect_data(mode):
         sentiment_analyzer, finbert_layer = get_sentiment_analyzer()
         logger.info(f"Sentiment Layer: {finbert_layer}")
 
+        # 每則標題只推論一次 (跨整體/個股彙總與同日 TW/US 兩次執行)
+        cache = SentimentCache()
         headlines = [item["title"] for item in data["news"]]
-        sentiments = analyze_sentiments(headlines, sentiment_analyzer)
+        sentiments = cache.score(headlines, lambda batch: analyze_sentiments(batch, sentiment_analyzer, market=mode), get_sentiment_model_id(mode))
+        cache.save()
+        scored = dict(zip(headlines, sentiments))
         overall_score = 0.0
         bullish_ratio = 0.5
         if sentiments:
-            overall_score = sum(s["score"] if s["label"] == "positive" else -s["score"] for s in sentiments) / len(sentiments)
+            overall_score = sentiment_score(sentiments)
             bullish_ratio = sum(1 for s in sentiments if s["label"] == "positive") / len(sentiments)
 
         sentiment_data = {
             "overall_score": overall_score,
             "bullish_ratio": bullish_ratio,
             "layer": finbert_layer,
+            "cache": cache.stats(),
             "symbols": {},
         }
+        logger.info(f"情緒快取: {sentiment_data['cache']}")
         for symbol in SYMBOLS.get(mode, []):
-            symbol_headlines = [item["title"] for item in news_by_symbol[symbol]]
-            if symbol_headlines:
-                symbol_sentiments = analyze_sentiments(symbol_headlines, sentiment_analyzer)
-                symbol_score = sum(s["score"] if s["label"] == "positive" else -s["score"] for s in symbol_sentiments) / len(symbol_sentiments) if symbol_sentiments else 0.0
-            else:
-                symbol_score = 0.0
+            symbol_score = sentiment_score([scored[item["title"]] for item in news_by_symbol[symbol]])
             sentiment_data["symbols"][symbol] = {"sentiment_score": symbol_score}
+        try:
+            record_day(today, mode, {symbol: (values["sentiment_score"], len(news_by_symbol[symbol]))
+                                     for symbol, values in sentiment_data["symbols"].items()},
+                       get_sentiment_model_id(mode), os.path.getmtime(news_path))
+        except Exception as e:
+            logger.error(f"情緒歷史寫入失敗: {e}")
 
         data["sentiment"] = sentiment_data
         sentiment_path = f"data/sentiment/{today}/social_metrics.json"
@@ -252,8 +595,21 @@ def collect_data(mode):
 
     # Quality check
     checker = DataQualityChecker()
-    quality_score, checks = checker.validate(data["market"], SYMBOLS.get(mode, []))
-    data["quality"] = {"score": quality_score, "checks": checks}
+    started = time.perf_counter()
+    symbol_quality = checker.validate_history({symbol: bundle.frames.get(symbol, {}) for symbol in symbols})
+    quality_score, checks = checker.validate(data["market"], SYMBOLS.get(mode, []), symbol_quality)
+    data["quality"] = {"score": quality_score, "checks": checks, "symbols": symbol_quality,
+                       "stale": checker.stale_symbols(data["market"], SYMBOLS.get(mode, []))}
+    logger.info(f"全歷史品質檢查: {len(symbol_quality)} 個標的，耗時 {time.perf_counter() - started:.3f}s")
 
     logger.info(f"{mode} 數據收集完成: {len(data['market'])} 個標的, {len(data['news'])} 則新聞, 品質分數: {quality_score}")
     return data
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="收集市場數據、新聞與情緒")
+    parser.add_argument("--mode", required=True, choices=["us", "tw"])
+    parser.add_argument("--full-refresh", action="store_true", help="重新下載完整歷史，而非增量同步")
+    args = parser.parse_args()
+    collect_data(args.mode, full_refresh=args.full_refresh)
@@ -0,0 +1,200 @@
+"""
+finbert_onnx.py - FinBERT 的 ONNX Runtime CPU 推論路徑 (選用)
+
+transformers.pipeline 每個 process 都要 import torch 並載入完整模型，
+在 GitHub Actions runner 上要花數秒與數百 MB RSS。此模組：
+
+- 匯出 (一次性)：ProsusAI/finbert → data/models/finbert-onnx/model.onnx，
+  並以 onnxruntime.quantization 做 dynamic int8 量化 → model.int8.onnx。
+  匯出需要 optimum[onnxruntime] + torch，只需在建置快取時執行一次。
+- 推論：只需 onnxruntime + tokenizers + numpy，不 import torch；
+  session 與 tokenizer 以模型目錄為 key 快取於 process 內。
+- OnnxSentimentAnalyzer 與 pipeline 介面相容：analyzer(texts) → [{"label", "score"}]。
+
+onnxruntime 不在 requirements.txt 內，需要此後端時另外安裝：pip install -r requirements-onnx.txt
+
+    python finbert_onnx.py --export        # 匯出並量化
+    python finbert_onnx.py --benchmark     # 冷啟動 / 每則標題延遲 vs transformers.pipeline
+"""
+
+import os
+import json
+import time
+import argparse
+import threading
+import numpy as np
+from loguru import logger
+from config import load_config
+
+try:
+    import onnxruntime as ort
+    from tokenizers import Tokenizer
+    _ORT_AVAILABLE = True
+except ImportError:
+    _ORT_AVAILABLE = False
+
+# Load config.json
+config = load_config()
+
+SENTIMENT = config.get("sentiment", {})
+MODEL_NAME = "ProsusAI/finbert"
+MODEL_DIR = SENTIMENT.get("onnx_model_dir", os.path.join("data", "models", "finbert-onnx"))
+
+_session_cache = {}
+_session_lock = threading.Lock()
+
+SAMPLE_HEADLINES = [
+    "Stocks rally as inflation cools and the Fed signals a pause",
+    "Chipmaker shares tumble after weak guidance",
+    "台積電法說會報喜，外資大舉買超",
+    "美股收盤漲跌互見，科技股漲多拉回",
+    "Oil prices steady ahead of OPEC meeting",
+    "加權指數跌破季線，市場觀望氣氛濃厚",
+]
+
+
+def is_available():
+    return _ORT_AVAILABLE
+
+
+def model_path(model_dir=None, quantize=None):
+    quantize = SENTIMENT.get("onnx_quantize", True) if quantize is None else quantize
+    return os.path.join(model_dir or MODEL_DIR, "model.int8.onnx" if quantize else "model.onnx")
+
+
+def export_model(model_name=MODEL_NAME, model_dir=None, quantize=True):
+    """Export model_name to ONNX (and dynamic int8) under model_dir. Requires optimum + torch."""
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    from transformers import AutoTokenizer
+
+    model_dir = model_dir or MODEL_DIR
+    os.makedirs(model_dir, exist_ok=True)
+    started = time.perf_counter()
+    model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+    model.save_pretrained(model_dir)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(model_dir)
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(
+            os.path.join(model_dir, "model.onnx"),
+            os.path.join(model_dir, "model.int8.onnx"),
+            weight_type=QuantType.QInt8,
+        )
+    logger.info(f"FinBERT ONNX 匯出完成 ({model_dir})，耗時 {time.perf_counter() - started:.1f}s")
+    return model_path(model_dir, quantize)
+
+
+def _load_labels(model_dir):
+    with open(os.path.join(model_dir, "config.json"), "r", encoding="utf-8") as f:
+        id2label = json.load(f)["id2label"]
+    return [id2label[str(i)].lower() for i in range(len(id2label))]
+
+
+class OnnxSentimentAnalyzer:
+    """Pipeline-compatible FinBERT classifier on an onnxruntime CPU session."""
+
+    def __init__(self, session, tokenizer, labels, max_length=128):
+        self.session = session
+        self.tokenizer = tokenizer
+        self.labels = labels
+        self.max_length = max_length
+        self.input_names = {i.name for i in session.get_inputs()}
+
+    def __call__(self, texts, batch_size=None, truncation=True, max_length=None, **kwargs):
+        if isinstance(texts, str):
+            texts = [texts]
+        if not texts:
+            return []
+        batch_size = batch_size or SENTIMENT.get("batch_size", 16)
+        self.tokenizer.enable_truncation(max_length or self.max_length)
+        results = []
+        for i in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(list(texts[i:i + batch_size]))
+            feeds = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+                "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+            }
+            logits = self.session.run(None, {k: v for k, v in feeds.items() if k in self.input_names})[0]
+            probs = np.exp(logits - logits.max(axis=1, keepdims=True))
+            probs /= probs.sum(axis=1, keepdims=True)
+            best = probs.argmax(axis=1)
+            results.extend({"label": self.labels[j], "score": float(probs[row, j])} for row, j in enumerate(best))
+        return results
+
+
+def load_analyzer(model_dir=None, quantize=None, export=None):
+    """
+    Return an OnnxSentimentAnalyzer, exporting the model first if allowed and missing.
+    Raises when onnxruntime/tokenizers are not installed or no model can be produced.
+    """
+    if not _ORT_AVAILABLE:
+        raise ImportError("onnxruntime / tokenizers not installed")
+    model_dir = model_dir or MODEL_DIR
+    path = model_path(model_dir, quantize)
+    with _session_lock:
+        if path in _session_cache:
+            return _session_cache[path]
+        if not os.path.exists(path):
+            if not (SENTIMENT.get("onnx_auto_export", False) if export is None else export):
+                raise FileNotFoundError(f"{path} 不存在，請先執行 python finbert_onnx.py --export")
+            export_model(model_dir=model_dir, quantize=path.endswith(".int8.onnx"))
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = SENTIMENT.get("onnx_threads", 0)
+        session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        tokenizer.enable_padding()
+        analyzer = OnnxSentimentAnalyzer(session, tokenizer, _load_labels(model_dir), SENTIMENT.get("max_length", 128))
+        _session_cache[path] = analyzer
+    return analyzer
+
+
+def _time_backend(load, headlines, rounds):
+    started = time.perf_counter()
+    analyzer = load()
+    analyzer(headlines[:1])
+    cold_start = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(rounds):
+        analyzer(headlines)
+    per_headline_ms = (time.perf_counter() - started) / (rounds * len(headlines)) * 1000
+    return {"cold_start_s": round(cold_start, 3), "per_headline_ms": round(per_headline_ms, 3)}
+
+
+def benchmark(headlines=None, rounds=5, model_dir=None):
+    """Cold start (import + load + first call) and steady-state per-headline latency per backend."""
+    headlines = headlines or SAMPLE_HEADLINES
+    report = {}
+    for quantize in (False, True):
+        name = "onnx-int8" if quantize else "onnx-fp32"
+        _session_cache.pop(model_path(model_dir, quantize), None)
+        try:
+            report[name] = _time_backend(lambda: load_analyzer(model_dir, quantize, export=False), headlines, rounds)
+        except Exception as e:
+            report[name] = {"error": str(e)}
+
+    def load_pipeline():
+        from transformers import pipeline
+        return pipeline("sentiment-analysis", model=MODEL_NAME, device=-1)
+
+    try:
+        report["pipeline"] = _time_backend(load_pipeline, headlines, rounds)
+    except Exception as e:
+        report["pipeline"] = {"error": str(e)}
+    for name, row in report.items():
+        logger.info(f"{name}: {row}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FinBERT ONNX export / benchmark")
+    parser.add_argument("--export", action="store_true", help="Export ProsusAI/finbert to ONNX and int8")
+    parser.add_argument("--no-quantize", action="store_true", help="Skip the int8 quantized copy")
+    parser.add_argument("--benchmark", action="store_true", help="Compare ONNX with transformers.pipeline")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    if args.export:
+        export_model(quantize=not args.no_quantize)
+    if args.benchmark:
+        print(json.dumps(benchmark(rounds=args.rounds), ensure_ascii=False, indent=2))
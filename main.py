@@ -1,45 +1,75 @@
 import argparse
 import datetime
+import importlib
 import os
 import sys
+from functools import lru_cache
 from pathlib import Path
 from loguru import logger
-import pandas as pd
 from dotenv import load_dotenv
-# ta_bridge 整合 — TradingAgents 分析注入
-sys.path.insert(0, str(Path(__file__).parent))
-try:
-    from ta_bridge import load_ta_cache
-    _TA_BRIDGE = load_ta_cache()
-    _TA_BRIDGE_AVAILABLE = _TA_BRIDGE is not None
-    if _TA_BRIDGE_AVAILABLE:
-        logger.info(f"✅ TA Bridge 已載入: {len(_TA_BRIDGE.get('market_analysis', {}))} 檔股票")
-    else:
-        logger.info("ℹ️ TA Bridge 無今日資料，使用原生流程")
-except Exception as e:
-    _TA_BRIDGE = None
-    _TA_BRIDGE_AVAILABLE = False
-    logger.info(f"ℹ️ TA Bridge 不可用: {e}")
-
-
-from data_collector import collect_data
-from content_creator import generate_script
-from voice_producer import generate_audio
-from cloud_manager import upload_episode
-from podcast_distributor import generate_rss, notify_slack_enhanced
-from strategies.god_system_strategy import GodSystemStrategy
-from strategies.bigline_strategy import BigLineStrategy
-from market_analyst import MarketAnalyst
+from pipeline_runner import StageRunner, PipelineStop, MANIFEST_NAME, digest_file
+import tracing
+from tracing import span
+from config import load_config
 import pytz
-import json
-from loguru import logger
+
+sys.path.insert(0, str(Path(__file__).parent))
 
 # 載入 config.json
-with open('config.json', 'r', encoding='utf-8') as f:
-    config = json.load(f)
+config = load_config()
 
 load_dotenv()
 
+# ─────────────────────────────────────────────
+# 延遲載入：重量級依賴 (transformers / yfinance / matplotlib / b2sdk / feedgen / pydub)
+# 第一次使用時才 import，`main.py --help` 不必付出這些成本
+# ─────────────────────────────────────────────
+_LAZY_IMPORTS = {
+    'collect_data': 'data_collector',
+    'generate_script': 'content_creator',
+    'generate_audio': 'voice_producer',
+    'upload_episode': 'cloud_manager',
+    'generate_rss': 'podcast_distributor',
+    'notify_slack_enhanced': 'podcast_distributor',
+    'GodSystemStrategy': 'strategies.god_system_strategy',
+    'BigLineStrategy': 'strategies.bigline_strategy',
+    'MarketAnalyst': 'market_analyst',
+    'MarketBundle': 'market_bundle',
+    'attach_sentiment': 'sentiment_history',
+    'load_panel_for': 'price_panel',
+    'symbol_frame': 'price_panel',
+}
+
+
+def __getattr__(name):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def _dep(name):
+    """A lazily imported dependency; names already bound in this module (e.g. monkeypatched) win."""
+    return globals()[name] if name in globals() else __getattr__(name)
+
+
+@lru_cache(maxsize=None)
+def load_ta_bridge():
+    """ta_bridge 整合 — TradingAgents 分析注入 (今日快取，None 表示不可用)"""
+    try:
+        from ta_bridge import load_ta_cache
+        ta_bridge = load_ta_cache()
+        if ta_bridge is not None:
+            logger.info(f"✅ TA Bridge 已載入: {len(ta_bridge.get('market_analysis', {}))} 檔股票")
+        else:
+            logger.info("ℹ️ TA Bridge 無今日資料，使用原生流程")
+        return ta_bridge
+    except Exception as e:
+        logger.info(f"ℹ️ TA Bridge 不可用: {e}")
+        return None
+
 def is_weekday():
     """Check if today is a weekday (Monday to Friday) in Taipei timezone."""
     TW_TZ = pytz.timezone("Asia/Taipei")
@@ -48,6 +78,7 @@ def is_weekday():
 
 def build_placeholder_df(symbol):
     """Create placeholder OHLCV data when market CSV is missing or invalid."""
+    import pandas as pd
     periods = 252
     dates = pd.date_range(start='2025-01-01', periods=periods, tz='UTC')
     base_open = 22987.92
@@ -63,82 +94,171 @@ def build_placeholder_df(symbol):
         'volume': [5_000_000] * periods
     })
 
-def main(mode):
-    TW_TZ = pytz.timezone("Asia/Taipei")
-    today = datetime.datetime.now(TW_TZ).strftime("%Y%m%d")
-    print(f"開始生成 {mode.upper()} 版 podcast，日期 {today}...")
+def load_symbol_frame(symbol, bundle=None):
+    """
+    Daily history for symbol: from this run's MarketBundle (collect_data), else the memmapped price panel,
+    else the market store; the placeholder frame when unusable.
+    """
+    try:
+        df_raw = _dep('symbol_frame')(symbol, 'daily') if bundle is None else None
+        if df_raw is None:
+            source = bundle if bundle is not None else _dep('MarketBundle')(market_dir=config['data_paths']['market'])
+            df_raw = source.get(symbol, 'daily')
+        if df_raw is None:
+            logger.warning(f"找不到 {symbol} 的市場數據")
+            return build_placeholder_df(symbol)
+        if df_raw.empty or 'close' not in df_raw.columns:
+            logger.warning(f"{symbol} 市場數據為空或缺少 'close' 欄位")
+            return build_placeholder_df(symbol)
+        return df_raw
+    except Exception as e:
+        logger.error(f"載入 {symbol} 市場數據失敗：{str(e)}")
+        return build_placeholder_df(symbol)
 
-    # 步驟1: 收集數據
-    market_data = collect_data(mode)
 
-    # 步驟2: 執行策略分析
+# ─────────────────────────────────────────────
+# 步驟2: 每個標的一個任務 (策略回測 + 市場分析)
+# ─────────────────────────────────────────────
+_analysis_worker = {}
+
+
+def _build_analysis_tools():
     strategies_map = {
-        'god_system': GodSystemStrategy(config),
-        'bigline': BigLineStrategy(config)
+        'god_system': _dep('GodSystemStrategy')(config),
+        'bigline': _dep('BigLineStrategy')(config)
     }
-    strategy_results = {}
-    market_analysis = {}
-    analyst = MarketAnalyst(config)
-    symbol_sentiments = market_data.get('sentiment', {}).get('symbols', {})
-    overall_sentiment = market_data.get('sentiment', {}).get('overall_score', 0.0)
+    return strategies_map, _dep('MarketAnalyst')(config)
 
-    for symbol in market_data['market']:
-        file_path = f"{config['data_paths']['market']}/daily_{symbol.replace('^', '').replace('.', '_').replace('-', '_')}.csv"
-        try:
-            if os.path.exists(file_path):
-                df_raw = pd.read_csv(file_path)
-                if df_raw.empty or 'close' not in df_raw.columns:
-                    logger.warning(f"{symbol} CSV 為空或缺少 'close' 欄位")
-                    df_raw = build_placeholder_df(symbol)
-            else:
-                logger.warning(f"找不到 {symbol} 的 CSV 檔案：{file_path}")
-                df_raw = build_placeholder_df(symbol)
-        except Exception as e:
-            logger.error(f"載入 {symbol} CSV 失敗：{str(e)}")
-            df_raw = build_placeholder_df(symbol)
 
-        df_raw['date'] = pd.to_datetime(df_raw['date'], utc=True, errors='coerce')
-        df_raw = df_raw.dropna(subset=['date']).sort_values('date')
-        sentiment_score = symbol_sentiments.get(symbol, {}).get('sentiment_score', overall_sentiment if overall_sentiment is not None else 0.0)
-        if sentiment_score is None:
-            sentiment_score = 0.0
-        df_raw['sentiment_score'] = sentiment_score
+def _init_analysis_worker():
+    """Process-pool initializer: build the strategies and analyst once per worker."""
+    tracing.drain()  # start from an empty buffer (fork would inherit the parent's events)
+    _analysis_worker['tools'] = _build_analysis_tools()
+
+
+def _analysis_task(symbol, sentiment_score, frame):
+    """Worker side of run_analysis: the result plus this task's trace events for the parent."""
+    return analyze_symbol(symbol, sentiment_score, frame=frame), tracing.drain()
 
-        df_bigline = df_raw.copy()
-        df_god = df_raw.copy()
-        df_god.set_index('date', inplace=True, drop=False)
 
-        per_strategy_results = {}
-        for strategy_name, strategy in strategies_map.items():
+def analyze_symbol(symbol, sentiment_score, tools=None, frame=None):
+    """
+    Run every strategy and the MarketAnalyst on one daily frame (loaded once when not given).
+    Returns (symbol, strategy_results entry, market_analysis entry).
+    """
+    strategies_map, analyst = tools or _analysis_worker['tools']
+    df_raw = frame if frame is not None else load_symbol_frame(symbol)
+    # 依日期併入歷史情緒 (回補資料)，只有最新一根 K 棒使用今天的分數
+    df_raw = _dep('attach_sentiment')(df_raw, symbol, sentiment_score)
+
+    per_strategy_results = {}
+    for strategy_name, strategy in strategies_map.items():
+        with span(f"{strategy_name}.backtest", cat="strategy", symbol=symbol):
             if strategy_name == 'god_system':
-                result = strategy.backtest(symbol, df_god.copy(), timeframe='daily')
+                result = strategy.backtest(symbol, df_raw.set_index('date', drop=False), timeframe='daily')
             else:
-                result = strategy.backtest(symbol, df_bigline.copy(), timeframe='daily')
-            per_strategy_results[strategy_name] = result
-            logger.info(
-                f"{symbol} {strategy_name} 策略: Sharpe={result.get('sharpe_ratio', 0):.2f}, "
-                f"MaxDrawdown={result.get('max_drawdown', 0):.2f}, "
-                f"ExpectedReturn={result.get('expected_return', 0):.2f}, "
-                f"Signal={result.get('signals', {}).get('position', 'NEUTRAL')}"
-            )
-
-        best_name, best_result = max(
-            per_strategy_results.items(),
-            key=lambda item: item[1].get('expected_return', float('-inf'))
+                result = strategy.backtest(symbol, df_raw.copy(), timeframe='daily')
+        per_strategy_results[strategy_name] = result
+        logger.info(
+            f"{symbol} {strategy_name} 策略: Sharpe={result.get('sharpe_ratio', 0):.2f}, "
+            f"MaxDrawdown={result.get('max_drawdown', 0):.2f}, "
+            f"ExpectedReturn={result.get('expected_return', 0):.2f}, "
+            f"Signal={result.get('signals', {}).get('position', 'NEUTRAL')}"
         )
 
-        strategy_results[symbol] = {
-            'strategy': best_name,
-            'expected_return': best_result.get('expected_return', 0),
-            'max_drawdown': best_result.get('max_drawdown', 0),
-            'sharpe_ratio': best_result.get('sharpe_ratio', 0),
-            'signals': best_result.get('signals', {}),
-            'best': {'name': best_name, **best_result},
-            'strategies': per_strategy_results
-        }
+    best_name, best_result = max(
+        per_strategy_results.items(),
+        key=lambda item: item[1].get('expected_return', float('-inf'))
+    )
+    strategy_entry = {
+        'strategy': best_name,
+        'expected_return': best_result.get('expected_return', 0),
+        'max_drawdown': best_result.get('max_drawdown', 0),
+        'sharpe_ratio': best_result.get('sharpe_ratio', 0),
+        'signals': best_result.get('signals', {}),
+        'best': {'name': best_name, **best_result},
+        'strategies': per_strategy_results
+    }
+    # 只有勝出策略的權益曲線留在 best 中，交給 render_best_charts 繪圖
+    for result in per_strategy_results.values():
+        result.pop('equity_curve', None)
+    with span("analyze_market", cat="strategy", symbol=symbol):
+        analysis = analyst.analyze_market(symbol, data=df_raw)
+    return symbol, strategy_entry, analysis
+
+
+def _panel_is_current(symbol, frame):
+    """True when the daily price panel was built from exactly this frame (workers can read it themselves)."""
+    try:
+        panel = _dep('load_panel_for')(symbol, 'daily')
+        return panel is not None and panel.is_current(symbol, frame)
+    except Exception as e:
+        logger.warning(f"{symbol} 價格面板檢查失敗，改為傳送資料: {e}")
+        return False
+
+
+def run_analysis(symbols, sentiments, workers=1, bundle=None):
+    """
+    Analyze every symbol, in a process pool when workers > 1.
+    Frames come from the in-memory bundle; in the pool only frames the price panel does not already hold
+    are shipped with the task, the rest are read by the workers from the shared memmap.
+    Results are returned in `symbols` order regardless of completion order.
+    """
+    frames = [load_symbol_frame(symbol, bundle) for symbol in symbols]
+    scores = [sentiments[symbol] for symbol in symbols]
+    if workers <= 1 or len(symbols) <= 1:
+        tools = _build_analysis_tools()
+        return [analyze_symbol(symbol, score, tools, frame) for symbol, score, frame in zip(symbols, scores, frames)]
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    # spawn, not fork: under `--mode both` this runs inside a mode thread, and a fork taken while the other
+    # thread holds a lock (loguru, the sentiment loader, ...) leaves that lock held forever in the child
+    context = multiprocessing.get_context("spawn")
+    frames = [None if _panel_is_current(symbol, frame) else frame for symbol, frame in zip(symbols, frames)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(symbols)), mp_context=context,
+                             initializer=_init_analysis_worker) as pool:
+        results = []
+        for result, events in pool.map(_analysis_task, symbols, scores, frames):
+            tracing.merge(events)
+            results.append(result)
+        return results
+
+
+# ─────────────────────────────────────────────
+# 流程 stage (collect → analysis → script → audio → upload → rss)
+# ─────────────────────────────────────────────
+STAGES = ["collect", "analysis", "script", "audio", "upload", "rss"]
+
+
+def _without_bundle(market_data):
+    """Checkpointed market data: the MarketBundle is dropped (a restored run falls back to the store)."""
+    return {key: value for key, value in market_data.items() if key != 'bundle'}
+
+
+def _file_digest_or_none(path):
+    return digest_file(path) if os.path.exists(path) else None
+
+
+def run_strategies(market_data, workers=1):
+    """步驟2: 執行策略分析 (+ TA Bridge 注入)，回傳 (strategy_results, market_analysis)"""
+    ta_bridge = load_ta_bridge()
+    strategy_results = {}
+    market_analysis = {}
+    symbol_sentiments = market_data.get('sentiment', {}).get('symbols', {})
+    overall_sentiment = market_data.get('sentiment', {}).get('overall_score', 0.0)
+
+    sentiments = {}
+    for symbol in market_data['market']:
+        sentiment_score = symbol_sentiments.get(symbol, {}).get('sentiment_score', overall_sentiment if overall_sentiment is not None else 0.0)
+        sentiments[symbol] = sentiment_score if sentiment_score is not None else 0.0
+
+    analyzed = run_analysis(list(market_data['market']), sentiments, workers, market_data.get('bundle'))
+    render_best_charts({symbol: strategy_entry for symbol, strategy_entry, _ in analyzed})
+    for symbol, strategy_entry, analysis in analyzed:
+        strategy_results[symbol] = strategy_entry
         # ── TA Bridge：注入 TradingAgents 策略與 DCF 估值 ──
-        if _TA_BRIDGE_AVAILABLE:
-            ta_sr = _TA_BRIDGE.get("strategy_results", {}).get(symbol)
+        if ta_bridge is not None:
+            ta_sr = ta_bridge.get("strategy_results", {}).get(symbol)
             if ta_sr:
                 strategy_results[symbol]['ta_signal'] = ta_sr.get('ta_signal', 'HOLD')
                 strategy_results[symbol]['ta_position'] = ta_sr.get('signals', {}).get('position', ta_sr.get('position', 'NEUTRAL'))
@@ -146,10 +266,10 @@ def main(mode):
                 if 'dcf' in ta_sr:
                     strategy_results[symbol]['dcf'] = ta_sr['dcf']
                 logger.info(f"  ✅ {symbol} → TA: {ta_sr.get('ta_signal','?')} | {strategy_results[symbol].get('ta_position','?')}")
-        market_analysis[symbol] = analyst.analyze_market(symbol)
+        market_analysis[symbol] = analysis
         # ── TA Bridge 注入：TradingAgents 分析覆蓋 ──
-        if _TA_BRIDGE_AVAILABLE:
-            ta_ma = _TA_BRIDGE.get("market_analysis", {}).get(symbol)
+        if ta_bridge is not None:
+            ta_ma = ta_bridge.get("market_analysis", {}).get(symbol)
             if ta_ma:
                 # 用 TA 的分析覆蓋（TA 有更多的分析師觀點）
                 original_ma = market_analysis[symbol]
@@ -157,9 +277,20 @@ def main(mode):
                 # 保留 podcast 原生的 MarketAnalyst 有用的欄位
                 market_analysis[symbol]['original_report'] = str(original_ma.get('report',''))[:200]
                 logger.info(f"  ✅ {symbol} → TA: trend={ta_ma.get('trend','?')} signal={ta_ma.get('ta_signal','?')}")
+    return strategy_results, market_analysis
+
+
+def render_best_charts(strategy_results):
+    """Performance chart of each symbol's winning strategy, rendered after every backtest finished."""
+    from strategies.charts import chart_job, render_charts
+    jobs = {symbol: chart_job(symbol, 'daily', entry.get('best')) for symbol, entry in strategy_results.items()}
+    urls = render_charts(jobs.values())
+    for symbol, job in jobs.items():
+        if job is not None:
+            strategy_results[symbol]['best']['chart_url'] = urls.get(job.key)
 
-    
-    # 步驟3: 生成文字稿
+
+def manual_script_path():
     # 偵錯用：印出目前在哪裡，以及目錄下有什麼
     print(f"目前工作目錄: {os.getcwd()}")
     print(f"根目錄下的檔案與資料夾: {os.listdir('.')}")
@@ -167,54 +298,165 @@ def main(mode):
         print(f"doc 資料夾內的內容: {os.listdir('docs')}")
 
     # 正確的路徑寫法
-    manual_script_path = os.path.join(os.getcwd(), "docs/script.txt")
+    path = os.path.join(os.getcwd(), "docs/script.txt")
 
-    if os.path.exists(manual_script_path):
+    if os.path.exists(path):
         print("成功找到手動腳本！")
     else:
-        print(f"仍找不到檔案，路徑嘗試為: {manual_script_path}")
-    
-    podcast_dir = f"{config['data_paths']['podcast']}/{today}_{mode}"
-    script_filename = f"{config['b2_podcast_prefix']}-{today}_{mode}.txt"
-    script_path = f"{podcast_dir}/{script_filename}"
-    
+        print(f"仍找不到檔案，路徑嘗試為: {path}")
+    return path
+
+
+def write_script(script_path, manual_path, market_data, mode, strategy_results, market_analysis):
+    """步驟3: 手動稿件優先，否則自動生成；統一寫入當天的正式路徑並回傳文字稿"""
     # 確保輸出目錄存在
     os.makedirs(os.path.dirname(script_path), exist_ok=True)
 
     # 2. 核心判斷邏輯
-    if os.path.exists(manual_script_path):
-        print(f"--- 偵測到手動稿件: {manual_script_path} ---")
-        with open(manual_script_path, 'r', encoding='utf-8') as f:
+    if os.path.exists(manual_path):
+        print(f"--- 偵測到手動稿件: {manual_path} ---")
+        with open(manual_path, 'r', encoding='utf-8') as f:
             script = f.read()
     else:
         print(f"--- 未發現手動稿件，執行自動生成流程 ---")
-        script = generate_script(market_data, mode, strategy_results, market_analysis)
+        script = _dep('generate_script')(market_data, mode, strategy_results, market_analysis)
 
     # 3. 統一寫入到當天有日期的正式路徑 (確保後續 TTS 或上傳流程能找到檔案)
     with open(script_path, 'w', encoding='utf-8') as f:
         f.write(script)
-    
+
     print(f"文字稿已準備就緒，存檔於: {script_path}")
+    return script
+
 
-    # 步驟4: 生成音頻
-    audio_filename = f"{config['b2_podcast_prefix']}-{today}_{mode}.mp3"
-    audio_path = f"{podcast_dir}/{audio_filename}"
-    os.makedirs(os.path.dirname(audio_path), exist_ok=True)
-    generate_audio(script_path, audio_path)
+def main(mode, workers=1, resume=False, from_stage=None, only_stage=None):
+    """
+    Run the podcast pipeline through a StageRunner. Every stage is checkpointed under
+    docs/podcast/{today}_{mode}/checkpoints; resume / from_stage / only_stage reuse them.
+    """
+    from strategies.charts import charts_enabled
+    TW_TZ = pytz.timezone("Asia/Taipei")
+    today = datetime.datetime.now(TW_TZ).strftime("%Y%m%d")
+    print(f"開始生成 {mode.upper()} 版 podcast，日期 {today}...")
+
+    podcast_dir = f"{config['data_paths']['podcast']}/{today}_{mode}"
+    script_path = f"{podcast_dir}/{config['b2_podcast_prefix']}-{today}_{mode}.txt"
+    audio_path = f"{podcast_dir}/{config['b2_podcast_prefix']}-{today}_{mode}.mp3"
+    runner = StageRunner(podcast_dir, STAGES, resume=resume, from_stage=from_stage, only_stage=only_stage,
+                         meta={"mode": mode, "date": today})
 
-    # 步驟5: 上傳到 B2
-    files = {'script': script_path, 'audio': audio_path}
-    uploaded_urls = upload_episode(today, mode, files)
-    audio_url = uploaded_urls['audio']
+    try:
+        # 步驟1: 收集數據
+        market_data = runner.run("collect", lambda: _dep('collect_data')(mode), {"mode": mode, "date": today},
+                                 checkpoint=_without_bundle)
 
-    # 步驟6: 生成 RSS + Slack 通知
-    generate_rss(today, mode, script, audio_url, strategy_results)
-    # notify_slack_enhanced(strategy_results, mode)
+        # 步驟2: 執行策略分析
+        strategy_results, market_analysis = runner.run(
+            "analysis", lambda: run_strategies(market_data, workers),
+            {"collect": runner.digest("collect"), "ta_bridge": load_ta_bridge(), "charts": charts_enabled()})
+
+        # 步驟3: 生成文字稿
+        manual_path = manual_script_path()
+        script = runner.run(
+            "script", lambda: write_script(script_path, manual_path, market_data, mode, strategy_results, market_analysis),
+            {"collect": runner.digest("collect"), "analysis": runner.digest("analysis"),
+             "manual_script": _file_digest_or_none(manual_path)},
+            files=[script_path])
+
+        # 步驟4: 生成音頻
+        os.makedirs(os.path.dirname(audio_path), exist_ok=True)
+        runner.run("audio", lambda: _dep('generate_audio')(script_path, audio_path),
+                   {"script": runner.digest("script")}, files=[audio_path])
+
+        # 步驟5: 上傳到 B2
+        files = {'script': script_path, 'audio': audio_path}
+        uploaded_urls = runner.run("upload", lambda: _dep('upload_episode')(today, mode, files),
+                                   {"script": runner.digest("script"), "audio": runner.digest("audio")})
+        audio_url = uploaded_urls['audio']
+
+        # 步驟6: 生成 RSS + Slack 通知
+        runner.run("rss", lambda: _dep('generate_rss')(today, mode, script, audio_url, strategy_results),
+                   {"script": runner.digest("script"), "audio_url": audio_url, "analysis": runner.digest("analysis")})
+        # notify_slack_enhanced(strategy_results, mode)
+    except PipelineStop as stop:
+        logger.info(f"--only-stage {only_stage} 完成，略過 {stop} 之後的 stage")
+    finally:
+        manifest = runner.finish()
+        logger.info(f"執行紀錄: {podcast_dir}/{MANIFEST_NAME} ({manifest['total_seconds']:.2f}s)")
 
     print("Podcast 製作完成！")
 
+# ─────────────────────────────────────────────
+# 多節目單一 process (`--mode both`)
+# ─────────────────────────────────────────────
+MODES = ['tw', 'us']
+
+
+def resolve_modes(modes):
+    """['both'] → ['tw', 'us']; duplicates dropped, order kept."""
+    resolved = []
+    for mode in modes:
+        for m in (MODES if mode == 'both' else [mode]):
+            if m not in resolved:
+                resolved.append(m)
+    return resolved
+
+
+def run_modes(modes, workers=1, profile=False, **stage_options):
+    """
+    Produce several shows in one process, one thread per mode.
+    Warm state is shared instead of paid per invocation: the sentiment model, the LLM HTTP pool
+    (nim_api), the B2 bucket (cloud_manager) and the Yahoo per-host limit; the I/O-bound stages
+    (collect, LLM, TTS, upload) of the modes overlap. Shared files are serialized where they are written:
+    RSS publishing in podcast_distributor, and the prompt_versions/*.json read-modify-write cycles
+    (history, scores, feedback log, prompt config) in content_creator.
+    Writes one Chrome/Perfetto trace per run to logs/; profile=True also dumps cProfile and
+    tracemalloc reports per stage to logs/profile_{timestamp}/.
+    """
+    label = "-".join(modes)
+    if profile:
+        tracing.enable_profiling(f"{tracing.LOG_DIR}/profile_{datetime.datetime.now():%Y%m%d_%H%M%S}_{label}")
+    try:
+        _run_modes(modes, workers, **stage_options)
+    finally:
+        tracing.write_trace(label)
+
+
+def _run_modes(modes, workers, **stage_options):
+    if len(modes) == 1:
+        return main(modes[0], workers=workers, **stage_options)
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=len(modes), thread_name_prefix="podcast") as pool:
+        futures = {mode: pool.submit(main, mode, workers, **stage_options) for mode in modes}
+    failed = []
+    for mode, future in futures.items():
+        try:
+            future.result()
+        except Exception as e:
+            logger.error(f"{mode.upper()} 版 podcast 失敗: {e}")
+            failed.append(mode)
+    if failed:
+        raise RuntimeError(f"podcast 失敗: {', '.join(failed)}")
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--mode", required=True, choices=['us', 'tw'])
+    parser.add_argument("--mode", required=True, nargs="+", choices=MODES + ['both'],
+                        help="Show(s) to produce; several modes (or 'both') run concurrently in one process")
+    parser.add_argument("--workers", type=int, default=config.get("pipeline", {}).get("analysis_workers", 1),
+                        help="Processes for the per-symbol analysis stage (1 = in-process)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Reuse checkpoints of stages whose inputs are unchanged")
+    stage_group = parser.add_mutually_exclusive_group()
+    stage_group.add_argument("--from-stage", choices=STAGES, help="Restore earlier stages, re-run this one and the rest")
+    stage_group.add_argument("--only-stage", choices=STAGES, help="Restore earlier stages and re-run only this one")
+    parser.add_argument("--profile", action="store_true",
+                        help="Capture cProfile and tracemalloc reports per stage under logs/")
+    parser.add_argument("--no-charts", action="store_true",
+                        help="Skip rendering and uploading strategy performance charts (overrides config charts.enabled)")
     args = parser.parse_args()
-    main(args.mode)
+    if args.no_charts:
+        from strategies.charts import set_enabled
+        set_enabled(False)
+    run_modes(resolve_modes(args.mode), workers=args.workers, profile=args.profile, resume=args.resume,
+              from_stage=args.from_stage, only_stage=args.only_stage)
@@ -1,8 +1,9 @@
 import pandas as pd
-import ta
 from loguru import logger
 import json
-import os
+from market_store import load_market_data
+from price_panel import symbol_frame
+from strategies import indicator_cache
 
 # 載入 technical_strategy.json
 with open('strategies/technical_strategy.json', 'r', encoding='utf-8') as f:
@@ -29,10 +30,16 @@ class MarketAnalyst:
                 logger.warning(f"技術參數 {key} 缺失，使用預設值 {value}")
         self.min_data_length = self.params.get('min_data_length_rsi_sma', 20)
 
-    def analyze_market(self, symbol, timeframe='daily'):
-        file_path = f"{self.config['data_paths']['market']}/{timeframe}_{symbol.replace('^', '').replace('.', '_')}.csv"
-        if not os.path.exists(file_path):
-            logger.error(f"{symbol} {timeframe} 數據檔案不存在: {file_path}")
+    def analyze_market(self, symbol, timeframe='daily', data=None):
+        """data: an already loaded frame for symbol/timeframe; otherwise the price panel view, then the store."""
+        if data is not None:
+            df = data.copy()
+        else:
+            df = symbol_frame(symbol, timeframe)
+            if df is None:
+                df = load_market_data(symbol, timeframe, market_dir=self.config['data_paths']['market'])
+        if df is None:
+            logger.error(f"{symbol} {timeframe} 數據檔案不存在")
             return {
                 'trend': 'NEUTRAL',
                 'volatility': 0.0,
@@ -41,8 +48,6 @@ class MarketAnalyst:
             }
         
         try:
-            df = pd.read_csv(file_path)
-            df['date'] = pd.to_datetime(df['date'])
             if df.empty or len(df) < self.min_data_length:
                 logger.error(f"{symbol} {timeframe} 數據不足: 實際 {len(df)} 筆，需 {self.min_data_length} 筆")
                 return {
@@ -53,15 +58,14 @@ class MarketAnalyst:
                 }
             
             # 技術指標計算
-            df['rsi'] = ta.momentum.RSIIndicator(df['close'], window=self.params['rsi_window']).rsi()
-            df['macd'] = ta.trend.MACD(df['close'], 
-                                      window_fast=self.params['macd_fast'],
-                                      window_slow=self.params['macd_slow'],
-                                      window_sign=self.params['macd_signal']).macd()
-            df['bollinger_hband'] = ta.volatility.BollingerBands(df['close']).bollinger_hband()
-            df['bollinger_lband'] = ta.volatility.BollingerBands(df['close']).bollinger_lband()
-            df['sma_50'] = ta.trend.SMAIndicator(df['close'], window=50).sma_indicator()
-            df['sma_200'] = ta.trend.SMAIndicator(df['close'], window=200).sma_indicator()
+            # 與策略共用指標快取：同一份資料的 RSI / MACD / 布林通道 / 均線只算一次
+            close = df['close']
+            df['rsi'] = indicator_cache.rsi(close, self.params['rsi_window'], symbol, timeframe)
+            df['macd'], _, _ = indicator_cache.macd(close, self.params['macd_fast'], self.params['macd_slow'],
+                                                    self.params['macd_signal'], symbol, timeframe)
+            df['bollinger_hband'], df['bollinger_lband'], _ = indicator_cache.bollinger(close, symbol=symbol, timeframe=timeframe)
+            df['sma_50'] = indicator_cache.sma(close, 50, symbol, timeframe)
+            df['sma_200'] = indicator_cache.sma(close, 200, symbol, timeframe)
             
             # 趨勢分析：黃金交叉/死亡交叉
             trend = 'NEUTRAL'
@@ -0,0 +1,55 @@
+"""
+market_bundle.py - 單次執行內的市場數據交接 (collect_data → 策略 / 分析 / 面板)
+
+collect_data 同步完 CSV / 欄式檔後，記憶體中已經有每個標的的 daily / hourly 歷史；
+MarketBundle 保存這些已轉型 (date 為 UTC datetime) 的 DataFrame 並放在
+collect_data 回傳值的 data["bundle"]，下游直接取用，不必再寫入後讀回、重複解析日期。
+磁碟上的 market_store 仍是持久副本：bundle 裡沒有的標的/週期會改由 load_market_data 讀取。
+
+    bundle = market_data.get("bundle") or MarketBundle()
+    df = bundle.get("QQQ")                         # daily，與 load_market_data 相同 schema
+    df = bundle.get("QQQ", "hourly", index=True)
+"""
+
+from dataclasses import dataclass, field
+from market_store import load_market_data, normalize_frame
+
+
+@dataclass
+class MarketBundle:
+    """Typed per-symbol frames, {symbol: {timeframe: DataFrame}}, with the store as fallback."""
+    frames: dict = field(default_factory=dict)
+    market_dir: str = None
+
+    def add(self, symbol, timeframe, df, normalized=False):
+        """Keep df (normalized to the store schema unless it already is) for the rest of the run."""
+        if df is None or df.empty:
+            return
+        self.frames.setdefault(symbol, {})[timeframe] = df if normalized else normalize_frame(df, symbol)
+
+    def timeframe_frames(self, timeframe):
+        """{symbol: frame} for one timeframe, without copies (read-only use, e.g. panel building)."""
+        return {symbol: by_tf[timeframe] for symbol, by_tf in self.frames.items() if timeframe in by_tf}
+
+    def get(self, symbol, timeframe="daily", index=False, fallback=True):
+        """
+        A copy of the frame for symbol/timeframe (callers may add columns freely).
+        Falls back to the market store when the bundle has no such frame; None if neither has data.
+        """
+        df = self.frames.get(symbol, {}).get(timeframe)
+        if df is None:
+            if not fallback:
+                return None
+            df = load_market_data(symbol, timeframe, market_dir=self.market_dir)
+            if df is None:
+                return None
+            self.frames.setdefault(symbol, {})[timeframe] = df
+        df = df.copy()
+        return df.set_index("date") if index else df
+
+    def __contains__(self, symbol):
+        return symbol in self.frames
+
+    @property
+    def symbols(self):
+        return list(self.frames)
@@ -0,0 +1,213 @@
+"""
+market_store.py - 市場數據欄式儲存 (Parquet / Feather)
+
+每個 {timeframe}_{symbol} 都存成一個型別固定的欄式檔案：
+- date    : datetime64[ns, UTC]
+- symbol  : category
+- open/high/low/close/change : float64 (可在 config market_store.price_dtype 改為 float32)
+- volume  : float64
+
+CSV 仍保留為可讀的匯出檔 (data_collector 增量追加用、git 追蹤用)；
+讀取時若欄式檔較新就讀欄式檔，否則讀 CSV 並轉型，所以舊 CSV 一律可讀。
+
+用法：
+    from market_store import load_market_data
+    df = load_market_data("QQQ", "daily")               # date 欄位已轉型
+    df = load_market_data("QQQ", "daily", index=True)   # 以 date 為 index
+
+    python market_store.py --migrate   # 將現有 CSV 轉成欄式檔
+    python market_store.py --export    # 由欄式檔匯出 CSV
+"""
+
+import os
+import glob
+import threading
+import pandas as pd
+from loguru import logger
+from config import get_market_data_path, load_config
+
+try:
+    import pyarrow  # noqa: F401  (Parquet / Feather 後端)
+    _ARROW_AVAILABLE = True
+except Exception:
+    _ARROW_AVAILABLE = False
+
+# Load config.json
+config = load_config()
+
+STORE = config.get("market_store", {})
+PRICE_COLUMNS = ["open", "high", "low", "close", "change"]
+COLUMNS = ["date", "symbol"] + PRICE_COLUMNS + ["volume"]
+_EXTENSIONS = {"parquet": "parquet", "feather": "feather"}
+
+# 同一次執行中重複讀取同一檔案時直接回傳記憶體副本：key = path → (mtime_ns, size, df)
+_frame_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _store_format():
+    fmt = STORE.get("format", "parquet")
+    if fmt not in _EXTENSIONS or not _ARROW_AVAILABLE:
+        return None
+    return fmt
+
+
+def get_store_path(symbol, timeframe="daily", market_dir=None):
+    """Path of the columnar file for symbol/timeframe (None when no columnar backend is available)."""
+    fmt = _store_format()
+    if fmt is None:
+        return None
+    return get_market_data_path(symbol, timeframe, ext=_EXTENSIONS[fmt], market_dir=market_dir)
+
+
+def normalize_frame(df, symbol=None):
+    """Coerce a raw market frame to the store schema (typed columns, parsed UTC dates, sorted)."""
+    df = df.copy()
+    df["date"] = pd.to_datetime(df["date"], utc=True, errors="coerce")
+    df = df.dropna(subset=["date"])
+    if "symbol" not in df.columns:
+        df["symbol"] = symbol
+    df["symbol"] = df["symbol"].astype("category")
+    price_dtype = STORE.get("price_dtype", "float64")
+    for col in PRICE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(price_dtype)
+    if "volume" in df.columns:
+        df["volume"] = pd.to_numeric(df["volume"], errors="coerce").astype("float64")
+    return df.sort_values("date", kind="stable").reset_index(drop=True)
+
+
+def _read_file(path):
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    if path.endswith(".feather"):
+        return pd.read_feather(path)
+    return pd.read_csv(path)
+
+
+def _resolve_source(symbol, timeframe, market_dir):
+    """Pick the freshest existing file: columnar store if not older than the CSV export."""
+    csv_path = get_market_data_path(symbol, timeframe, market_dir=market_dir)
+    store_path = get_store_path(symbol, timeframe, market_dir)
+    csv_exists = os.path.exists(csv_path)
+    if store_path and os.path.exists(store_path):
+        if not csv_exists or os.path.getmtime(store_path) >= os.path.getmtime(csv_path):
+            return store_path
+    return csv_path if csv_exists else None
+
+
+def load_market_data(symbol, timeframe="daily", market_dir=None, index=False):
+    """
+    Unified loader for market history.
+    Returns a typed DataFrame (see module docstring), or None when no data file exists.
+    index=True returns the frame indexed by `date`.
+    """
+    path = _resolve_source(symbol, timeframe, market_dir)
+    if path is None:
+        return None
+    stat = os.stat(path)
+    with _cache_lock:
+        cached = _frame_cache.get(path)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        df = cached[2]
+    else:
+        df = normalize_frame(_read_file(path), symbol)
+        with _cache_lock:
+            _frame_cache[path] = (stat.st_mtime_ns, stat.st_size, df)
+    df = df.copy()
+    if index:
+        df = df.set_index("date")
+    return df
+
+
+def save_market_data(symbol, timeframe, df, market_dir=None, export_csv=None):
+    """Write a market frame to the columnar store (and optionally re-export the CSV)."""
+    typed = normalize_frame(df, symbol)
+    store_path = get_store_path(symbol, timeframe, market_dir)
+    if store_path:
+        os.makedirs(os.path.dirname(store_path) or ".", exist_ok=True)
+        if store_path.endswith(".parquet"):
+            typed.to_parquet(store_path, index=False)
+        else:
+            typed.to_feather(store_path)
+    if export_csv is None:
+        # 沒有欄式後端時 CSV 就是唯一的持久副本
+        export_csv = STORE.get("export_csv", True) or store_path is None
+    if export_csv:
+        export_csv_file(symbol, timeframe, typed, market_dir)
+    return typed
+
+
+def export_csv_file(symbol, timeframe, df=None, market_dir=None):
+    """Export the stored frame back to the legacy CSV layout (date strings, same columns)."""
+    if df is None:
+        df = load_market_data(symbol, timeframe, market_dir)
+        if df is None:
+            return None
+    fmt = "%Y-%m-%d" if timeframe == "daily" else "%Y-%m-%d %H:%M:%S"
+    out = df[[c for c in COLUMNS if c in df.columns]].copy()
+    out["date"] = out["date"].dt.strftime(fmt)
+    csv_path = get_market_data_path(symbol, timeframe, market_dir=market_dir)
+    out.to_csv(csv_path, index=False)
+    return csv_path
+
+
+def _iter_csv_files(market_dir):
+    for path in sorted(glob.glob(os.path.join(market_dir, "*.csv"))):
+        timeframe, _, _ = os.path.basename(path).partition("_")
+        if timeframe in ("daily", "hourly"):
+            yield timeframe, path
+
+
+def migrate_csv_to_store(market_dir=None):
+    """Convert every {timeframe}_{symbol}.csv under market_dir into the columnar store."""
+    market_dir = market_dir or config["data_paths"]["market"]
+    if _store_format() is None:
+        logger.warning("未安裝 pyarrow 或 market_store.format 無效，維持 CSV 儲存")
+        return 0
+    migrated = 0
+    for timeframe, csv_path in _iter_csv_files(market_dir):
+        try:
+            raw = pd.read_csv(csv_path)
+            if raw.empty or "symbol" not in raw.columns:
+                continue
+            symbol = str(raw["symbol"].iloc[0])
+            save_market_data(symbol, timeframe, raw, market_dir, export_csv=False)
+            migrated += 1
+        except Exception as e:
+            logger.error(f"轉換 {csv_path} 失敗: {e}")
+    logger.info(f"已轉換 {migrated} 個 CSV 至欄式儲存 ({_store_format()})")
+    return migrated
+
+
+def export_store_to_csv(market_dir=None):
+    """Re-export every columnar file under market_dir to CSV."""
+    market_dir = market_dir or config["data_paths"]["market"]
+    fmt = _store_format()
+    if fmt is None:
+        return 0
+    exported = 0
+    for path in sorted(glob.glob(os.path.join(market_dir, f"*.{_EXTENSIONS[fmt]}"))):
+        timeframe, _, _ = os.path.basename(path).partition("_")
+        df = normalize_frame(_read_file(path))
+        if df.empty:
+            continue
+        export_csv_file(str(df["symbol"].iloc[0]), timeframe, df, market_dir)
+        exported += 1
+    logger.info(f"已匯出 {exported} 個 CSV")
+    return exported
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="市場數據欄式儲存工具")
+    parser.add_argument("--migrate", action="store_true", help="將現有 CSV 轉成欄式檔")
+    parser.add_argument("--export", action="store_true", help="由欄式檔匯出 CSV")
+    parser.add_argument("--market-dir", default=None)
+    args = parser.parse_args()
+    if args.migrate:
+        migrate_csv_to_store(args.market_dir)
+    elif args.export:
+        export_store_to_csv(args.market_dir)
+    else:
+        parser.print_help()
@@ -0,0 +1,212 @@
+"""
+news_fetcher.py - 非同步 RSS/Atom 新聞抓取 (httpx + 條件式 GET 快取)
+
+- 所有 feed 以 asyncio 併發抓取，共用一個 httpx.AsyncClient 連線池；
+  慢的 feed (例如 theinformation.com) 最多只花一次 timeout，且與其他 feed 平行。
+- ETag / Last-Modified 與解析後的 items 存在 data/news/feed_cache.json，
+  feed 未變動時伺服器回 304，直接用快取 items，不再解析。
+- 以 XMLPullParser 串流解析，讀到 `limit` 則 item/entry 後即停止下載；遇到嚴格 XML 解析不了的 feed
+  (未定義的 HTML entity、略為損壞的標記) 改以 BeautifulSoup 容錯重新解析，至少保留已解析的 items。
+- 每個 feed 整體 (連線 + 下載) 以 asyncio.wait_for 限制在 timeout 秒內。
+
+用法：
+    from news_fetcher import fetch_all_news
+    feeds = fetch_all_news(urls, limit=3)   # {url: [{"title", "description"}, ...]}
+"""
+
+import os
+import json
+import asyncio
+import datetime
+import threading
+import xml.etree.ElementTree as ET
+import httpx
+from loguru import logger
+from config import load_config
+from tracing import span
+
+# Load config.json
+config = load_config()
+
+NEWS_FETCH = config.get("news_fetch", {})
+CACHE_PATH = os.path.join(config["data_paths"]["news"], "feed_cache.json")
+HEADERS = {"User-Agent": "daily-podcast-stk/1.0 (+https://timhun.github.io/daily-podcast-stk)"}
+
+_ITEM_TAGS = {"item", "entry"}
+_BODY_TAGS = ("description", "summary", "content")
+_cache_lock = threading.Lock()
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _item_from_element(elem):
+    fields = {}
+    for child in elem:
+        name = _local(child.tag)
+        if name not in fields:
+            fields[name] = "".join(child.itertext()).strip()
+    title = fields.get("title")
+    description = next((fields[t] for t in _BODY_TAGS if fields.get(t)), None)
+    if title and description:
+        return {"title": title, "description": description}
+    return None
+
+
+class _FeedParser:
+    """Incremental RSS/Atom parser that reports when `limit` items have been read."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.items = []
+        self.seen = 0
+        self.error = None
+        self._raw = bytearray()
+        self._parser = ET.XMLPullParser(events=("end",))
+
+    @property
+    def done(self):
+        return self.seen >= self.limit
+
+    def feed(self, chunk):
+        self._raw.extend(chunk)
+        if self.error is not None:
+            return
+        try:
+            self._parser.feed(chunk)
+            events = list(self._parser.read_events())
+        except ET.ParseError as e:
+            self.error = e
+            return
+        for _, elem in events:
+            if _local(elem.tag) not in _ITEM_TAGS:
+                continue
+            self.seen += 1
+            item = _item_from_element(elem)
+            if item:
+                self.items.append(item)
+            elem.clear()
+            if self.done:
+                break
+
+    def recover(self):
+        """Items after a strict parse error: a lenient re-parse of the whole body, else the items read so far."""
+        recovered = _recover_items(bytes(self._raw), self.limit)
+        return recovered if recovered is not None and len(recovered) >= len(self.items) else self.items
+
+
+def _recover_items(content, limit):
+    """Lenient RSS/Atom parse with BeautifulSoup (lxml "xml" builder when installed); None without bs4."""
+    try:
+        from bs4 import BeautifulSoup, FeatureNotFound
+    except ImportError:
+        return None
+    try:
+        soup = BeautifulSoup(content, "xml")
+    except FeatureNotFound:
+        soup = BeautifulSoup(content, "html.parser")
+    items = []
+    for elem in soup.find_all(list(_ITEM_TAGS), limit=limit):
+        title = elem.find("title")
+        body = next((tag for tag in (elem.find(name) for name in _BODY_TAGS) if tag and tag.get_text(strip=True)), None)
+        if title and title.get_text(strip=True) and body:
+            items.append({"title": title.get_text(strip=True), "description": body.get_text(strip=True)})
+    return items
+
+
+def load_feed_cache(path=CACHE_PATH):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"讀取 feed 快取失敗: {e}")
+        return {}
+
+
+def save_feed_cache(entries, path=CACHE_PATH):
+    """Merge updated entries into the on-disk cache (atomic replace)."""
+    with _cache_lock:
+        cache = load_feed_cache(path)
+        cache.update(entries)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+
+async def _fetch_feed(client, url, cached, limit):
+    """Return (items, cache entry or None) for one feed."""
+    headers = {}
+    if cached and cached.get("limit", 0) >= limit:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    try:
+        async with client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 304:
+                logger.info(f"新聞 {url} 未變動 (304)，使用快取")
+                return cached["items"][:limit], None
+            response.raise_for_status()
+            parser = _FeedParser(limit)
+            async for chunk in response.aiter_bytes():
+                parser.feed(chunk)
+                if parser.done:
+                    break
+            items = parser.items
+            if parser.error is not None:
+                items = parser.recover()
+                logger.warning(f"新聞 {url} 非嚴格 XML ({parser.error})，容錯解析取得 {len(items)} 則")
+            entry = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "items": items,
+                "limit": limit,
+                "fetched_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            }
+            return items, entry
+    except Exception as e:
+        logger.error(f"抓取新聞 {url} 失敗: {type(e).__name__}: {str(e)}")
+        return [], None
+
+
+async def _traced_fetch_feed(client, url, cached, limit, timeout):
+    # feeds are awaited concurrently on one thread: async span (b/e pair) instead of nested X events
+    with span("feed", cat="fetch", asynchronous=True, url=url) as args:
+        try:
+            # httpx 的 timeout 只限制單次 connect / read；慢慢滴資料的 feed 需要整體上限
+            items, entry = await asyncio.wait_for(_fetch_feed(client, url, cached, limit), timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"抓取新聞 {url} 逾時 ({timeout}s)")
+            items, entry = [], None
+        args.update(items=len(items), not_modified=entry is None)
+        return items, entry
+
+
+async def fetch_all_news_async(urls, limit=3, timeout=None, client=None):
+    """Fetch every feed concurrently; returns {url: items} in the order of `urls`."""
+    cache = load_feed_cache()
+    timeout = timeout or NEWS_FETCH.get("timeout", 10)
+    owns_client = client is None
+    if owns_client:
+        client = httpx.AsyncClient(timeout=timeout, headers=HEADERS, follow_redirects=True)
+    try:
+        results = await asyncio.gather(*(_traced_fetch_feed(client, url, cache.get(url), limit, timeout) for url in urls))
+    finally:
+        if owns_client:
+            await client.aclose()
+    updated = {url: entry for url, (_, entry) in zip(urls, results) if entry is not None}
+    if updated:
+        save_feed_cache(updated)
+    return {url: items for url, (items, _) in zip(urls, results)}
+
+
+def fetch_all_news(urls, limit=3, timeout=None):
+    """Synchronous entry point for fetch_all_news_async."""
+    if not urls:
+        return {}
+    return asyncio.run(fetch_all_news_async(list(urls), limit, timeout))
@@ -34,6 +34,8 @@ from datetime import datetime, timedelta
 from enum import Enum
 from collections import defaultdict
 import threading
+from contextlib import contextmanager
+from tracing import span
 
 # Load .env file for API keys
 try:
@@ -262,9 +264,26 @@ def _get_api_key(model_key: str) -> Optional[str]:
 # Provider 呼叫器
 # ============================================================================
 
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+@contextmanager
+def _http_session():
+    """
+    共用的 httpx.Client (連線池跨呼叫、跨執行緒重用，TLS 只握手一次)。
+    httpx.Client 為 thread-safe；離開 with 不關閉連線池。
+    """
+    global _http_client
+    import httpx
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(timeout=180)
+    yield _http_client
+
+
 def _call_nvidia(prompt, model_config, system=None, temperature=0.7, max_tokens=None, **kwargs):
     """呼叫 NVIDIA NIM API"""
-    import httpx
     
     messages = []
     if system:
@@ -289,7 +308,7 @@ def _call_nvidia(prompt, model_config, system=None, temperature=0.7, max_tokens=
     }
     
     try:
-        with httpx.Client(timeout=180) as client:
+        with _http_session() as client:
             response = client.post(
                 f"{model_config.endpoint}/chat/completions",
                 headers=headers,
@@ -305,7 +324,6 @@ def _call_nvidia(prompt, model_config, system=None, temperature=0.7, max_tokens=
 
 def _call_gemini(prompt, model_config, system=None, temperature=0.7, max_tokens=None, **kwargs):
     """呼叫 Google Gemini API"""
-    import httpx
     
     api_key = os.getenv(model_config.api_key_env)
     if not api_key:
@@ -327,7 +345,7 @@ def _call_gemini(prompt, model_config, system=None, temperature=0.7, max_tokens=
     }
     
     try:
-        with httpx.Client(timeout=180) as client:
+        with _http_session() as client:
             url = f"{model_config.endpoint}/v1beta/models/{model_config.name}:generateContent?key={api_key}"
             response = client.post(url, json=payload)
             response.raise_for_status()
@@ -340,7 +358,6 @@ def _call_gemini(prompt, model_config, system=None, temperature=0.7, max_tokens=
 
 def _call_openai_compatible(prompt, model_config, system=None, temperature=0.7, max_tokens=None, **kwargs):
     """呼叫 OpenAI 兼容 API (Groq, xAI, OpenAI, OpenRouter)"""
-    import httpx
     
     api_key = os.getenv(model_config.api_key_env)
     if not api_key:
@@ -365,7 +382,7 @@ def _call_openai_compatible(prompt, model_config, system=None, temperature=0.7,
     }
     
     try:
-        with httpx.Client(timeout=180) as client:
+        with _http_session() as client:
             response = client.post(
                 f"{model_config.endpoint}/chat/completions",
                 headers=headers,
@@ -381,7 +398,6 @@ def _call_openai_compatible(prompt, model_config, system=None, temperature=0.7,
 
 def _call_ollama(prompt, model_config, system=None, temperature=0.7, max_tokens=None, **kwargs):
     """呼叫 Ollama 本地 API"""
-    import httpx
     
     # Ollama 不需要 API key
     messages = []
@@ -400,7 +416,7 @@ def _call_ollama(prompt, model_config, system=None, temperature=0.7, max_tokens=
     }
     
     try:
-        with httpx.Client(timeout=180) as client:
+        with _http_session() as client:
             response = client.post(
                 f"{model_config.endpoint}/api/chat",
                 json=payload
@@ -489,14 +505,16 @@ def call_nim(
     
     logger.info(f"NIM API 呼叫: task_type={task_type}, model={model} ({model_config.provider})")
     
-    result = caller(
-        prompt=prompt,
-        model_config=model_config,
-        system=system,
-        temperature=temperature,
-        max_tokens=max_tokens,
-        **kwargs
-    )
+    with span("call_nim", cat="llm", task_type=task_type, model=model, provider=model_config.provider) as trace_args:
+        result = caller(
+            prompt=prompt,
+            model_config=model_config,
+            system=system,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs
+        )
+        trace_args["chars"] = len(result) if result else 0
     
     if result:
         logger.info(f"NIM API 成功: {len(result)} 字元")
@@ -0,0 +1,162 @@
+"""
+pipeline_runner.py - 可續跑的 podcast 流程 (stage 檢查點 + 執行紀錄)
+
+每個 stage 的輸入 (JSON 可序列化的小字典，通常含上游 stage 的輸出摘要) 取 sha256 作為 key，
+輸出以 pickle 存成 docs/podcast/{today}_{mode}/checkpoints/{stage}-{key}.pkl，
+因此同樣輸入必得同樣輸出檔；下游 stage 的 key 又包含上游輸出的摘要，整條鏈是內容定址的。
+
+    runner = StageRunner(run_dir, STAGES, resume=True)
+    data = runner.run("collect", lambda: collect_data(mode), {"mode": mode, "today": today})
+    runner.finish()
+
+- resume=True          輸入未變 (且宣告的輸出檔仍在) 的 stage 直接載入檢查點
+- from_stage="audio"   audio 之前的 stage 載入檢查點，audio 與其後強制重跑
+- only_stage="rss"     只重跑 rss，之前載入檢查點，之後的 stage 不執行 (PipelineStop)
+每個 stage 的狀態與耗時寫入 run_manifest.json。
+"""
+
+import os
+import json
+import time
+import pickle
+import hashlib
+import datetime
+from loguru import logger
+from tracing import span, profile_stage
+
+MANIFEST_NAME = "run_manifest.json"
+
+
+class PipelineStop(Exception):
+    """Raised by StageRunner.run for stages after --only-stage."""
+
+
+def digest_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def digest_file(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def digest_inputs(stage, inputs):
+    payload = json.dumps({"stage": stage, "inputs": inputs}, sort_keys=True, ensure_ascii=False, default=str)
+    return digest_bytes(payload.encode("utf-8"))
+
+
+class StageRunner:
+    def __init__(self, run_dir, stages, resume=False, from_stage=None, only_stage=None, meta=None):
+        for name in (from_stage, only_stage):
+            if name is not None and name not in stages:
+                raise ValueError(f"未知的 stage: {name}（可用: {', '.join(stages)}）")
+        self.run_dir = run_dir
+        self.stages = list(stages)
+        self.resume = resume
+        self.from_stage = from_stage
+        self.only_stage = only_stage
+        self.checkpoint_dir = os.path.join(run_dir, "checkpoints")
+        self.outputs = {}  # stage → output digest (for downstream input keys)
+        self.started = time.perf_counter()
+        self.manifest = {
+            **(meta or {}),
+            "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "resume": resume,
+            "from_stage": from_stage,
+            "only_stage": only_stage,
+            "stages": [],
+        }
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+
+    # ── policy ──
+    def _position(self, stage):
+        return self.stages.index(stage)
+
+    def _forced(self, stage):
+        """True when the stage must run even if a matching checkpoint exists."""
+        target = self.only_stage or self.from_stage
+        if target is None:
+            return not self.resume
+        if self.only_stage is not None:
+            return stage == self.only_stage
+        return self._position(stage) >= self._position(self.from_stage)
+
+    def _after_only(self, stage):
+        return self.only_stage is not None and self._position(stage) > self._position(self.only_stage)
+
+    def digest(self, stage):
+        """Output digest of an already executed/loaded stage."""
+        return self.outputs[stage]
+
+    # ── checkpoints ──
+    def _checkpoint_path(self, stage, key):
+        return os.path.join(self.checkpoint_dir, f"{stage}-{key[:16]}.pkl")
+
+    def _output_digest(self, payload, files):
+        file_digests = [digest_file(p) if os.path.exists(p) else "missing" for p in files]
+        return digest_bytes(payload + "".join(file_digests).encode("ascii"))
+
+    def run(self, stage, fn, inputs, files=(), checkpoint=None):
+        """
+        Execute or restore one stage.
+        inputs: JSON-serializable dict describing everything the stage depends on.
+        files: output files the stage writes; a checkpoint is only reused when they all exist.
+        checkpoint: optional function selecting what to persist from the result (e.g. drop bulky caches).
+        """
+        if self._after_only(stage):
+            raise PipelineStop(stage)
+        key = digest_inputs(stage, inputs)
+        path = self._checkpoint_path(stage, key)
+        record = {"name": stage, "input_key": key, "checkpoint": os.path.relpath(path, self.run_dir)}
+        started = time.perf_counter()
+
+        if not self._forced(stage) and os.path.exists(path) and all(os.path.exists(p) for p in files):
+            with open(path, "rb") as f:
+                payload = f.read()
+            result = pickle.loads(payload)
+            record["status"] = "cached"
+            logger.info(f"stage {stage}: 輸入未變，載入檢查點 {record['checkpoint']}")
+        else:
+            if not self._forced(stage) and (self.only_stage or self.from_stage):
+                logger.warning(f"stage {stage}: 找不到符合的檢查點，重新執行")
+            label = "_".join(str(part) for part in (self.manifest.get("mode"), stage) if part)
+            try:
+                with span(stage, cat="stage", mode=self.manifest.get("mode")), profile_stage(label):
+                    result = fn()
+            except Exception as e:
+                record.update(status="failed", error=f"{type(e).__name__}: {e}", seconds=round(time.perf_counter() - started, 3))
+                self._record(record)
+                raise
+            payload = pickle.dumps(checkpoint(result) if checkpoint else result, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+            record["status"] = "ran"
+
+        self.outputs[stage] = self._output_digest(payload, files)
+        record.update(output_digest=self.outputs[stage], seconds=round(time.perf_counter() - started, 3))
+        self._record(record)
+        logger.info(f"stage {stage}: {record['status']} ({record['seconds']:.2f}s)")
+        return result
+
+    # ── manifest ──
+    def _record(self, record):
+        self.manifest["stages"].append(record)
+        self._write_manifest()
+
+    def _write_manifest(self):
+        path = os.path.join(self.run_dir, MANIFEST_NAME)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def finish(self):
+        self.manifest["finished_at"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        self.manifest["total_seconds"] = round(time.perf_counter() - self.started, 3)
+        self._write_manifest()
+        return self.manifest
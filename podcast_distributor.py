@@ -1,5 +1,6 @@
 import os
 import datetime
+import threading
 import pytz
 import xml.etree.ElementTree as ET
 try:
@@ -8,17 +9,16 @@ except Exception:
     MP3 = None
 from feedgen.feed import FeedGenerator
 from loguru import logger
-import json
+from config import load_config
 from cloud_manager import upload_rss
+from market_store import load_market_data
 try:
     from slack_sdk import WebClient
 except Exception:
     WebClient = None
-import pandas as pd  # 新增：用於計算報酬
 
 # 載入 config.json
-with open('config.json', 'r', encoding='utf-8') as f:
-    config = json.load(f)
+config = load_config()
 
 # 設置日誌
 logger.add(config['logging']['file'], rotation=config['logging']['rotation'])
@@ -27,6 +27,7 @@ logger.add(config['logging']['file'], rotation=config['logging']['rotation'])
 B2_BASE = f"https://f005.backblazeb2.com/file/{config['b2_podcast_prefix']}"
 RSS_FILE = config['data_paths']['rss']
 COVER_URL = "https://timhun.github.io/daily-podcast-stk/img/cover.jpg"
+_rss_lock = threading.Lock()  # podcast.xml 為兩個節目共用，讀取→合併→寫回須序列化
 
 FIXED_DESCRIPTION = """(測試階段)一個適合上班族在最短時間做短線交易策略的節目!
 每集節目由涵蓋最新市場數據與 AI 趨勢，專注市值型ETF短線交易策略(因為你沒有無限資金可以東買買西買買，更沒有時間研究個股)！
@@ -110,6 +111,12 @@ def parse_existing_rss(rss_path):
     return existing_entries
 
 def generate_rss(date, mode, script, audio_url, strategy_results):
+    """Add today's episode to the shared feed; serialized because `--mode both` publishes two shows at once."""
+    with _rss_lock:
+        _generate_rss(date, mode, script, audio_url, strategy_results)
+
+
+def _generate_rss(date, mode, script, audio_url, strategy_results):
     # 初始化 Feed
     fg = FeedGenerator()
     fg.load_extension("podcast")
@@ -290,11 +297,8 @@ QQQ：{qqq_position_suggest}
 def calculate_yesterday_return(symbol):
     """計算昨日報酬：從CSV最後兩日close計算"""
     try:
-        file_path = f"{config['data_paths']['market']}/daily_{symbol.replace('^', '').replace('.', '_').replace('-', '_')}.csv"
-        if os.path.exists(file_path):
-            df = pd.read_csv(file_path)
-            df['date'] = pd.to_datetime(df['date'])
-            df = df.sort_values('date')
+        df = load_market_data(symbol, 'daily', market_dir=config['data_paths']['market'])
+        if df is not None:
             if len(df) >= 2:
                 return ((df['close'].iloc[-1] - df['close'].iloc[-2]) / df['close'].iloc[-2]) * 100
         return 0.0
@@ -0,0 +1,249 @@
+"""
+price_panel.py - 交易日曆對齊的多標的價格面板 (NumPy memmap)
+
+config.json `symbols` 的每個群組 (tw / us / commodities) 各自一個面板：
+    data/market/panel/{group}_{timeframe}.npy   float64, shape = (時間, 標的, 欄位)
+    data/market/panel/{group}_{timeframe}.json  日曆、標的、欄位與每個標的的資料指紋
+
+日曆為該群組所有標的日期的聯集 (TW 與 US 各自獨立)，標的當天沒有資料則為 NaN。
+面板以 np.load(mmap_mode="r") 開啟，欄位取用皆為零拷貝 view，
+其他 process 直接開同一個檔案即可共享，不需 pickle DataFrame；
+symbol_frame() 回傳與 load_market_data 同形狀的單一標的資料，供 MarketAnalyst / 策略直接取用。
+
+每次 collect_data 後呼叫 update_panel()：只重寫資料指紋有變的標的；
+日曆只在尾端延長時沿用舊區塊，其餘情況才完整重建。
+"""
+
+import os
+import json
+import threading
+import numpy as np
+import pandas as pd
+from loguru import logger
+from config import load_config
+from market_store import load_market_data
+
+# Load config.json
+config = load_config()
+
+FIELDS = ["open", "high", "low", "close", "volume"]
+PANEL_DIR = os.path.join(config["data_paths"]["market"], "panel")
+
+_panel_cache = {}
+_panel_lock = threading.Lock()
+
+
+def group_of(symbol):
+    """Return the config `symbols` group (tw/us/commodities) that contains symbol."""
+    for group, symbols in config["symbols"].items():
+        if symbol in symbols:
+            return group
+    return None
+
+
+def _paths(group, timeframe, panel_dir=None):
+    base = os.path.join(panel_dir or PANEL_DIR, f"{group}_{timeframe}")
+    return base + ".npy", base + ".json"
+
+
+def _calendar_key(dates, timeframe):
+    """Daily bars align on the calendar day; hourly bars on the exact timestamp."""
+    return dates.dt.floor("D") if timeframe == "daily" else dates
+
+
+def _fingerprint(df):
+    if df is None or df.empty:
+        return None
+    return [len(df), df["date"].iloc[-1].isoformat(), float(np.nansum(df["close"].to_numpy(dtype=float)))]
+
+
+class PricePanel:
+    """Read-only view over a (time × symbol × field) memmap."""
+
+    def __init__(self, values, dates, symbols, fields, fingerprints=None):
+        self.values = values
+        self.dates = dates
+        self.symbols = list(symbols)
+        self.fields = list(fields)
+        self.fingerprints = fingerprints or {}
+        self._symbol_idx = {s: i for i, s in enumerate(self.symbols)}
+        self._field_idx = {f: i for i, f in enumerate(self.fields)}
+
+    def __contains__(self, symbol):
+        return symbol in self._symbol_idx
+
+    def column(self, symbol, field="close"):
+        """Zero-copy 1-D view of one field for one symbol, aligned to self.dates."""
+        return self.values[:, self._symbol_idx[symbol], self._field_idx[field]]
+
+    def series(self, symbol, field="close", dropna=True):
+        s = pd.Series(self.column(symbol, field), index=self.dates, name=field, copy=False)
+        return s.dropna() if dropna else s
+
+    def frame(self, symbol, fields=None, dropna=True):
+        """DataFrame of the requested fields for symbol, indexed by the panel calendar."""
+        fields = fields or self.fields
+        df = pd.DataFrame({f: self.column(symbol, f) for f in fields}, index=self.dates)
+        df.index.name = "date"
+        return df.dropna(subset=["close"] if "close" in fields else None) if dropna else df
+
+    def matrix(self, symbols, field="close"):
+        """(time × len(symbols)) array of one field; a view when symbols are contiguous."""
+        idx = [self._symbol_idx[s] for s in symbols]
+        return self.values[:, idx, self._field_idx[field]]
+
+    def is_current(self, symbol, df):
+        """True when the panel columns of symbol were built from exactly this frame."""
+        return symbol in self and self.fingerprints.get(symbol) == _fingerprint(_clean(df))
+
+
+def load_panel(group, timeframe="daily", panel_dir=None):
+    """Open the memmapped panel for group/timeframe (cached per file mtime); None if not built."""
+    npy_path, meta_path = _paths(group, timeframe, panel_dir)
+    if not (os.path.exists(npy_path) and os.path.exists(meta_path)):
+        return None
+    stamp = (os.path.getmtime(npy_path), os.path.getmtime(meta_path))
+    with _panel_lock:
+        cached = _panel_cache.get(npy_path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    values = np.load(npy_path, mmap_mode="r")
+    panel = PricePanel(values, pd.DatetimeIndex(pd.to_datetime(meta["dates"], utc=True)), meta["symbols"], meta["fields"],
+                       meta.get("fingerprints"))
+    with _panel_lock:
+        _panel_cache[npy_path] = (stamp, panel)
+    return panel
+
+
+def load_panel_for(symbol, timeframe="daily", panel_dir=None):
+    """Panel of the group containing symbol, or None when unavailable."""
+    group = group_of(symbol)
+    if group is None:
+        return None
+    panel = load_panel(group, timeframe, panel_dir)
+    return panel if panel is not None and symbol in panel else None
+
+
+def symbol_frame(symbol, timeframe="daily", panel_dir=None):
+    """
+    Store-shaped frame (date column + symbol + OHLCV, like load_market_data) read from the panel,
+    or None when the panel does not cover symbol. Lets other processes skip re-parsing the store.
+    """
+    panel = load_panel_for(symbol, timeframe, panel_dir)
+    if panel is None:
+        return None
+    df = panel.frame(symbol).reset_index()
+    if df.empty:
+        return None
+    df.insert(1, "symbol", symbol)
+    return df
+
+
+def _clean(df):
+    """Rows the panel keeps: positive close, one row per date (last wins)."""
+    if df is None:
+        return None
+    return df[df["close"] > 0].drop_duplicates(subset="date", keep="last")
+
+
+def _fill_symbol(values, calendar_pos, s_idx, df, timeframe):
+    values[:, s_idx, :] = np.nan
+    if df is None or df.empty:
+        return
+    keys = _calendar_key(df["date"], timeframe)
+    rows = calendar_pos.get_indexer(keys)
+    ok = rows >= 0
+    for f_idx, field in enumerate(FIELDS):
+        values[rows[ok], s_idx, f_idx] = df[field].to_numpy(dtype=np.float64)[ok] if field in df.columns else np.nan
+
+
+def update_panel(group, timeframe="daily", market_dir=None, panel_dir=None, frames=None):
+    """
+    Incrementally (re)build the panel for one symbol group.
+    frames: optional {symbol: typed frame} already in memory (MarketBundle); others are read from the store.
+    Returns the number of symbols whose columns were rewritten.
+    """
+    symbols = config["symbols"].get(group, [])
+    if not symbols:
+        return 0
+    market_dir = market_dir or config["data_paths"]["market"]
+    npy_path, meta_path = _paths(group, timeframe, panel_dir)
+    os.makedirs(os.path.dirname(npy_path), exist_ok=True)
+
+    frames = frames or {}
+    clean = {}
+    for symbol in symbols:
+        df = frames[symbol] if symbol in frames else load_market_data(symbol, timeframe, market_dir=market_dir)
+        clean[symbol] = _clean(df)
+    fingerprints = {s: _fingerprint(df) for s, df in clean.items()}
+    keys = [_calendar_key(df["date"], timeframe) for df in clean.values() if df is not None and not df.empty]
+    if not keys:
+        logger.warning(f"{group} {timeframe} 無任何市場數據，略過面板建置")
+        return 0
+    calendar = pd.DatetimeIndex(pd.concat(keys).drop_duplicates().sort_values())
+
+    meta = None
+    if os.path.exists(npy_path) and os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    old_dates = pd.DatetimeIndex(pd.to_datetime(meta["dates"], utc=True)) if meta else None
+    reusable = (
+        meta is not None
+        and meta["symbols"] == symbols
+        and meta["fields"] == FIELDS
+        and len(old_dates) <= len(calendar)
+        and calendar[: len(old_dates)].equals(old_dates)
+    )
+
+    if reusable and len(old_dates) == len(calendar):
+        values = np.load(npy_path, mmap_mode="r+")
+        changed = [s for s in symbols if meta["fingerprints"].get(s) != fingerprints[s]]
+    else:
+        tmp_path = npy_path + ".tmp.npy"
+        values = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float64, shape=(len(calendar), len(symbols), len(FIELDS)))
+        values[:] = np.nan
+        if reusable:
+            old = np.load(npy_path, mmap_mode="r")
+            values[: len(old_dates)] = old
+            del old
+            changed = [s for s in symbols if meta["fingerprints"].get(s) != fingerprints[s]]
+        else:
+            changed = list(symbols)
+
+    for symbol in changed:
+        _fill_symbol(values, calendar, symbols.index(symbol), clean[symbol], timeframe)
+    values.flush()
+    del values
+    if not (reusable and len(old_dates) == len(calendar)):
+        os.replace(tmp_path, npy_path)
+
+    # meta 在資料 flush 之後才以 tmp + os.replace 換上：讀取端不會看到寫到一半的 JSON
+    tmp_meta = f"{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_meta, "w", encoding="utf-8") as f:
+        json.dump({
+            "group": group,
+            "timeframe": timeframe,
+            "dates": [d.isoformat() for d in calendar],
+            "symbols": symbols,
+            "fields": FIELDS,
+            "fingerprints": fingerprints,
+        }, f, ensure_ascii=False)
+    os.replace(tmp_meta, meta_path)
+    logger.info(f"價格面板 {group}_{timeframe}: {len(calendar)} 期 × {len(symbols)} 標的，更新 {len(changed)} 個標的")
+    return len(changed)
+
+
+def update_all_panels(market_dir=None, panel_dir=None):
+    """Rebuild every group's daily and hourly panels (incremental)."""
+    for group in config["symbols"]:
+        for timeframe in ("daily", "hourly"):
+            try:
+                update_panel(group, timeframe, market_dir, panel_dir)
+            except Exception as e:
+                logger.error(f"價格面板 {group}_{timeframe} 建置失敗: {e}")
+
+
+if __name__ == "__main__":
+    update_all_panels()
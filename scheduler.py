@@ -19,9 +19,8 @@ from loguru import logger
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # 載入設定
-import json
-with open('config.json', 'r', encoding='utf-8') as f:
-    config = json.load(f)
+from config import load_config
+config = load_config()
 
 # 設定日誌
 logger.add(config['logging']['file'], rotation=config['logging']['rotation'])
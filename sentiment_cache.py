@@ -0,0 +1,117 @@
+"""
+sentiment_cache.py - 新聞標題情緒分數快取
+
+key = (情緒模型/層, 正規化標題的 sha1)，存於 data/sentiment/headline_cache.json。
+同一則標題在同一天 TW/US 兩次執行、以及整體/個股兩次彙總中只推論一次；
+未命中的標題去重後以批次送進 analyze_sentiments。
+
+    cache = SentimentCache()
+    results = cache.score(headlines, lambda batch: analyze_sentiments(batch, analyzer), model_id)
+    cache.stats()   # {"hits", "misses", "hit_rate", "inference_seconds"}
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+import unicodedata
+from loguru import logger
+from config import load_config
+
+# Load config.json
+config = load_config()
+
+SENTIMENT = config.get("sentiment", {})
+CACHE_PATH = os.path.join(config["data_paths"]["sentiment"], "headline_cache.json")
+
+_save_lock = threading.Lock()
+
+
+def normalize_headline(text):
+    """NFKC + collapsed whitespace so trivially different copies share one cache entry."""
+    return " ".join(unicodedata.normalize("NFKC", text or "").split())
+
+
+def headline_key(model_id, text):
+    digest = hashlib.sha1(normalize_headline(text).encode("utf-8")).hexdigest()
+    return f"{model_id}:{digest}"
+
+
+class SentimentCache:
+    def __init__(self, path=CACHE_PATH, max_entries=None):
+        self.path = path
+        self.max_entries = max_entries or SENTIMENT.get("cache_max_entries", 50000)
+        self.entries = self._load()
+        self._dirty = {}
+        self.hits = 0
+        self.misses = 0
+        self.inference_seconds = 0.0
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"讀取情緒快取失敗: {e}，重新建立")
+            return {}
+
+    def score(self, texts, infer, model_id):
+        """
+        Return one {"label", "score"} per text, in order.
+        `infer(list_of_texts)` is only called for unique headlines missing from the cache.
+        """
+        keys = [headline_key(model_id, t) for t in texts]
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key in self.entries or key in missing:
+                self.hits += 1
+            else:
+                self.misses += 1
+                missing[key] = text
+        if missing:
+            started = time.perf_counter()
+            results = infer(list(missing.values()))
+            self.inference_seconds += time.perf_counter() - started
+            for key, result in zip(missing, results):
+                entry = {"label": result["label"], "score": float(result["score"])}
+                self.entries[key] = entry
+                self._dirty[key] = entry
+        return [self.entries[key] for key in keys]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "inference_seconds": round(self.inference_seconds, 3),
+        }
+
+    def updates(self):
+        """Entries scored since the last save (e.g. to ship from a worker process to the parent)."""
+        return dict(self._dirty)
+
+    def merge(self, entries):
+        """Adopt entries scored elsewhere; they are persisted by the next save()."""
+        self.entries.update(entries)
+        self._dirty.update(entries)
+
+    def save(self):
+        """Merge new entries into the on-disk cache (other runs may have written meanwhile)."""
+        if not self._dirty:
+            return
+        with _save_lock:
+            merged = self._load()
+            merged.update(self._dirty)
+            if len(merged) > self.max_entries:
+                merged = dict(list(merged.items())[-self.max_entries:])
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(merged, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self.entries = merged
+            self._dirty = {}
@@ -0,0 +1,237 @@
+"""
+sentiment_history.py - 每日 × 標的 情緒時間序列 (回補 + 依日期併入價格資料)
+
+過去 main.py 把「今天」的情緒分數廣播到整段歷史，回測等於每一根 K 棒都看到今天的新聞。
+此模組由 data/news/YYYY-MM-DD/{tw,us}_news.json 回補每日每標的的情緒分數，
+存成 data/sentiment/history.parquet (無 pyarrow 時為 history.csv)：
+
+    date (datetime64, 新聞日) | market | symbol | sentiment_score | news_count | model | source_mtime
+
+- 回補以 ProcessPoolExecutor 平行處理，每個 worker 只載入一次情緒模型 (get_sentiment_analyzer)，
+  標題分數沿用 data/sentiment/headline_cache.json 快取，新分數由主程序統一寫回。
+- 增量：(date, market) 已處理且來源檔 mtime 未變者跳過；--rebuild 全部重算。
+- collect_data 每次執行以 record_day() 寫入當日各標的分數，歷史隨每日執行持續延伸。
+- attach_sentiment(df, symbol, latest_score) 依日期併入 sentiment_score 欄位 (無資料的日子為 0.0 中性)。
+
+    python sentiment_history.py                 # 增量回補
+    python sentiment_history.py --rebuild --workers 4
+"""
+
+import os
+import re
+import json
+import glob
+import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from loguru import logger
+from config import load_config
+
+try:
+    import pyarrow  # noqa: F401
+    _ARROW_AVAILABLE = True
+except Exception:
+    _ARROW_AVAILABLE = False
+
+# Load config.json
+config = load_config()
+
+SENTIMENT = config.get("sentiment", {})
+NEWS_DIR = config["data_paths"]["news"]
+HISTORY_BASE = os.path.join(config["data_paths"]["sentiment"], "history")
+COLUMNS = ["date", "market", "symbol", "sentiment_score", "news_count", "model", "source_mtime"]
+
+_DAY_DIR = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_history_cache = {}
+# `--mode both`: the tw / us collect threads both append to the history file (load → merge → save)
+_history_lock = threading.Lock()
+
+
+def history_path(base=HISTORY_BASE):
+    return base + (".parquet" if _ARROW_AVAILABLE else ".csv")
+
+
+def load_sentiment_history(path=None):
+    """Full history frame (empty with COLUMNS when nothing has been backfilled); cached per mtime."""
+    path = path or history_path()
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=COLUMNS)
+    stamp = os.stat(path).st_mtime_ns
+    cached = _history_cache.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    df = pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path)
+    df["date"] = pd.to_datetime(df["date"])
+    _history_cache[path] = (stamp, df)
+    return df
+
+
+def save_sentiment_history(df, path=None):
+    path = path or history_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df = df.sort_values(["date", "market", "symbol"], kind="stable").reset_index(drop=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if path.endswith(".parquet"):
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    _history_cache[path] = (os.stat(path).st_mtime_ns, df)
+
+
+def find_news_files(news_dir=NEWS_DIR):
+    """[(day, market, path, mtime)] for every archived {market}_news.json, oldest first."""
+    files = []
+    for path in sorted(glob.glob(os.path.join(news_dir, "*", "*_news.json"))):
+        day = os.path.basename(os.path.dirname(path))
+        market = os.path.basename(path)[: -len("_news.json")]
+        if _DAY_DIR.match(day) and market in config["symbols"]:
+            files.append((day, market, path, os.path.getmtime(path)))
+    return files
+
+
+def pending_news_files(files, history, rebuild=False):
+    """Drop (day, market) pairs already in history with an unchanged source file."""
+    if rebuild or history.empty:
+        return list(files)
+    done = {
+        (d.strftime("%Y-%m-%d"), m): t
+        for d, m, t in history[["date", "market", "source_mtime"]].drop_duplicates(["date", "market"]).itertuples(index=False)
+    }
+    return [f for f in files if done.get((f[0], f[1])) != f[3]]
+
+
+# ─────────────────────────────────────────────
+# Worker side (one sentiment model per process)
+# ─────────────────────────────────────────────
+def _init_worker():
+    from data_collector import get_sentiment_analyzer
+    get_sentiment_analyzer()
+
+
+def score_news_file(day, market, path, mtime):
+    """Score one archived news file; returns (rows, new headline-cache entries)."""
+    from data_collector import analyze_sentiments, get_sentiment_analyzer, get_sentiment_model_id, sentiment_score
+    from sentiment_cache import SentimentCache
+    from symbol_matcher import get_matcher
+
+    with open(path, "r", encoding="utf-8") as f:
+        items = json.load(f)
+    analyzer, _ = get_sentiment_analyzer()
+    model_id = get_sentiment_model_id(market)
+    cache = SentimentCache()
+    headlines = [item["title"] for item in items]
+    scored = dict(zip(headlines, cache.score(headlines, lambda batch: analyze_sentiments(batch, analyzer, market=market), model_id)))
+    news_by_symbol, _ = get_matcher(config["symbols"][market]).route(items)
+    rows = [
+        {
+            "date": day,
+            "market": market,
+            "symbol": symbol,
+            "sentiment_score": sentiment_score([scored[item["title"]] for item in symbol_items]),
+            "news_count": len(symbol_items),
+            "model": model_id,
+            "source_mtime": mtime,
+        }
+        for symbol, symbol_items in news_by_symbol.items()
+    ]
+    return rows, cache.updates()
+
+
+def backfill(workers=None, rebuild=False, news_dir=NEWS_DIR, path=None):
+    """Score every pending archived news file in a process pool and merge into the history file."""
+    from sentiment_cache import SentimentCache
+
+    path = path or history_path()
+    history = load_sentiment_history(path)
+    pending = pending_news_files(find_news_files(news_dir), history, rebuild)
+    if not pending:
+        logger.info("情緒歷史已是最新，無需回補")
+        return history
+    workers = workers or SENTIMENT.get("backfill_workers", 2)
+    logger.info(f"回補情緒歷史: {len(pending)} 個新聞檔，{workers} 個 process")
+
+    rows, cache = [], SentimentCache()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {pool.submit(score_news_file, *f): f for f in pending}
+        for future, (day, market, news_path, _) in futures.items():
+            try:
+                file_rows, cache_updates = future.result()
+            except Exception as e:
+                logger.error(f"情緒回補 {news_path} 失敗: {e}")
+                continue
+            rows.extend(file_rows)
+            cache.merge(cache_updates)
+    cache.save()
+
+    with _history_lock:
+        # 重新讀取：回補期間 collect_data 可能已寫入當日分數
+        merged = merge_rows(load_sentiment_history(path), rows)
+        save_sentiment_history(merged, path)
+    logger.info(f"情緒歷史已更新: {merged['date'].nunique()} 天，{len(merged)} 筆 ({path})")
+    return merged
+
+
+def merge_rows(history, rows):
+    """history with every (date, market) present in rows replaced by rows."""
+    fresh = pd.DataFrame(rows, columns=COLUMNS)
+    fresh["date"] = pd.to_datetime(fresh["date"])
+    keys = set(zip(fresh["date"], fresh["market"]))
+    kept = history[[k not in keys for k in zip(history["date"], history["market"])]] if not history.empty else history
+    return pd.concat([kept, fresh], ignore_index=True) if not kept.empty else fresh
+
+
+def record_day(day, market, symbol_scores, model, source_mtime, path=None):
+    """
+    Persist one collection run's per-symbol scores ({symbol: (sentiment_score, news_count)}) for (day, market),
+    so the history keeps growing after the one-off backfill. source_mtime is the day's news file mtime,
+    which makes the next incremental backfill treat that file as already scored.
+    """
+    path = path or history_path()
+    rows = [
+        {"date": day, "market": market, "symbol": symbol, "sentiment_score": score, "news_count": count,
+         "model": model, "source_mtime": source_mtime}
+        for symbol, (score, count) in symbol_scores.items()
+    ]
+    with _history_lock:
+        merged = merge_rows(load_sentiment_history(path), rows)
+        save_sentiment_history(merged, path)
+    logger.info(f"情緒歷史新增 {day} {market}: {len(rows)} 個標的 ({path})")
+    return merged
+
+
+# ─────────────────────────────────────────────
+# Consumer side
+# ─────────────────────────────────────────────
+def sentiment_series(symbol, history=None):
+    """Daily sentiment_score for symbol indexed by news date (empty Series when never backfilled)."""
+    history = load_sentiment_history() if history is None else history
+    rows = history[history["symbol"] == symbol]
+    return pd.Series(rows["sentiment_score"].to_numpy(dtype=float), index=pd.DatetimeIndex(rows["date"]).normalize()).groupby(level=0).mean()
+
+
+def attach_sentiment(df, symbol, latest_score, history=None):
+    """
+    Add a point-in-time `sentiment_score` column to a price frame (`date` column or DatetimeIndex).
+    - bars on days covered by the history get that day's score
+    - every other bar (no news that day, outside the backfilled range, symbol never backfilled) gets 0.0 (neutral)
+    - only the latest bar gets latest_score (today's live sentiment)
+    """
+    df = df.copy()
+    if df.empty:
+        df["sentiment_score"] = latest_score
+        return df
+    series = sentiment_series(symbol, history)
+    dates = df["date"] if "date" in df.columns else df.index.to_series()
+    days = pd.to_datetime(dates, utc=True).dt.tz_localize(None).dt.normalize()
+    df["sentiment_score"] = days.map(series).fillna(0.0).to_numpy(dtype=float)
+    df.iloc[-1, df.columns.get_loc("sentiment_score")] = latest_score
+    return df
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill the per-day, per-symbol sentiment history")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (config sentiment.backfill_workers)")
+    parser.add_argument("--rebuild", action="store_true", help="Re-score every archived day")
+    args = parser.parse_args()
+    backfill(workers=args.workers, rebuild=args.rebuild)
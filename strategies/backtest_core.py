@@ -0,0 +1,111 @@
+"""
+strategies/backtest_core.py - 所有策略共用的 NumPy 回測績效核心
+
+各策略只負責產生訊號 (1 = LONG, -1 = SHORT, 0 = NEUTRAL)；績效一律由 evaluate_signals 計算。
+signals 可以是單一向量 (n,) 或矩陣 (n, k)：k 組訊號 (例如參數網格) 與同一條價格一次算完。
+
+    metrics = evaluate_signals(df['close'], df['signal'], *annualization(config, 'daily'))
+    result = strategy_result(config, metrics, df['close'].iloc[-1], 'daily')
+
+語意與原本各策略的 pandas 寫法一致：
+    returns          = close.pct_change()
+    strategy_returns = returns * signal.shift(1)          (第 t 根的訊號持有到 t+1)
+    sharpe_ratio     = mean / std(ddof=1) * sqrt(sharpe_periods)，std 為 0 / NaN 時為 0
+    max_drawdown     = max(cummax(cumsum) - cumsum)       (累積報酬的絕對回撤，NaN 列不計)
+    expected_return  = mean * return_periods
+另外提供 turnover (平均每根 K 棒的 |Δ部位|，多翻空算 2) 與最新部位 position。
+"""
+
+import numpy as np
+
+POSITION_NAMES = {1: 'LONG', -1: 'SHORT', 0: 'NEUTRAL'}
+
+
+def annualization(config, timeframe):
+    """(sharpe_periods, return_periods) from config strategy_params for daily / hourly bars."""
+    params = config['strategy_params']
+    if timeframe == 'daily':
+        return params['sharpe_annualization_daily'], params['expected_return_annualization_daily']
+    return params['sharpe_annualization_hourly'], params['expected_return_annualization_hourly']
+
+
+def evaluate_signals(close, signals, sharpe_periods=252, return_periods=252):
+    """
+    Metrics for every signal column against one price series, in a single vectorized pass.
+    close: (n,) prices; signals: (n,) or (n, k) positions.
+    Returns a dict of arrays with shape (k,) — sharpe_ratio, max_drawdown, expected_return, turnover,
+    position — plus strategy_returns (n, k). A 1-D signal gives k = 1.
+    """
+    close = np.asarray(close, dtype=float)
+    signals = np.asarray(signals, dtype=float)
+    if signals.ndim == 1:
+        signals = signals[:, None]
+    n, k = signals.shape
+
+    returns = np.full(n, np.nan)
+    strategy_returns = np.full((n, k), np.nan)
+    if n > 1:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns[1:] = close[1:] / close[:-1] - 1
+            strategy_returns[1:] = returns[1:, None] * signals[:-1]
+
+    turnover = np.abs(np.diff(signals, axis=0)).mean(axis=0) if n > 1 else np.zeros(k)
+    return {
+        **returns_metrics(strategy_returns, sharpe_periods, return_periods),
+        'turnover': np.nan_to_num(turnover),
+        'position': signals[-1] if n else np.zeros(k),
+        'strategy_returns': strategy_returns,
+    }
+
+
+def returns_metrics(strategy_returns, sharpe_periods=252, return_periods=252):
+    """
+    sharpe_ratio / max_drawdown / expected_return (arrays of shape (k,)) from per-bar strategy returns
+    (n,) or (n, k); NaN bars are skipped. Used on slices too (walk-forward train / test windows).
+    """
+    strategy_returns = np.asarray(strategy_returns, dtype=float)
+    if strategy_returns.ndim == 1:
+        strategy_returns = strategy_returns[:, None]
+    valid = ~np.isnan(strategy_returns)
+    count = valid.sum(axis=0)
+    filled = np.where(valid, strategy_returns, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = filled.sum(axis=0) / count
+        deviation = np.where(valid, filled - mean, 0.0)
+        std = np.sqrt((deviation ** 2).sum(axis=0) / (count - 1))
+        sharpe = np.where((std != 0) & (count > 1), mean / std * np.sqrt(sharpe_periods), 0.0)
+
+        cumulative = np.cumsum(filled, axis=0)
+        cumulative[~valid] = np.nan
+        drawdown = np.fmax.accumulate(cumulative, axis=0) - cumulative
+    max_drawdown = np.where(valid, drawdown, -np.inf).max(axis=0, initial=-np.inf)
+
+    return {
+        'sharpe_ratio': np.nan_to_num(sharpe, nan=0.0, posinf=0.0, neginf=0.0),
+        'max_drawdown': np.where(np.isfinite(max_drawdown), max_drawdown, 0.0),
+        'expected_return': np.nan_to_num(mean * return_periods, nan=0.0, posinf=0.0, neginf=0.0),
+    }
+
+
+def position_name(value):
+    return POSITION_NAMES.get(int(np.sign(value)) if np.isfinite(value) else 0, 'NEUTRAL')
+
+
+def strategy_result(config, metrics, latest_close, timeframe, column=0, multiplier=None):
+    """The standard backtest result dict (metrics + trade signals) for one column of evaluate_signals."""
+    params = config['strategy_params']
+    if multiplier is None:
+        multiplier = params['daily_multiplier'] if timeframe == 'daily' else params['hourly_multiplier']
+    return {
+        'sharpe_ratio': float(metrics['sharpe_ratio'][column]),
+        'max_drawdown': float(metrics['max_drawdown'][column]),
+        'expected_return': float(metrics['expected_return'][column]),
+        'turnover': float(metrics['turnover'][column]),
+        'signals': {
+            'position': position_name(metrics['position'][column]),
+            'entry_price': latest_close,
+            'target_price': latest_close * multiplier,
+            'stop_loss': latest_close * params['stop_loss_ratio'],
+            'position_size': params['position_size']
+        }
+    }
@@ -1,7 +1,8 @@
-import pandas as pd
 import os
 import json
 from loguru import logger
+from market_store import load_market_data
+from price_panel import symbol_frame
 
 class BaseStrategy:
     def __init__(self, config, params=None):
@@ -10,11 +11,13 @@ class BaseStrategy:
         self.data_paths = config.get('data_paths', {})
 
     def load_data(self, symbol, timeframe='daily'):
-        file_path = f"{self.data_paths.get('market', 'data/market')}/daily_{symbol.replace('^', '').replace('.', '_')}.csv"
         try:
-            df = pd.read_csv(file_path)
-            df['date'] = pd.to_datetime(df['date'])
-            df.set_index('date', inplace=True)
+            df = symbol_frame(symbol, 'daily')
+            if df is not None:
+                return df.set_index('date')
+            df = load_market_data(symbol, 'daily', market_dir=self.data_paths.get('market', 'data/market'), index=True)
+            if df is None:
+                raise FileNotFoundError(f"no market data for {symbol}")
             return df
         except Exception as e:
             logger.error(f"Failed to load data for {symbol}: {e}")
@@ -0,0 +1,146 @@
+"""
+strategies/charts.py - 績效圖表：回測只回傳資料，圖表在回測之外另一個 stage 繪製
+
+過去每次 backtest 都畫一張 matplotlib 圖、存 PNG 再上傳 B2；錦標賽掃參數時大量的圖表畫完即被覆蓋。
+現在 backtest 只在結果中附上 result['equity_curve'] (EquityCurve：日期 + 累積報酬)，
+由呼叫端挑出勝出的設定後一次交給 render_charts：
+
+    jobs = [chart_job(symbol, 'daily', result)]          # 取出 (並移除) equity_curve
+    urls = render_charts(jobs)                           # {(symbol, timeframe, label): chart_url}
+
+render_charts 以 Agg (matplotlib.figure.Figure，不經 pyplot 全域狀態) 在 process pool 中繪製，
+所有 PNG 畫完後再由 cloud_manager.upload_charts 批次上傳。
+config charts.enabled = false 或 `main.py --no-charts` 可整個關閉 (掃參數 / 離線回測)。
+"""
+
+import os
+import threading
+from dataclasses import dataclass, replace
+from typing import Optional
+import numpy as np
+from loguru import logger
+from config import load_config
+from tracing import span
+
+PERFORMANCE_DIR = "data/strategy/performance"
+
+_enabled_override = None
+_override_lock = threading.Lock()
+
+
+@dataclass
+class EquityCurve:
+    """Cumulative strategy returns of one backtest, the only data a performance chart needs."""
+    dates: np.ndarray
+    values: np.ndarray
+
+
+@dataclass
+class ChartJob:
+    symbol: str
+    timeframe: str
+    curve: EquityCurve
+    label: Optional[str] = None  # e.g. the strategy name, when several charts share symbol / timeframe
+    output_dir: Optional[str] = None  # PERFORMANCE_DIR when None; fixed by render_charts before spawning workers
+
+    @property
+    def key(self):
+        return self.symbol, self.timeframe, self.label
+
+    @property
+    def path(self):
+        suffix = f"_{self.label}" if self.label else ""
+        return os.path.join(self.output_dir or PERFORMANCE_DIR, f"{self.symbol}_{self.timeframe}{suffix}_performance.png")
+
+
+def set_enabled(enabled):
+    """Process-wide switch (CLI --no-charts); None falls back to config charts.enabled."""
+    global _enabled_override
+    with _override_lock:
+        _enabled_override = enabled
+
+
+def charts_enabled():
+    if _enabled_override is not None:
+        return _enabled_override
+    return bool(load_config().get('charts', {}).get('enabled', True))
+
+
+def equity_curve(df, returns_column='strategy_returns'):
+    """EquityCurve from a backtest frame (index = dates when it can be parsed as such)."""
+    import pandas as pd
+    index = df.index
+    if not pd.api.types.is_datetime64_any_dtype(index):
+        try:
+            index = pd.to_datetime(index)
+        except (ValueError, TypeError):
+            index = pd.RangeIndex(len(df))
+    return EquityCurve(dates=np.asarray(index), values=df[returns_column].cumsum().to_numpy(dtype=float))
+
+
+def chart_job(symbol, timeframe, result, label=None):
+    """Pop result['equity_curve'] (results stay JSON-friendly) into a ChartJob; None without a curve."""
+    curve = result.pop('equity_curve', None) if isinstance(result, dict) else None
+    if curve is None:
+        return None
+    return ChartJob(symbol, timeframe, curve, label)
+
+
+def _render(job):
+    """Draw one chart to job.path on the Agg canvas; runs in a pool worker."""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    figure = Figure(figsize=(10, 6))
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    axes.plot(job.curve.dates, job.curve.values, label='Strategy Returns')
+    axes.set_title(f"{job.symbol} {job.timeframe} Strategy Performance")
+    axes.set_xlabel('Date')
+    axes.set_ylabel('Cumulative Returns')
+    axes.legend()
+    axes.grid()
+    os.makedirs(os.path.dirname(job.path), exist_ok=True)
+    tmp_path = f"{job.path}.{os.getpid()}.tmp.png"
+    figure.savefig(tmp_path)
+    os.replace(tmp_path, job.path)
+    return job.path
+
+
+def render_charts(jobs, workers=None, upload=True):
+    """
+    Render the given jobs (None entries are skipped) and batch-upload the PNGs.
+    Returns {job.key: chart_url}; the url is None when the upload failed or upload=False.
+    """
+    # 輸出目錄在本程序決定：spawn 出來的 worker 只會看到模組的預設值
+    jobs = [replace(job, output_dir=job.output_dir or PERFORMANCE_DIR) for job in jobs if job is not None]
+    if not jobs or not charts_enabled():
+        return {}
+    workers = workers or load_config().get('charts', {}).get('workers', 2)
+
+    with span("charts.render", cat="charts", count=len(jobs)):
+        if workers <= 1 or len(jobs) <= 1:
+            paths = [_safe_render(job) for job in jobs]
+        else:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # spawn: main renders from the per-mode threads, where forking could inherit a held lock
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=context) as pool:
+                paths = list(pool.map(_safe_render, jobs))
+    rendered = {job.key: path for job, path in zip(jobs, paths) if path}
+    logger.info(f"已繪製 {len(rendered)}/{len(jobs)} 張績效圖表")
+
+    if not upload:
+        return {key: None for key in rendered}
+    from cloud_manager import upload_charts
+    urls = upload_charts(list(rendered.values()))
+    return {key: urls.get(path) for key, path in rendered.items()}
+
+
+def _safe_render(job):
+    try:
+        return _render(job)
+    except Exception as e:
+        logger.error(f"{job.symbol} {job.timeframe} 績效圖表繪製失敗: {str(e)}")
+        return None
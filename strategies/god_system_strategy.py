@@ -1,9 +1,10 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from loguru import logger
 from .base_strategy import BaseStrategy
-from .utils import generate_performance_chart
+from .charts import equity_curve
+from .backtest_core import evaluate_signals, annualization, strategy_result
+from . import indicator_cache as indicators
 import json
 
 class GodSystemStrategy(BaseStrategy):
@@ -33,56 +34,34 @@ class GodSystemStrategy(BaseStrategy):
         df = data.copy()
         prices = df['close']
 
-        # 計算月均線 (20 日均線)
-        ma_month = prices.rolling(window=self.params['ma_month']).mean()
+        # 產生訊號：收盤價 > 月均線 (20 日均線) -> LONG, < 月均線 -> SHORT, 相等 -> NEUTRAL
+        df['signal'] = self._signal_matrix(prices, [int(self.params['ma_month'])], symbol, timeframe)[:, 0]
 
-        # 產生訊號：收盤價 > 月均線 -> LONG, < 月均線 -> SHORT, 相等 -> NEUTRAL
-        df['signal'] = 0
-        df.loc[prices > ma_month, 'signal'] = 1   # LONG
-        df.loc[prices < ma_month, 'signal'] = -1  # SHORT
-        df.loc[prices == ma_month, 'signal'] = 0  # NEUTRAL
+        # 計算績效指標 (共用 NumPy 回測核心)
+        metrics = evaluate_signals(prices.to_numpy(), df['signal'].to_numpy(), *annualization(self.config, timeframe))
+        df['strategy_returns'] = metrics['strategy_returns'][:, 0]
+        result = strategy_result(self.config, metrics, df['close'].iloc[-1], timeframe)
 
-        # 計算回報
-        df['returns'] = df['close'].pct_change()
-        df['strategy_returns'] = df['returns'] * df['signal'].shift(1)
-
-        # 計算績效指標
-        sharpe_ratio = df['strategy_returns'].mean() / df['strategy_returns'].std() * np.sqrt(
-            self.config['strategy_params']['sharpe_annualization_daily'] if timeframe == 'daily' else self.config['strategy_params']['sharpe_annualization_hourly']
-        ) if df['strategy_returns'].std() != 0 else 0
-        sharpe_ratio = sharpe_ratio if not np.isnan(sharpe_ratio) else 0
-
-        cum_returns = df['strategy_returns'].cumsum()
-        max_drawdown = (cum_returns.cummax() - cum_returns).max()
-        max_drawdown = max_drawdown if not np.isnan(max_drawdown) else 0
-
-        expected_return = df['strategy_returns'].mean() * (
-            self.config['strategy_params']['expected_return_annualization_daily'] if timeframe == 'daily' else self.config['strategy_params']['expected_return_annualization_hourly']
-        )
-        expected_return = expected_return if not np.isnan(expected_return) else 0
-
-        latest_close = df['close'].iloc[-1]
-        multiplier = self.config['strategy_params']['daily_multiplier'] if timeframe == 'daily' else self.config['strategy_params']['hourly_multiplier']
-        signals = {
-            'position': 'LONG' if df['signal'].iloc[-1] == 1 else 'SHORT' if df['signal'].iloc[-1] == -1 else 'NEUTRAL',
-            'entry_price': latest_close,
-            'target_price': latest_close * multiplier,
-            'stop_loss': latest_close * self.config['strategy_params']['stop_loss_ratio'],
-            'position_size': self.config['strategy_params']['position_size']
-        }
-
-        # 生成績效圖表
-        generate_performance_chart(df, symbol, timeframe)
+        # 績效圖表由呼叫端在挑出勝出設定後另行繪製 (strategies/charts.py)
+        result['equity_curve'] = equity_curve(df)
 
         logger.info(f"{symbol} 信號分佈: {df['signal'].value_counts().to_dict()}")
         logger.info(f"{symbol} 回報標準差: {df['strategy_returns'].std():.4f}")
 
-        return {
-            'sharpe_ratio': sharpe_ratio,
-            'max_drawdown': max_drawdown,
-            'expected_return': expected_return,
-            'signals': signals
-        }
+        return result
+
+    def signal_grid(self, symbol, data, timeframe, combinations):
+        """Grid-evaluator hook: (close, (n, k) signals) with one moving average per distinct ma_month."""
+        if symbol not in ['^TWII'] or 'close' not in data or data.empty:
+            return None
+        prices = data['close']
+        return prices.to_numpy(dtype=float), self._signal_matrix(prices, [int(params['ma_month']) for params in combinations], symbol, timeframe)
+
+    @staticmethod
+    def _signal_matrix(prices, windows, symbol=None, timeframe=None):
+        averages = {w: indicators.sma(prices, w, symbol, timeframe) for w in set(windows)}
+        diff = prices.to_numpy(dtype=float)[:, None] - np.column_stack([averages[w] for w in windows])
+        return np.nan_to_num(np.sign(diff)).astype(int)
 
     def _default_results(self):
         return {
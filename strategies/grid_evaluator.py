@@ -0,0 +1,96 @@
+"""
+strategies/grid_evaluator.py - 參數網格一次向量化評分 (run_strategy_tournament 用)
+
+過去錦標賽對 get_param_combinations 的每個組合各跑一次完整回測 (bigline 240 組：每次重讀大盤、重畫圖表)。
+策略若提供 signal_grid(symbol, data, timeframe, combinations) → (close, (n, k) 訊號矩陣)，
+每個相異的滾動視窗只算一次、組合以欄位廣播，所有組合交給 backtest_core.evaluate_signals 一次算完；
+沒有此 hook 的策略 (例如每組都要重新訓練的 MLStrategy) 退回逐組 backtest。
+
+    table = evaluate_grid(strategy, 'QQQ', df, 'daily', name='bigline')
+    best_params = table.iloc[0]['params']
+
+回傳依 score = expected_return / (max_drawdown + 1e-9) 由高到低排序的表格 (同分保留原組合順序)，
+並將參數 → 分數曲面存成 data/strategy/grid/{strategy}_{symbol}_{timeframe}.csv 供事後檢視。
+"""
+
+import os
+import json
+import pandas as pd
+from loguru import logger
+from config import load_config
+from .backtest_core import evaluate_signals, annualization, position_name
+from .utils import get_param_combinations
+
+METRICS = ['sharpe_ratio', 'max_drawdown', 'expected_return', 'turnover']
+
+
+def tournament_score(expected_return, max_drawdown):
+    return expected_return / (max_drawdown + 1e-9)
+
+
+def grid_dir():
+    return os.path.join(load_config()['data_paths']['strategy'], 'grid')
+
+
+def _vectorized_rows(strategy, symbol, data, timeframe, combinations):
+    grid = strategy.signal_grid(symbol, data, timeframe, combinations)
+    if grid is None:
+        return [{**{m: 0.0 for m in METRICS}, 'position': 'NEUTRAL'} for _ in combinations]
+    close, signals = grid
+    metrics = evaluate_signals(close, signals, *annualization(strategy.config, timeframe))
+    return [
+        {**{m: float(metrics[m][j]) for m in METRICS}, 'position': position_name(metrics['position'][j])}
+        for j in range(len(combinations))
+    ]
+
+
+def _backtest_rows(strategy, symbol, data, timeframe, combinations):
+    """One full backtest per combination, each on a fresh instance (strategy itself is never mutated)."""
+    rows = []
+    for params in combinations:
+        result = type(strategy)(strategy.config, params).backtest(symbol, data, timeframe)
+        rows.append({**{m: float(result.get(m, 0.0) or 0.0) for m in METRICS},
+                     'position': result.get('signals', {}).get('position', 'NEUTRAL')})
+    return rows
+
+
+def score_combinations(strategy, symbol, data, timeframe, combinations):
+    """Unranked metric rows for the given combinations (any subset of the grid, in order)."""
+    if hasattr(strategy, 'signal_grid'):
+        return _vectorized_rows(strategy, symbol, data, timeframe, combinations)
+    return _backtest_rows(strategy, symbol, data, timeframe, combinations)
+
+
+def rank_rows(rows, combinations):
+    """Rows → DataFrame ranked by score (ties keep combination order), with a `params` column."""
+    table = pd.DataFrame(rows)
+    table['score'] = tournament_score(table['expected_return'], table['max_drawdown'])
+    table['params'] = combinations
+    return table.sort_values('score', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def evaluate_grid(strategy, symbol, data, timeframe='daily', name=None, persist=True):
+    """Score every combination of strategy.params; ranked DataFrame with a `params` column (dicts)."""
+    combinations = get_param_combinations(strategy.params)
+    table = rank_rows(score_combinations(strategy, symbol, data, timeframe, combinations), combinations)
+    if persist:
+        save_grid(table, name or type(strategy).__name__, symbol, timeframe)
+    return table
+
+
+def save_grid(table, name, symbol, timeframe, directory=None):
+    """Persist the parameter → score surface (one column per parameter, lists JSON-encoded)."""
+    directory = directory or grid_dir()
+    os.makedirs(directory, exist_ok=True)
+    surface = pd.DataFrame([
+        {key: json.dumps(value) if isinstance(value, (list, dict)) else value for key, value in params.items()}
+        for params in table['params']
+    ])
+    surface = pd.concat([surface, table.drop(columns=['params'])], axis=1)
+    sanitized = symbol.replace('^', '').replace('.', '_')
+    path = os.path.join(directory, f"{name}_{sanitized}_{timeframe}.csv")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    surface.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    logger.info(f"{name} {symbol} 參數網格 {len(table)} 組已存至 {path}")
+    return path
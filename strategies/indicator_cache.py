@@ -0,0 +1,212 @@
+"""
+strategies/indicator_cache.py - 策略與 MarketAnalyst 共用的技術指標快取
+
+同一次執行裡，同一條 QQQ 日線的 20 日均線、RSI(14)、MACD、布林通道會被 GodSystem、BigLine、
+Technical、MarketAnalyst 各算一次 (參數網格裡更是每組重算)。所有指標改由這裡取得：
+
+    from strategies import indicator_cache as indicators
+    ma = indicators.sma(df['close'], 20, symbol='QQQ', timeframe='daily')
+    macd, signal, diff = indicators.macd(df['close'], 12, 26, 9, symbol='QQQ', timeframe='daily')
+
+快取鍵為 (symbol, timeframe, indicator, params, data fingerprint)；fingerprint 是輸入數值的 blake2b 摘要，
+資料一更新 (新的一根 K 棒、回補修正) 鍵就不同，不會拿到過期的值。回傳值一律是唯讀 NumPy 陣列，
+與輸入逐列對齊 (多輸出指標為 (n, m) 欄位)。
+
+兩層：
+    記憶體    程序內 LRU (config indicator_cache.max_entries，預設 512)，執行緒安全
+    磁碟      選用 (config indicator_cache.disk_dir，預設關閉)，每個指標一個 .npy，跨次執行沿用
+
+Process-pool worker 各自擁有一份記憶體 LRU；需要跨程序共用時開啟磁碟層。
+"""
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from loguru import logger
+from config import load_config
+
+DEFAULT_MAX_ENTRIES = 512
+
+
+def fingerprint(*arrays):
+    """Digest of the input values (dtype, shape and bytes) — any change to the data changes the key."""
+    digest = hashlib.blake2b(digest_size=16)
+    for values in arrays:
+        values = np.ascontiguousarray(np.asarray(values, dtype=float))
+        digest.update(str(values.shape).encode())
+        digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, disk_dir=None):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+    def get(self, symbol, timeframe, name, params, inputs, compute):
+        """
+        Cached indicator values. inputs: the arrays the indicator is computed from;
+        compute(*float_arrays) → array aligned with them (only called on a miss).
+        """
+        arrays = [np.asarray(values, dtype=float) for values in inputs]
+        key = (symbol, timeframe, name, tuple(params), fingerprint(*arrays))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        values = self._load(key)
+        if values is None:
+            values = np.asarray(compute(*arrays), dtype=float)
+            self._save(key, values)
+            with self._lock:
+                self.misses += 1
+        else:
+            with self._lock:
+                self.disk_hits += 1
+        values.flags.writeable = False
+
+        with self._lock:
+            self._entries[key] = values
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return values
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.disk_hits = 0
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits,
+                    'misses': self.misses, 'disk_hits': self.disk_hits}
+
+    # ─────────────────────────────────────────────
+    # 磁碟層
+    # ─────────────────────────────────────────────
+    def _path(self, key):
+        symbol, timeframe, name, params, digest = key
+        sanitized = str(symbol or '_').replace('^', '').replace('.', '_').replace(':', '_')
+        params_tag = '_'.join(str(p) for p in params)
+        return os.path.join(self.disk_dir, f"{sanitized}_{timeframe or '_'}_{name}_{params_tag}_{digest}.npy")
+
+    def _load(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            return np.load(path, allow_pickle=False)
+        except (OSError, ValueError) as e:
+            logger.warning(f"指標快取 {path} 讀取失敗，重新計算: {str(e)}")
+            return None
+
+    def _save(self, key, values):
+        if not self.disk_dir:
+            return
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, values, allow_pickle=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"指標快取寫入失敗: {str(e)}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """The process-wide cache, configured from config.json indicator_cache on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                settings = load_config().get('indicator_cache', {})
+                _cache = IndicatorCache(max_entries=settings.get('max_entries', DEFAULT_MAX_ENTRIES),
+                                        disk_dir=settings.get('disk_dir'))
+    return _cache
+
+
+# ─────────────────────────────────────────────
+# 指標 (輸入可為 Series 或陣列；回傳與輸入對齊的唯讀陣列)
+# ─────────────────────────────────────────────
+def _ta():
+    import ta
+    return ta
+
+
+def sma(values, window, symbol=None, timeframe=None):
+    """Rolling mean over `window` bars (same as ta SMAIndicator); NaN until the window fills."""
+    return get_cache().get(symbol, timeframe, 'sma', (window,), [values],
+                           lambda x: pd.Series(x).rolling(window=window).mean().to_numpy())
+
+
+def rolling_max(values, window, symbol=None, timeframe=None):
+    return get_cache().get(symbol, timeframe, 'rolling_max', (window,), [values],
+                           lambda x: pd.Series(x).rolling(window=window).max().to_numpy())
+
+
+def rsi(values, window=14, symbol=None, timeframe=None):
+    """Wilder RSI (ta RSIIndicator)."""
+    return get_cache().get(symbol, timeframe, 'rsi', (window,), [values],
+                           lambda x: _ta().momentum.RSIIndicator(pd.Series(x), window=window).rsi().to_numpy())
+
+
+def macd(values, fast=12, slow=26, signal=9, symbol=None, timeframe=None):
+    """(macd, macd_signal, macd_diff) from a single ta MACD."""
+    def compute(x):
+        indicator = _ta().trend.MACD(pd.Series(x), window_fast=fast, window_slow=slow, window_sign=signal)
+        return np.column_stack([indicator.macd(), indicator.macd_signal(), indicator.macd_diff()])
+
+    values = get_cache().get(symbol, timeframe, 'macd', (fast, slow, signal), [values], compute)
+    return values[:, 0], values[:, 1], values[:, 2]
+
+
+def bollinger(values, window=20, window_dev=2, symbol=None, timeframe=None):
+    """(high band, low band, middle band) from a single ta BollingerBands."""
+    def compute(x):
+        indicator = _ta().volatility.BollingerBands(pd.Series(x), window=window, window_dev=window_dev)
+        return np.column_stack([indicator.bollinger_hband(), indicator.bollinger_lband(), indicator.bollinger_mavg()])
+
+    values = get_cache().get(symbol, timeframe, 'bollinger', (window, window_dev), [values], compute)
+    return values[:, 0], values[:, 1], values[:, 2]
+
+
+def rsi_simple(values, window=14, symbol=None, timeframe=None):
+    """MLStrategy's RSI feature: simple-average gains/losses (min_periods=1), early NaN filled with 50."""
+    def compute(x):
+        delta = pd.Series(x).diff()
+        gain = delta.where(delta > 0, 0)
+        loss = -delta.where(delta < 0, 0)
+        avg_gain = gain.rolling(window=window, min_periods=1).mean()
+        avg_loss = loss.rolling(window=window, min_periods=1).mean()
+        rs = avg_gain / avg_loss
+        return (100 - (100 / (1 + rs))).fillna(50).to_numpy()
+
+    return get_cache().get(symbol, timeframe, 'rsi_simple', (window,), [values], compute)
+
+
+def macd_histogram(values, fast=12, slow=26, signal=9, symbol=None, timeframe=None):
+    """MLStrategy's MACD feature: macd - signal with pandas ewm (adjust=True, min_periods=1)."""
+    def compute(x):
+        series = pd.Series(x)
+        line = series.ewm(span=fast, min_periods=1).mean() - series.ewm(span=slow, min_periods=1).mean()
+        return (line - line.ewm(span=signal, min_periods=1).mean()).to_numpy()
+
+    return get_cache().get(symbol, timeframe, 'macd_histogram', (fast, slow, signal), [values], compute)
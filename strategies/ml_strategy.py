@@ -1,8 +1,10 @@
-import pandas as pd
 import numpy as np
+import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
 from .base_strategy import BaseStrategy
+from .backtest_core import evaluate_signals, annualization, strategy_result
+from . import indicator_cache as indicators
+from . import model_store
 from loguru import logger
 import json
 
@@ -26,49 +28,25 @@ class MLStrategy(BaseStrategy):
                     "return_threshold": 0.01
                 }
 
-    def backtest(self, symbol, data, timeframe='daily'):
-        if data.empty or len(data) < 30:
-            logger.warning(f"{symbol} data insufficient or empty")
-            return self._default_results()
-
-        if symbol not in ['QQQ', '0050.TW']:
-            logger.info(f"{symbol} 非主要交易標的，跳過回測")
-            return self._default_results()
+    FEATURES = ['RSI', 'MACD', 'volume']
+    TEST_SIZE = 0.2
+    # 模型庫以此區分訓練方式：切分規則改變時，舊模型 (可能訓練過現在的樣本外尾段) 不再沿用
+    TRAINING_SCHEME = f"chronological-purge1-test{TEST_SIZE}"
 
+    def backtest(self, symbol, data, timeframe='daily'):
         try:
-            required_columns = ['open', 'close', 'volume']
-            missing_columns = [col for col in required_columns if col not in data.columns]
-            if missing_columns:
-                logger.error(f"{symbol} missing required columns: {missing_columns}")
-                return self._default_results()
-
-            df = data.copy()
-
-            # Feature engineering
-            df['RSI'] = self._calculate_rsi(df['close'], self.params['rsi_window'])
-            df['MACD'] = self._calculate_macd(df['close'], self.params['macd_fast'], self.params['macd_slow'], self.params['macd_signal'])
-            df['returns'] = df['close'].pct_change()
-
-            # Create labels (1 for positive return, 0 for negative)
-            df['label'] = (df['returns'].shift(-1) > self.params['return_threshold']).astype(int)
-            logger.info(f"{symbol} 特徵工程前數據長度: {len(df)}")
-            df = df.dropna()
-            logger.info(f"{symbol} 特徵工程後數據長度: {len(df)}")
-
-            if len(df) < 30:
-                logger.warning(f"{symbol} insufficient data after feature engineering")
+            df = self.feature_frame(symbol, data, timeframe)
+            if df is None:
                 return self._default_results()
 
             # Prepare features and labels
-            features = ['RSI', 'MACD', 'volume']
-            X = df[features]
+            X = df[self.FEATURES]
             y = df['label']
 
-            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-            # Train Random Forest
-            model = RandomForestClassifier(n_estimators=self.params['n_estimators'], max_depth=self.params['max_depth'], random_state=42)
-            model.fit(X_train, y_train)
+            # Trained Random Forest from the model store (fit, warm start or reuse; strategies/model_store.py)
+            model, model_info = model_store.get_model(symbol, timeframe, self.FEATURES, self.params, X, y,
+                                                      self._fit_model, self._warm_start_model,
+                                                      scheme=self.TRAINING_SCHEME)
 
             # Predict
             df['prediction'] = model.predict(X)
@@ -78,64 +56,101 @@ class MLStrategy(BaseStrategy):
             df.loc[df['prediction'] == 1, 'signal'] = 1
             df.loc[df['prediction'] == 0, 'signal'] = -1
 
-            # Calculate returns
-            df['strategy_returns'] = df['returns'] * df['signal'].shift(1)
-
-            # Performance metrics
-            sharpe_ratio = df['strategy_returns'].mean() / df['strategy_returns'].std() * np.sqrt(
-                self.config['strategy_params']['sharpe_annualization_daily'] if timeframe == 'daily' else 52
-            ) if df['strategy_returns'].std() != 0 else 0
-            sharpe_ratio = sharpe_ratio if not np.isnan(sharpe_ratio) else 0
-
-            cum_returns = df['strategy_returns'].cumsum()
-            max_drawdown = (cum_returns.cummax() - cum_returns).max()
-            max_drawdown = max_drawdown if not np.isnan(max_drawdown) else 0
-
-            expected_return = df['strategy_returns'].mean() * (
-                self.config['strategy_params']['expected_return_annualization_daily'] if timeframe == 'daily' else 52
-            )
-            expected_return = expected_return if not np.isnan(expected_return) else 0
-
-            # Generate trading signals
-            latest_close = df['close'].iloc[-1]
-            multiplier = self.config['strategy_params']['daily_multiplier'] if timeframe == 'daily' else 1.1
-            signals = {
-                'position': 'LONG' if df['signal'].iloc[-1] == 1 else 'SHORT' if df['signal'].iloc[-1] == -1 else 'NEUTRAL',
-                'entry_price': latest_close,
-                'target_price': latest_close * multiplier,
-                'stop_loss': latest_close * self.config['strategy_params']['stop_loss_ratio'],
-                'position_size': self.config['strategy_params']['position_size']
-            }
+            # Performance metrics on the held-out tail only (non-daily bars: 52 periods / 1.1 multiplier).
+            # Row split - 1 is purged from training, so its prediction is the first out-of-sample position.
+            split = self._train_end(len(df)) + 1
+            periods = annualization(self.config, timeframe) if timeframe == 'daily' else (52, 52)
+            metrics = evaluate_signals(df['close'].to_numpy()[split - 1:], df['signal'].to_numpy()[split - 1:], *periods)
+            df['strategy_returns'] = np.concatenate([np.full(split - 1, np.nan), metrics['strategy_returns'][:, 0]])
+            result = strategy_result(self.config, metrics, df['close'].iloc[-1], timeframe,
+                                     multiplier=None if timeframe == 'daily' else 1.1)
+
+            result['model'] = model_info
 
             logger.info(f"{symbol} 信號分佈: {df['signal'].value_counts().to_dict()}")
             logger.info(f"{symbol} 回報標準差: {df['strategy_returns'].std():.3f}")
 
-            return {
-                'sharpe_ratio': sharpe_ratio,
-                'max_drawdown': max_drawdown,
-                'expected_return': expected_return,
-                'signals': signals
-            }
+            return result
         except Exception as e:
             logger.error(f"{symbol} {timeframe} 回測失敗: {str(e)}")
             return self._default_results()
 
-    def _calculate_rsi(self, series, window):
-        delta = series.diff()
-        gain = delta.where(delta > 0, 0)
-        loss = -delta.where(delta < 0, 0)
-        avg_gain = gain.rolling(window=window, min_periods=1).mean()
-        avg_loss = loss.rolling(window=window, min_periods=1).mean()
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi.fillna(50)  # Neutral fill for early NaN
-
-    def _calculate_macd(self, series, fast, slow, signal):
-        ema_fast = series.ewm(span=fast, min_periods=1).mean()
-        ema_slow = series.ewm(span=slow, min_periods=1).mean()
-        macd = ema_fast - ema_slow
-        macd_signal = macd.ewm(span=signal, min_periods=1).mean()
-        return macd - macd_signal
+    def feature_frame(self, symbol, data, timeframe='daily'):
+        """RSI / MACD / volume features and next-bar labels (rows in time order), or None when unusable."""
+        if data.empty or len(data) < 30:
+            logger.warning(f"{symbol} data insufficient or empty")
+            return None
+
+        if symbol not in ['QQQ', '0050.TW']:
+            logger.info(f"{symbol} 非主要交易標的，跳過回測")
+            return None
+
+        required_columns = ['open', 'close', 'volume']
+        missing_columns = [col for col in required_columns if col not in data.columns]
+        if missing_columns:
+            logger.error(f"{symbol} missing required columns: {missing_columns}")
+            return None
+
+        df = data.copy()
+
+        # Feature engineering
+        df['RSI'] = indicators.rsi_simple(df['close'], self.params['rsi_window'], symbol, timeframe)
+        df['MACD'] = indicators.macd_histogram(df['close'], self.params['macd_fast'], self.params['macd_slow'], self.params['macd_signal'], symbol, timeframe)
+        df['returns'] = df['close'].pct_change()
+
+        # Create labels (1 for positive return, 0 for negative)
+        df['label'] = (df['returns'].shift(-1) > self.params['return_threshold']).astype(int)
+        logger.info(f"{symbol} 特徵工程前數據長度: {len(df)}")
+        df = df.dropna()
+        logger.info(f"{symbol} 特徵工程後數據長度: {len(df)}")
+
+        if len(df) < 30:
+            logger.warning(f"{symbol} insufficient data after feature engineering")
+            return None
+        return df
+
+    def walk_forward_data(self, symbol, data, timeframe='daily'):
+        """(close, X, y) arrays for strategies/walk_forward.py; None when the strategy does not apply."""
+        df = self.feature_frame(symbol, data, timeframe)
+        if df is None:
+            return None
+        return df['close'].to_numpy(dtype=float), df[self.FEATURES].to_numpy(dtype=float), df['label'].to_numpy()
+
+    def fit_predict(self, X_train, y_train, X_test):
+        """Fit a fresh classifier on the training rows and predict the test rows (walk-forward folds)."""
+        model = self._classifier()
+        model.fit(X_train, y_train)
+        return model.predict(X_test)
+
+    def _train_end(self, n_rows):
+        """
+        Chronological split: the first (1 - TEST_SIZE) rows minus one train the model. The last bar before
+        the test rows is purged because its label is the next bar's return.
+        """
+        return int(n_rows * (1 - self.TEST_SIZE)) - 1
+
+    def _classifier(self):
+        return RandomForestClassifier(n_estimators=self.params['n_estimators'], max_depth=self.params['max_depth'],
+                                      random_state=42, n_jobs=model_store.fit_jobs())
+
+    def _fit_model(self, X, y):
+        train_end = self._train_end(len(X))
+        model = self._classifier()
+        model.fit(X.iloc[:train_end], y.iloc[:train_end])
+        return model
+
+    def _warm_start_model(self, model, X, y):
+        """
+        Grow the stored forest with trees fitted on the extended history (sklearn warm_start);
+        a 10 % top-up per refit, and None (full refit) once it would exceed twice n_estimators.
+        """
+        extra = max(1, self.params['n_estimators'] // 10)
+        if model.n_estimators + extra > 2 * self.params['n_estimators']:
+            return None
+        train_end = self._train_end(len(X))
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + extra, n_jobs=model_store.fit_jobs())
+        model.fit(X.iloc[:train_end], y.iloc[:train_end])
+        return model
 
     def _default_results(self):
         return {
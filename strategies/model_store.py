@@ -0,0 +1,156 @@
+"""
+strategies/model_store.py - MLStrategy 模型的持久化與重用 (config data_paths.models)
+
+過去 MLStrategy.backtest 每次呼叫都重新訓練 RandomForest；錦標賽對 n_estimators × max_depth 每組再各訓練一次，
+每天的排程又從頭再來。模型改存於：
+
+    data/models/{symbol}_{timeframe}_{features}_{params digest}.joblib
+
+每個 (symbol, timeframe, feature set, params) 一個檔案，內含最近一次的模型、訓練時的列數、特徵與標籤的前綴摘要，
+以及訓練方式 scheme (例如 MLStrategy 的時間序切分 + purge 規則)。scheme 不同的模型一律重新訓練 —
+舊切分方式訓練出的模型可能看過現在當作樣本外的尾段。取得模型時依資料指紋決定：
+    hit         特徵矩陣與標籤都與訓練時完全相同 (同一次錦標賽 / 重跑)      → 直接使用
+    reuse       資料只在尾端新增 ≤ models.reuse_bars 根 K 棒 (舊列摘要相同)  → 沿用，不重新訓練
+    warm_start  尾端新增較多但 ≤ models.warm_start_bars 根                → refit(model, X, y) 增量加樹
+    fit         其他情況 (新參數、新訓練方式、歷史資料被修正、加樹超過上限) → fit(X, y) 全新訓練
+每次結果的狀態與耗時記入 log、tracing span (ml.model) 與 stats()，可比較 fit 與重用的成本。
+
+標籤也納入摘要：下一根 K 棒的標籤在新資料進來時會改變 (原本最後一列的標籤是暫定值)，
+只比對特徵會沿用以過時標籤訓練的模型。
+
+特徵欄位本身由 indicator_cache 依資料指紋快取 (同一份資料的多組參數共用)。
+訓練的 n_jobs 取 config models.n_jobs (預設 -1 全核心)；在 process-pool worker 內 (錦標賽) 固定為 1，
+平行度交給任務層，避免超額訂閱。
+"""
+
+import os
+import copy
+import time
+import json
+import hashlib
+import threading
+import multiprocessing
+import numpy as np
+from loguru import logger
+from config import load_config
+from tracing import span
+
+DEFAULTS = {"reuse_bars": 5, "warm_start_bars": 60, "n_jobs": -1}
+STATUSES = ("hit", "reuse", "warm_start", "fit")
+
+_memory = {}
+_lock = threading.Lock()
+_stats = {status: {"count": 0, "seconds": 0.0} for status in STATUSES}
+
+
+def settings():
+    return {**DEFAULTS, **load_config().get("models", {})}
+
+
+def model_dir():
+    return load_config()["data_paths"].get("models", "data/models")
+
+
+def fit_jobs():
+    """n_jobs for model training: 1 inside a pool worker (parallelism is per task there), else config."""
+    if multiprocessing.parent_process() is not None:
+        return 1
+    return settings()["n_jobs"]
+
+
+def _digest(X, y, rows=None):
+    """Digest of the first `rows` rows of the features and the labels (all rows when None)."""
+    digest = hashlib.blake2b(digest_size=16)
+    for array in (X, y):
+        values = np.ascontiguousarray(np.asarray(array, dtype=float)[:rows])
+        digest.update(str(values.shape).encode())
+        digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+def _path(symbol, timeframe, features, params):
+    params_digest = hashlib.blake2b(json.dumps(params, sort_keys=True, default=str).encode(), digest_size=5).hexdigest()
+    sanitized = symbol.replace("^", "").replace(".", "_")
+    return os.path.join(model_dir(), f"{sanitized}_{timeframe}_{'-'.join(features)}_{params_digest}.joblib")
+
+
+def _load(path):
+    with _lock:
+        if path in _memory:
+            return _memory[path]
+    if not os.path.exists(path):
+        return None
+    import joblib
+    try:
+        entry = joblib.load(path)
+    except Exception as e:
+        logger.warning(f"模型檔 {path} 讀取失敗，重新訓練: {str(e)}")
+        return None
+    with _lock:
+        _memory[path] = entry
+    return entry
+
+
+def _save(path, entry):
+    import joblib
+    with _lock:
+        _memory[path] = entry
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        joblib.dump(entry, tmp_path)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"模型檔 {path} 寫入失敗: {str(e)}")
+
+
+def _record(status, seconds):
+    with _lock:
+        _stats[status]["count"] += 1
+        _stats[status]["seconds"] += seconds
+
+
+def stats():
+    """{status: {count, seconds}} accumulated in this process."""
+    with _lock:
+        return {status: dict(values) for status, values in _stats.items()}
+
+
+def get_model(symbol, timeframe, features, params, X, y, fit, refit, scheme=None):
+    """
+    A model for the feature matrix X (rows in time order) and labels y.
+    fit(X, y) → new model; refit(model, X, y) → model updated incrementally (warm start).
+    scheme identifies how fit / refit train (split and purge rule); stored models with another scheme are refit.
+    Returns (model, {'status', 'seconds', 'rows'}).
+    """
+    options = settings()
+    path = _path(symbol, timeframe, features, params)
+    n_rows = len(X)
+    started = time.perf_counter()
+    with span("ml.model", cat="strategy", symbol=symbol, rows=n_rows) as args:
+        entry = _load(path)
+        status = "fit"
+        if (entry is not None and entry.get("scheme") == scheme and entry["rows"] <= n_rows
+                and entry["prefix"] == _digest(X, y, entry["rows"])):
+            grown = n_rows - entry["rows"]
+            if grown == 0:
+                status = "hit"
+            elif grown <= options["reuse_bars"]:
+                status = "reuse"
+            elif grown <= options["warm_start_bars"]:
+                status = "warm_start"
+
+        if status in ("hit", "reuse"):
+            model = entry["model"]
+        else:
+            model = refit(copy.deepcopy(entry["model"]), X, y) if status == "warm_start" else fit(X, y)
+            if model is None:  # refit declined (e.g. too many trees accumulated): start over
+                status, model = "fit", fit(X, y)
+            _save(path, {"model": model, "rows": n_rows, "prefix": _digest(X, y), "features": list(features),
+                         "params": params, "scheme": scheme, "trained_at": time.time()})
+        args["status"] = status
+
+    seconds = time.perf_counter() - started
+    _record(status, seconds)
+    logger.info(f"{symbol} ML 模型 {status} ({n_rows} 列) {seconds:.3f}s")
+    return model, {"status": status, "seconds": round(seconds, 4), "rows": n_rows}
@@ -0,0 +1,468 @@
+"""
+strategies/streaming.py - 逐 K 棒的增量指標與訊號引擎 (盤中 hourly 更新)
+
+GodSystem / MarketAnalyst 每來一根新 K 棒都對整段歷史重算均線、RSI、MACD、布林通道。
+這裡的每個指標只保留 O(1) 的狀態，新的一根 K 棒進來只做常數次運算：
+
+    RollingStats   固定視窗的均值與變異數 (滑動視窗 Welford)；SMA 與布林通道共用
+    Welford        全歷史累積的均值與變異數 (策略報酬的 Sharpe)
+    EMA            span / alpha 的指數平均 (adjust=False，與 ta 相同)
+    WilderRSI      RSI(14)，漲跌幅各一個 alpha = 1/14 的 EMA
+    MACD           EMA(12) - EMA(26) 與其 EMA(9) 訊號線
+
+暖機期 (未滿 window / min_periods) 的值為 None，與 ta / pandas 的 NaN 對齊。
+
+StreamingSignalEngine 依 GodSystem 規則 (收盤 > SMA(ma_month) → LONG, < → SHORT) 產生訊號，
+並以同樣逐 K 棒累積的方式維護績效，signals() 回傳與 GodSystemStrategy.backtest 同形狀的 dict：
+
+    engine = StreamingSignalEngine.load('^TWII', 'hourly')
+    engine.update_frame(load_market_data('^TWII', 'hourly'))   # 只套用比上次更新的列
+    engine.save()
+    engine.signals()['signals']['position'], engine.indicators()['rsi']
+
+狀態存於 data/strategy/streaming/{symbol}_{timeframe}.json；ma_month 改變或已套用的 K 棒被回補修正時
+自動從頭重建。data_collector 每次抓完資料會對 config streaming.symbols / timeframes 呼叫 refresh()。
+
+    python -m strategies.streaming --symbol ^TWII --timeframe hourly
+"""
+
+import os
+import json
+import math
+import threading
+from collections import deque
+import pandas as pd
+from loguru import logger
+from config import load_config
+from .backtest_core import annualization, strategy_result
+
+STATE_VERSION = 1
+DEFAULT_MA_MONTH = 20
+RSI_WINDOW = 14
+MACD_WINDOWS = (12, 26, 9)
+BOLLINGER = (20, 2)
+
+
+# ─────────────────────────────────────────────
+# 增量指標 (to_state / from_state 可 JSON 序列化)
+# ─────────────────────────────────────────────
+class RollingStats:
+    """Mean and variance over the last `window` values (sliding-window Welford update)."""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, x):
+        if len(self.values) < self.window:
+            self.values.append(x)
+            delta = x - self.mean
+            self.mean += delta / len(self.values)
+            self.m2 += delta * (x - self.mean)
+        else:
+            old = self.values[0]
+            self.values.append(x)
+            previous_mean = self.mean
+            self.mean += (x - old) / self.window
+            self.m2 += (x - old) * (x - self.mean + old - previous_mean)
+        self.m2 = max(self.m2, 0.0)
+
+    @property
+    def ready(self):
+        return len(self.values) == self.window
+
+    @property
+    def value(self):
+        """The rolling mean (None until the window fills)."""
+        return self.mean if self.ready else None
+
+    def std(self, ddof=0):
+        if not self.ready or self.window - ddof <= 0:
+            return None
+        return math.sqrt(self.m2 / (self.window - ddof))
+
+    def to_state(self):
+        return {'window': self.window, 'values': list(self.values), 'mean': self.mean, 'm2': self.m2}
+
+    @classmethod
+    def from_state(cls, state):
+        stats = cls(state['window'])
+        stats.values.extend(state['values'])
+        stats.mean, stats.m2 = state['mean'], state['m2']
+        return stats
+
+
+class Welford:
+    """Running mean / variance over every value seen (no window)."""
+
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        self.count, self.mean, self.m2 = count, mean, m2
+
+    def update(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    def std(self, ddof=1):
+        if self.count - ddof <= 0:
+            return None
+        return math.sqrt(max(self.m2, 0.0) / (self.count - ddof))
+
+    def to_state(self):
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2}
+
+    @classmethod
+    def from_state(cls, state):
+        return cls(**state)
+
+
+class EMA:
+    """Exponential mean with adjust=False, seeded with the first value; None before min_periods values."""
+
+    def __init__(self, alpha, min_periods=1, count=0, mean=None):
+        self.alpha, self.min_periods = alpha, min_periods
+        self.count, self.mean = count, mean
+
+    @classmethod
+    def span(cls, span):
+        return cls(2.0 / (span + 1), min_periods=span)
+
+    def update(self, x):
+        self.mean = x if self.mean is None else self.mean + self.alpha * (x - self.mean)
+        self.count += 1
+
+    @property
+    def value(self):
+        return self.mean if self.count >= self.min_periods else None
+
+    def to_state(self):
+        return {'alpha': self.alpha, 'min_periods': self.min_periods, 'count': self.count, 'mean': self.mean}
+
+    @classmethod
+    def from_state(cls, state):
+        return cls(**state)
+
+
+class WilderRSI:
+    """Wilder RSI (ta RSIIndicator): alpha = 1/window EMAs of gains and losses, 100 when there are no losses."""
+
+    def __init__(self, window=RSI_WINDOW):
+        self.window = window
+        self.previous = None
+        self.gain = EMA(1.0 / window, min_periods=window)
+        self.loss = EMA(1.0 / window, min_periods=window)
+
+    def update(self, close):
+        # ta 的第一根 diff 為 NaN，經 where(...) 後成為 0：漲跌 EMA 都以 0 起算
+        change = 0.0 if self.previous is None else close - self.previous
+        self.gain.update(max(change, 0.0))
+        self.loss.update(max(-change, 0.0))
+        self.previous = close
+
+    @property
+    def value(self):
+        gain, loss = self.gain.value, self.loss.value
+        if gain is None or loss is None:
+            return None
+        return 100.0 if loss == 0 else 100.0 - 100.0 / (1.0 + gain / loss)
+
+    def to_state(self):
+        return {'window': self.window, 'previous': self.previous,
+                'gain': self.gain.to_state(), 'loss': self.loss.to_state()}
+
+    @classmethod
+    def from_state(cls, state):
+        rsi = cls(state['window'])
+        rsi.previous = state['previous']
+        rsi.gain, rsi.loss = EMA.from_state(state['gain']), EMA.from_state(state['loss'])
+        return rsi
+
+
+class MACD:
+    """ta MACD: EMA(fast) - EMA(slow), signal line = EMA(signal) of the MACD line once it is defined."""
+
+    def __init__(self, fast=MACD_WINDOWS[0], slow=MACD_WINDOWS[1], signal=MACD_WINDOWS[2]):
+        self.windows = (fast, slow, signal)
+        self.fast, self.slow, self.signal = EMA.span(fast), EMA.span(slow), EMA.span(signal)
+
+    def update(self, close):
+        self.fast.update(close)
+        self.slow.update(close)
+        line = self.line
+        if line is not None:
+            self.signal.update(line)
+
+    @property
+    def line(self):
+        fast, slow = self.fast.value, self.slow.value
+        return None if fast is None or slow is None else fast - slow
+
+    @property
+    def value(self):
+        """(macd, macd_signal, macd_diff); None entries during warm-up."""
+        line, signal = self.line, self.signal.value
+        return line, signal, (None if line is None or signal is None else line - signal)
+
+    def to_state(self):
+        return {'windows': list(self.windows), 'fast': self.fast.to_state(), 'slow': self.slow.to_state(),
+                'signal': self.signal.to_state()}
+
+    @classmethod
+    def from_state(cls, state):
+        macd = cls(*state['windows'])
+        macd.fast, macd.slow, macd.signal = (EMA.from_state(state[key]) for key in ('fast', 'slow', 'signal'))
+        return macd
+
+
+# ─────────────────────────────────────────────
+# 訊號引擎 (GodSystem 規則 + 逐 K 棒累積績效)
+# ─────────────────────────────────────────────
+def state_dir():
+    return os.path.join(load_config()['data_paths']['strategy'], 'streaming')
+
+
+def default_ma_month():
+    """ma_month of the tuned GodSystem parameters (strategies/god_system_strategy.json)."""
+    try:
+        with open('strategies/god_system_strategy.json', 'r', encoding='utf-8') as f:
+            return int(json.load(f)['ma_month'])
+    except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+        return DEFAULT_MA_MONTH
+
+
+def _sign(value):
+    return (value > 0) - (value < 0)
+
+
+class StreamingSignalEngine:
+    """Incremental GodSystem signals and indicators for one symbol / timeframe."""
+
+    def __init__(self, symbol, timeframe='hourly', ma_month=None, config=None):
+        self.symbol, self.timeframe = symbol, timeframe
+        self.config = config or load_config()
+        self.ma_month = int(ma_month or default_ma_month())
+        self.reset()
+
+    def reset(self):
+        self.sma = RollingStats(self.ma_month)
+        self.bollinger = RollingStats(BOLLINGER[0])
+        self.rsi = WilderRSI(RSI_WINDOW)
+        self.macd = MACD(*MACD_WINDOWS)
+        self.returns = Welford()
+        self.bars = 0
+        self.last_timestamp = None
+        self.last_close = None
+        self.position = 0
+        self.cumulative = 0.0
+        self.peak = None
+        self.max_drawdown = 0.0
+        self.turnover = 0.0
+
+    # ── 更新 ──
+    def update(self, close, timestamp=None):
+        """Apply one bar. Bars not newer than the last applied timestamp are ignored; returns whether it was applied."""
+        if timestamp is not None:
+            timestamp = pd.Timestamp(timestamp)
+            if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+                return False
+        close = float(close)
+        if math.isnan(close):
+            return False
+
+        # 績效：這根 K 棒的報酬 × 上一根的部位 (與 evaluate_signals 的 signal.shift(1) 相同)
+        if self.last_close is not None:
+            strategy_return = (close / self.last_close - 1) * self.position if self.last_close else math.nan
+            if math.isfinite(strategy_return):
+                self.returns.update(strategy_return)
+                self.cumulative += strategy_return
+                self.peak = self.cumulative if self.peak is None else max(self.peak, self.cumulative)
+                self.max_drawdown = max(self.max_drawdown, self.peak - self.cumulative)
+
+        self.sma.update(close)
+        self.bollinger.update(close)
+        self.rsi.update(close)
+        self.macd.update(close)
+
+        average = self.sma.value
+        position = 0 if average is None else _sign(close - average)
+        if self.bars:
+            self.turnover += abs(position - self.position)
+        self.position = position
+        self.last_close = close
+        self.last_timestamp = timestamp if timestamp is not None else self.last_timestamp
+        self.bars += 1
+        return True
+
+    def update_frame(self, df):
+        """
+        Apply the rows of a market frame (date column or DatetimeIndex, close) newer than the last applied bar.
+        If the already-applied last bar was revised in df, the state is rebuilt from the whole frame.
+        Returns the number of bars applied.
+        """
+        if df is None or df.empty or 'close' not in df:
+            return 0
+        dates = pd.to_datetime(df['date'] if 'date' in df else df.index, utc=True)
+        dates = pd.DatetimeIndex(dates)
+        closes = df['close'].to_numpy(dtype=float)
+
+        if self.last_timestamp is not None:
+            revised = closes[dates == self.last_timestamp]
+            if len(revised) and not math.isclose(float(revised[-1]), self.last_close, rel_tol=1e-12):
+                logger.info(f"{self.symbol} {self.timeframe} 最後一根 K 棒已被修正，串流狀態重建")
+                self.reset()
+
+        start = 0 if self.last_timestamp is None else int(dates.searchsorted(self.last_timestamp, side='right'))
+        applied = 0
+        for timestamp, close in zip(dates[start:], closes[start:]):
+            applied += self.update(close, timestamp)
+        return applied
+
+    # ── 輸出 ──
+    def signals(self):
+        """The current result in GodSystemStrategy.backtest's shape (metrics + 'signals' dict)."""
+        sharpe_periods, return_periods = annualization(self.config, self.timeframe)
+        std = self.returns.std(ddof=1)
+        mean = self.returns.mean if self.returns.count else 0.0
+        metrics = {
+            'sharpe_ratio': [mean / std * math.sqrt(sharpe_periods) if std else 0.0],
+            'max_drawdown': [self.max_drawdown],
+            'expected_return': [mean * return_periods],
+            'turnover': [self.turnover / (self.bars - 1) if self.bars > 1 else 0.0],
+            'position': [self.position],
+        }
+        return strategy_result(self.config, metrics, self.last_close or 0.0, self.timeframe)
+
+    def indicators(self):
+        """Latest indicator values (None while an indicator is still warming up)."""
+        std = self.bollinger.std(ddof=0)
+        middle = self.bollinger.value
+        macd, macd_signal, macd_diff = self.macd.value
+        return {
+            'close': self.last_close,
+            'sma': self.sma.value,
+            'rsi': self.rsi.value,
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'macd_diff': macd_diff,
+            'bollinger_mavg': middle,
+            'bollinger_hband': None if middle is None else middle + BOLLINGER[1] * std,
+            'bollinger_lband': None if middle is None else middle - BOLLINGER[1] * std,
+        }
+
+    # ── 持久化 ──
+    def to_state(self):
+        return {
+            'version': STATE_VERSION,
+            'symbol': self.symbol,
+            'timeframe': self.timeframe,
+            'ma_month': self.ma_month,
+            'bars': self.bars,
+            'last_timestamp': None if self.last_timestamp is None else self.last_timestamp.isoformat(),
+            'last_close': self.last_close,
+            'position': self.position,
+            'cumulative': self.cumulative,
+            'peak': self.peak,
+            'max_drawdown': self.max_drawdown,
+            'turnover': self.turnover,
+            'returns': self.returns.to_state(),
+            'sma': self.sma.to_state(),
+            'bollinger': self.bollinger.to_state(),
+            'rsi': self.rsi.to_state(),
+            'macd': self.macd.to_state(),
+        }
+
+    @classmethod
+    def from_state(cls, state, config=None):
+        engine = cls(state['symbol'], state['timeframe'], state['ma_month'], config)
+        engine.bars = state['bars']
+        engine.last_timestamp = None if state['last_timestamp'] is None else pd.Timestamp(state['last_timestamp'])
+        engine.last_close = state['last_close']
+        engine.position = state['position']
+        engine.cumulative, engine.peak = state['cumulative'], state['peak']
+        engine.max_drawdown, engine.turnover = state['max_drawdown'], state['turnover']
+        engine.returns = Welford.from_state(state['returns'])
+        engine.sma = RollingStats.from_state(state['sma'])
+        engine.bollinger = RollingStats.from_state(state['bollinger'])
+        engine.rsi = WilderRSI.from_state(state['rsi'])
+        engine.macd = MACD.from_state(state['macd'])
+        return engine
+
+    @staticmethod
+    def path(symbol, timeframe, directory=None):
+        sanitized = symbol.replace('^', '').replace('.', '_')
+        return os.path.join(directory or state_dir(), f"{sanitized}_{timeframe}.json")
+
+    @classmethod
+    def load(cls, symbol, timeframe='hourly', ma_month=None, config=None, directory=None):
+        """The persisted engine for symbol / timeframe, or a fresh one (missing / unreadable / other ma_month)."""
+        ma_month = int(ma_month or default_ma_month())
+        path = cls.path(symbol, timeframe, directory)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                state = json.load(f)['state']
+            if state.get('version') == STATE_VERSION and state['ma_month'] == ma_month:
+                return cls.from_state(state, config)
+            logger.info(f"{symbol} {timeframe} 串流狀態參數已變更 (ma_month={ma_month})，重新建立")
+        except FileNotFoundError:
+            pass
+        except (OSError, json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            logger.warning(f"串流狀態 {path} 讀取失敗，重新建立: {str(e)}")
+        return cls(symbol, timeframe, ma_month, config)
+
+    def save(self, directory=None):
+        """Write the state (plus the current signals / indicators for readers) atomically."""
+        path = self.path(self.symbol, self.timeframe, directory)
+        payload = {'signals': self.signals(), 'indicators': self.indicators(), 'state': self.to_state()}
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"串流狀態 {path} 寫入失敗: {str(e)}")
+        return path
+
+
+# ─────────────────────────────────────────────
+# 入口
+# ─────────────────────────────────────────────
+def refresh(symbols=None, timeframes=None, frames=None, directory=None):
+    """
+    Bring the persisted engines up to date with the market store (or the given frames:
+    {timeframe: {symbol: df}}) and save them. Returns {symbol: {timeframe: signals result}}.
+    """
+    settings = load_config().get('streaming', {})
+    symbols = settings.get('symbols', ['^TWII']) if symbols is None else symbols
+    timeframes = timeframes or settings.get('timeframes', ['hourly'])
+    results = {}
+    for timeframe in timeframes:
+        for symbol in symbols:
+            df = (frames or {}).get(timeframe, {}).get(symbol)
+            if df is None:
+                from market_store import load_market_data
+                df = load_market_data(symbol, timeframe)
+            if df is None:
+                logger.warning(f"{symbol} 無 {timeframe} 數據，略過串流更新")
+                continue
+            engine = StreamingSignalEngine.load(symbol, timeframe, directory=directory)
+            applied = engine.update_frame(df)
+            engine.save(directory)
+            result = engine.signals()
+            results.setdefault(symbol, {})[timeframe] = result
+            logger.info(f"{symbol} {timeframe} 串流更新 {applied} 根 K 棒 (共 {engine.bars} 根): "
+                        f"{result['signals']['position']}")
+    return results
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Update the streaming signal state and print the current signals')
+    parser.add_argument('--symbol', action='append', help='Symbol (repeatable; default config streaming.symbols)')
+    parser.add_argument('--timeframe', action='append', help='daily / hourly (repeatable; default config streaming.timeframes)')
+    args = parser.parse_args()
+    print(json.dumps(refresh(args.symbol, args.timeframe), ensure_ascii=False, indent=2))
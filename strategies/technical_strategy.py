@@ -1,9 +1,11 @@
 import pandas as pd
 import numpy as np
 from .base_strategy import BaseStrategy
-from .utils import generate_performance_chart
-import ta
+from .charts import equity_curve
+from .backtest_core import evaluate_signals, annualization, strategy_result
+from . import indicator_cache as indicators
 from loguru import logger
+from sentiment_history import attach_sentiment
 import json
 import datetime
 
@@ -134,14 +136,14 @@ class TechnicalStrategy(BaseStrategy):
                 logger.warning(f"{symbol} data insufficient or empty")
                 return self._default_results()
 
-            # Calculate technical indicators
-            df['rsi'] = ta.momentum.RSIIndicator(df['close'], window=rsi_window).rsi()
-            df['sma_20'] = ta.trend.SMAIndicator(df['close'], window=sma_window).sma_indicator()
-            df['macd'] = ta.trend.MACD(df['close'], window_fast=macd_fast, window_slow=macd_slow, window_sign=macd_signal).macd()
-            df['macd_signal'] = ta.trend.MACD(df['close'], window_fast=macd_fast, window_slow=macd_slow, window_sign=macd_signal).macd_signal()
-            df['bollinger_hband'] = ta.volatility.BollingerBands(df['close']).bollinger_hband()
-            df['bollinger_lband'] = ta.volatility.BollingerBands(df['close']).bollinger_lband()
-            sentiment_score = self._load_sentiment_score(symbol, timeframe)
+            # Calculate technical indicators (shared cache with the other strategies / MarketAnalyst)
+            df['rsi'] = indicators.rsi(df['close'], rsi_window, symbol, timeframe)
+            df['sma_20'] = indicators.sma(df['close'], sma_window, symbol, timeframe)
+            df['macd'], df['macd_signal'], _ = indicators.macd(df['close'], macd_fast, macd_slow, macd_signal, symbol, timeframe)
+            df['bollinger_hband'], df['bollinger_lband'], _ = indicators.bollinger(df['close'], symbol=symbol, timeframe=timeframe)
+            # 歷史 K 棒用當日回補的情緒分數，只有最新一根用今天的分數
+            df = attach_sentiment(df, symbol, self._load_sentiment_score(symbol, timeframe))
+            sentiment_score = df['sentiment_score']
 
             # Generate signals
             df['signal'] = 0
@@ -154,38 +156,13 @@ class TechnicalStrategy(BaseStrategy):
                    (df['close'] >= df['bollinger_hband']) &
                    (sentiment_score < -0.5), 'signal'] = -1
 
-            # Calculate returns
-            df['returns'] = df['close'].pct_change()
-            df['strategy_returns'] = df['returns'] * df['signal'].shift(1)
-            sharpe_ratio = df['strategy_returns'].mean() / df['strategy_returns'].std() * np.sqrt(
-                self.config['strategy_params']['sharpe_annualization_daily'] if timeframe == 'daily' else self.config['strategy_params']['sharpe_annualization_hourly']
-            ) if df['strategy_returns'].std() != 0 else 0
-            max_drawdown = (df['strategy_returns'].cumsum().cummax() - df['strategy_returns'].cumsum()).max()
-            expected_return = df['strategy_returns'].mean() * (
-                self.config['strategy_params']['expected_return_annualization_daily'] if timeframe == 'daily' else self.config['strategy_params']['expected_return_annualization_hourly']
-            )
+            metrics = evaluate_signals(df['close'].to_numpy(), df['signal'].to_numpy(), *annualization(self.config, timeframe))
+            df['strategy_returns'] = metrics['strategy_returns'][:, 0]
+            result = strategy_result(self.config, metrics, df['close'].iloc[-1], timeframe)
 
-            # Generate signals
-            latest_close = df['close'].iloc[-1]
-            multiplier = self.config['strategy_params']['daily_multiplier'] if timeframe == 'daily' else self.config['strategy_params']['hourly_multiplier']
-            signals = {
-                'position': 'LONG' if df['signal'].iloc[-1] == 1 else 'NEUTRAL' if df['signal'].iloc[-1] == 0 else 'SHORT',
-                'entry_price': latest_close,
-                'target_price': latest_close * multiplier,
-                'stop_loss': latest_close * self.config['strategy_params']['stop_loss_ratio'],
-                'position_size': self.config['strategy_params']['position_size']
-            }
-
-            # Generate performance chart
-            chart_url = generate_performance_chart(df, symbol, timeframe)
-
-            return {
-                'sharpe_ratio': sharpe_ratio if not np.isnan(sharpe_ratio) else 0,
-                'max_drawdown': max_drawdown if not np.isnan(max_drawdown) else 0,
-                'expected_return': expected_return if not np.isnan(expected_return) else 0,
-                'signals': signals,
-                'chart_url': chart_url
-            }
+            # Chart data only; rendering happens outside the backtest (strategies/charts.py)
+            result['equity_curve'] = equity_curve(df)
+            return result
         except Exception as e:
             logger.error(f"{symbol} {timeframe} 回測失敗: {str(e)}")
             return self._default_results()
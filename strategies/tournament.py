@@ -0,0 +1,225 @@
+"""
+strategies/tournament.py - 多程序策略錦標賽 (symbol × strategy × 參數區塊)
+
+StrategyEngine 過去依序跑 標的 → 策略 → 參數組合，並且就地改寫 strategy.params，無法平行。
+run_tournament 將工作拆成 (symbol, strategy, param-chunk) 任務交給 process pool：
+
+    results = run_tournament({'QQQ': df}, {'bigline': (BigLineStrategy, grid_params)}, workers=4)
+    results['QQQ']['bigline']   # 最佳參數的完整回測結果 (+ params, grid_size, equity_curve)
+
+- 價格以 SharedFrame 放進 multiprocessing.shared_memory，任務只攜帶區塊名稱與欄位描述，不 pickle DataFrame；
+  worker 每個標的只 attach / 重建一次 (各自一份私有副本)。
+- 每個任務都以 cls(config, params) 建立新的策略實例，不共用、不改寫任何實例。
+- 歸併是確定性的：各區塊的列依組合原始順序接回，再以 grid_evaluator.rank_rows 穩定排序，
+  與完成順序、worker 數無關；workers=1 與單執行緒的結果相同。
+第一輪為網格評分，第二輪為每個 (symbol, strategy) 以最佳參數跑一次完整回測。
+"""
+
+import math
+import os
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+import pandas as pd
+from loguru import logger
+import tracing
+from tracing import span
+from config import load_config
+from .grid_evaluator import score_combinations, rank_rows, save_grid
+from .utils import get_param_combinations
+
+
+# ─────────────────────────────────────────────
+# SharedFrame：DataFrame ↔ 共享記憶體
+# ─────────────────────────────────────────────
+@dataclass(frozen=True)
+class SharedFrame:
+    """
+    Picklable descriptor of a frame packed into one shared-memory block of shape (rows, columns) × 8 bytes.
+    Numeric columns are stored as float64, datetime columns / index as int64 ticks of their unit.
+    Constant non-numeric columns (e.g. the `symbol` category) travel in the descriptor itself.
+    """
+    shm_name: str
+    n_rows: int
+    columns: tuple           # ((name, kind, unit, tz), ...) kind: 'f' float64 / 'M' datetime
+    index: Optional[tuple]   # (name, unit, tz) of a DatetimeIndex stored as the last column, else None
+    constants: tuple = ()    # ((name, value), ...)
+
+    @classmethod
+    def create(cls, df):
+        """Copy df into a new shared-memory block; returns (descriptor, SharedMemory owner handle)."""
+        from multiprocessing import shared_memory
+        columns, constants, arrays = [], [], []
+        for name in df.columns:
+            series = df[name]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                dates = pd.DatetimeIndex(series)
+                columns.append((name, 'M', dates.unit, str(dates.tz) if dates.tz else None))
+                arrays.append(dates.asi8)
+            elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                columns.append((name, 'f', None, None))
+                arrays.append(series.to_numpy(dtype=np.float64, na_value=np.nan))
+            elif series.nunique(dropna=False) <= 1:
+                constants.append((name, series.iloc[0] if len(series) else None))
+            else:
+                logger.warning(f"SharedFrame 略過非數值欄位 {name}")
+        index = None
+        if isinstance(df.index, pd.DatetimeIndex):
+            index = (df.index.name, df.index.unit, str(df.index.tz) if df.index.tz else None)
+            arrays.append(df.index.asi8)
+
+        n_rows, n_cols = len(df), len(arrays)
+        shm = shared_memory.SharedMemory(create=True, size=max(n_rows * n_cols * 8, 1))
+        block = np.ndarray((n_rows, n_cols), dtype=np.float64, buffer=shm.buf)
+        for j, values in enumerate(arrays):
+            if values.dtype == np.int64:
+                block.view(np.int64)[:, j] = values
+            else:
+                block[:, j] = values
+        descriptor = cls(shm.name, n_rows, tuple(columns), index, tuple(constants))
+        return descriptor, shm
+
+    def to_frame(self):
+        """Attach and rebuild the frame (detached from the shared block; workers cache it, see _frame)."""
+        from multiprocessing import shared_memory
+        n_cols = len(self.columns) + (1 if self.index else 0)
+        shm = shared_memory.SharedMemory(name=self.shm_name)
+        try:
+            block = np.ndarray((self.n_rows, n_cols), dtype=np.float64, buffer=shm.buf)
+            data = {}
+            for j, (name, kind, unit, tz) in enumerate(self.columns):
+                data[name] = (_dates(block.view(np.int64)[:, j], unit, tz) if kind == 'M' else block[:, j].copy())
+            index = None
+            if self.index:
+                name, unit, tz = self.index
+                index = _dates(block.view(np.int64)[:, -1], unit, tz, name=name)
+            frame = pd.DataFrame(data, index=index)
+            del block
+        finally:
+            shm.close()
+        for name, value in self.constants:
+            frame[name] = value
+        return frame
+
+
+def _dates(ticks, unit, tz, name=None):
+    dates = pd.DatetimeIndex(np.array(ticks, dtype=f'datetime64[{unit}]'), name=name)
+    return dates.tz_localize(tz) if tz else dates
+
+
+# ─────────────────────────────────────────────
+# Worker 端
+# ─────────────────────────────────────────────
+_worker_frames = {}
+
+
+def _init_worker():
+    tracing.drain()  # events inherited from the parent through fork
+    _worker_frames.clear()
+
+
+def _frame(source):
+    """
+    The task's own copy of its price frame: a SharedFrame is attached once per worker and cached,
+    in-process runs pass the DataFrame itself. Tasks may add columns freely without leaking into the next task.
+    """
+    if not isinstance(source, SharedFrame):
+        return source.copy()
+    if source.shm_name not in _worker_frames:
+        _worker_frames[source.shm_name] = source.to_frame()
+    return _worker_frames[source.shm_name].copy()
+
+
+def _score_task(task):
+    """Phase 1: metric rows of one parameter chunk, scored on a fresh strategy instance."""
+    symbol, name, cls, config, source, timeframe, start, chunk = task
+    with span("tournament.score", cat="strategy", symbol=symbol, strategy=name, size=len(chunk)):
+        rows = score_combinations(cls(config, chunk[0]), symbol, _frame(source), timeframe, chunk)
+    return (symbol, name, start, rows), tracing.drain()
+
+
+def _backtest_task(task):
+    """Phase 2: the full backtest of the winning combination."""
+    symbol, name, cls, config, source, timeframe, params = task
+    with span("tournament.backtest", cat="strategy", symbol=symbol, strategy=name):
+        result = cls(config, params).backtest(symbol, _frame(source), timeframe)
+    return (symbol, name, result), tracing.drain()
+
+
+# ─────────────────────────────────────────────
+# 錦標賽
+# ─────────────────────────────────────────────
+def _chunks(combinations, chunk_size):
+    return [(start, combinations[start:start + chunk_size]) for start in range(0, len(combinations), chunk_size)]
+
+
+def _map(fn, tasks, pool):
+    """Task outputs in task order; the trace events each task drained are merged back."""
+    outputs = []
+    for output, events in (pool.map(fn, tasks) if pool else map(fn, tasks)):
+        tracing.merge(events)
+        outputs.append(output)
+    return outputs
+
+
+def run_tournament(frames, strategies, timeframe='daily', workers=None, chunk_size=None, persist=True):
+    """
+    frames: {symbol: DataFrame}; strategies: {name: (strategy class, grid params)}.
+    Returns {symbol: {name: best-params backtest result + params, grid_size}} in input order.
+    workers: processes (config tournament.workers, default os.cpu_count()); 1 runs in-process.
+    chunk_size: combinations per task (default: enough chunks to give every worker work per strategy).
+    """
+    config = load_config()
+    settings = config.get('tournament', {})
+    workers = workers or settings.get('workers') or os.cpu_count() or 1
+    grids = {name: get_param_combinations(params) for name, (_, params) in strategies.items()}
+
+    owners = []
+    pool = None
+    try:
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            sources = {}
+            for symbol, df in frames.items():
+                sources[symbol], shm = SharedFrame.create(df)
+                owners.append(shm)
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        else:
+            sources = dict(frames)
+
+        tasks = []
+        for symbol in frames:
+            for name, (cls, _) in strategies.items():
+                combinations = grids[name]
+                size = chunk_size or settings.get('chunk_size') or max(1, math.ceil(len(combinations) / workers))
+                tasks += [(symbol, name, cls, config, sources[symbol], timeframe, start, chunk)
+                          for start, chunk in _chunks(combinations, size)]
+        logger.info(f"錦標賽: {len(frames)} 標的 × {len(strategies)} 策略，{len(tasks)} 個任務，{workers} 個 worker")
+
+        rows = {}
+        for symbol, name, start, chunk_rows in _map(_score_task, tasks, pool):
+            rows.setdefault((symbol, name), []).append((start, chunk_rows))
+
+        tables, finals = {}, []
+        for symbol in frames:
+            for name, (cls, _) in strategies.items():
+                ordered = [row for _, chunk_rows in sorted(rows[(symbol, name)], key=lambda item: item[0]) for row in chunk_rows]
+                table = rank_rows(ordered, grids[name])
+                if persist:
+                    save_grid(table, name, symbol, timeframe)
+                tables[(symbol, name)] = table
+                finals.append((symbol, name, cls, config, sources[symbol], timeframe, table.iloc[0]['params']))
+
+        results = {symbol: {} for symbol in frames}
+        for symbol, name, result in _map(_backtest_task, finals, pool):
+            table = tables[(symbol, name)]
+            result['params'] = table.iloc[0]['params']
+            result['grid_size'] = len(table)
+            results[symbol][name] = result
+        return results
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        for shm in owners:
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,199 @@
+"""
+strategies/walk_forward.py - Walk-forward 樣本外 (out-of-sample) 評估
+
+錦標賽的 Sharpe / 預期報酬都是在調參的同一段資料上算出來的 (樣本內)。walk_forward 將歷史切成
+依時間前進的 (train, test) 視窗，參數只用 train 決定、績效只在 test 計算，最後把各 test 段的逐 K 棒報酬
+接成一條樣本外報酬曲線計算指標：
+
+    folds = make_folds(len(close), train=120, test=20)                  # rolling
+    folds = make_folds(len(close), train=120, test=20, expanding=True)  # expanding (train 起點固定為 0)
+    report = walk_forward(BigLineStrategy(config, grid_params), 'QQQ', df, 'daily')
+    report['score'], report['sharpe_ratio'], report['folds']
+
+視窗大小取自 config walk_forward.{daily,hourly}.train / test，mode = rolling / expanding。
+
+兩類策略：
+    signal_grid 策略 (BigLine / GodSystem)  指標與 (n, k) 訊號矩陣在全歷史上只算一次 (皆為因果的 rolling / EWM，
+                                            與逐 fold 重算等價)，每個 fold 只切片：train 段依 tournament_score 選組合，
+                                            test 段取該組合的報酬。這部分是純 NumPy 切片，在本程序內完成。
+    fit 策略 (MLStrategy)                   提供 walk_forward_data() → (close, X, y) 與 fit_predict()；每個 fold 在 train 段內
+                                            再切出最後 20% 做驗證選超參數，以整段 train 重新訓練後預測 test 段。
+                                            fold 之間彼此獨立，交給 process pool 平行執行。
+label 為下一根 K 棒的報酬，train 段最後一根不參與訓練 (purge)，它的預測即 test 段第一個部位。
+其餘策略 (沒有上述 hook) 回傳 None。
+"""
+
+import os
+from dataclasses import dataclass, asdict
+from functools import partial
+import numpy as np
+from loguru import logger
+import tracing
+from tracing import span
+from config import load_config
+from .backtest_core import evaluate_signals, returns_metrics, annualization
+from .grid_evaluator import tournament_score
+from .utils import get_param_combinations
+
+DEFAULT_WINDOWS = {'daily': {'train': 120, 'test': 20}, 'hourly': {'train': 240, 'test': 40}}
+VALIDATION_SIZE = 0.2
+
+
+@dataclass(frozen=True)
+class Fold:
+    train_start: int
+    train_end: int   # exclusive; test_start == train_end
+    test_end: int    # exclusive
+
+    @property
+    def test_start(self):
+        return self.train_end
+
+
+def make_folds(n_rows, train, test, expanding=False, step=None):
+    """Consecutive folds with full test windows; step defaults to the test size (non-overlapping tests)."""
+    step = step or test
+    folds = []
+    train_end = train
+    while train_end + test <= n_rows:
+        folds.append(Fold(0 if expanding else train_end - train, train_end, train_end + test))
+        train_end += step
+    return folds
+
+
+def fold_settings(timeframe):
+    settings = load_config().get('walk_forward', {})
+    windows = {**DEFAULT_WINDOWS.get(timeframe, DEFAULT_WINDOWS['daily']), **settings.get(timeframe, {})}
+    return windows['train'], windows['test'], settings.get('mode', 'rolling') == 'expanding'
+
+
+def _periods(config, timeframe):
+    return annualization(config, timeframe) if timeframe == 'daily' else (52, 52)
+
+
+# ─────────────────────────────────────────────
+# signal_grid 策略：全歷史算一次，fold 只切片
+# ─────────────────────────────────────────────
+def _grid_folds(strategy, symbol, data, timeframe, combinations, folds_for, periods):
+    grid = strategy.signal_grid(symbol, data, timeframe, combinations)
+    if grid is None:
+        return None
+    close, signals = grid
+    strategy_returns = evaluate_signals(close, signals, *periods)['strategy_returns']
+    folds = folds_for(len(close))
+    outcomes = []
+    for fold in folds:
+        train = returns_metrics(strategy_returns[fold.train_start:fold.train_end], *periods)
+        best = int(np.argmax(tournament_score(train['expected_return'], train['max_drawdown'])))
+        test = slice(fold.test_start, fold.test_end)
+        outcomes.append((fold, best, strategy_returns[test, best], np.asarray(signals[test, best], dtype=float)))
+    return outcomes
+
+
+# ─────────────────────────────────────────────
+# fit 策略：每個 fold 一個 (可平行) 任務
+# ─────────────────────────────────────────────
+def _signals(predictions):
+    return np.where(np.asarray(predictions) == 1, 1.0, -1.0)
+
+
+def _fit_fold(cls, config, combinations, datasets, combo_data, periods, fold):
+    """Pick the combination on the train window's validation tail, refit on the whole window, predict the test."""
+    with span("walk_forward.fold", cat="strategy", train=fold.train_end - fold.train_start):
+        inner = fold.train_start + int((fold.train_end - fold.train_start) * (1 - VALIDATION_SIZE))
+        scores = []
+        for params, d in zip(combinations, combo_data):
+            close, X, y = datasets[d]
+            predictions = cls(config, params).fit_predict(X[fold.train_start:inner - 1], y[fold.train_start:inner - 1],
+                                                          X[inner - 1:fold.train_end])
+            metrics = evaluate_signals(close[inner - 1:fold.train_end], _signals(predictions), *periods)
+            scores.append(tournament_score(metrics['expected_return'][0], metrics['max_drawdown'][0]))
+        best = int(np.argmax(scores))
+
+        close, X, y = datasets[combo_data[best]]
+        predictions = cls(config, combinations[best]).fit_predict(
+            X[fold.train_start:fold.train_end - 1], y[fold.train_start:fold.train_end - 1], X[fold.test_start - 1:fold.test_end])
+        signals = _signals(predictions)
+        returns = evaluate_signals(close[fold.test_start - 1:fold.test_end], signals, *periods)['strategy_returns'][1:, 0]
+    return (fold, best, returns, signals[1:]), tracing.drain()
+
+
+def _fitted_folds(strategy, symbol, data, timeframe, combinations, folds_for, periods, workers):
+    cls, config = type(strategy), strategy.config
+    datasets, fingerprints, combo_data = [], {}, []
+    for params in combinations:
+        arrays = cls(config, params).walk_forward_data(symbol, data, timeframe)
+        if arrays is None:
+            return None
+        key = tuple(np.asarray(a).tobytes() for a in arrays)
+        if key not in fingerprints:
+            fingerprints[key] = len(datasets)
+            datasets.append(arrays)
+        combo_data.append(fingerprints[key])
+    if len({len(arrays[0]) for arrays in datasets}) != 1:
+        logger.warning(f"{symbol} 各參數組合的特徵列數不同，無法 walk-forward")
+        return None
+
+    folds = folds_for(len(datasets[0][0]))
+    task = partial(_fit_fold, cls, config, combinations, datasets, combo_data, periods)
+    if workers <= 1 or len(folds) <= 1:
+        outputs = [task(fold) for fold in folds]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=min(workers, len(folds)), initializer=tracing.drain) as pool:
+            outputs = list(pool.map(task, folds))
+    outcomes = []
+    for outcome, events in outputs:
+        tracing.merge(events)
+        outcomes.append(outcome)
+    return outcomes
+
+
+# ─────────────────────────────────────────────
+# 入口
+# ─────────────────────────────────────────────
+def walk_forward(strategy, symbol, data, timeframe='daily', train=None, test=None, expanding=None, workers=None):
+    """
+    Out-of-sample report for strategy (its params are the grid to choose from per fold), or None when
+    the strategy has no walk-forward hook, does not apply to symbol, or the history is shorter than one fold.
+    """
+    default_train, default_test, default_expanding = fold_settings(timeframe)
+    train, test = train or default_train, test or default_test
+    expanding = default_expanding if expanding is None else expanding
+    workers = workers or load_config().get('walk_forward', {}).get('workers') or os.cpu_count() or 1
+    combinations = get_param_combinations(strategy.params)
+    periods = _periods(strategy.config, timeframe)
+
+    def folds_for(n_rows):
+        return make_folds(n_rows, train, test, expanding)
+
+    with span("walk_forward", cat="strategy", symbol=symbol, strategy=type(strategy).__name__):
+        if hasattr(strategy, 'signal_grid'):
+            outcomes = _grid_folds(strategy, symbol, data, timeframe, combinations, folds_for, periods)
+        elif hasattr(strategy, 'walk_forward_data'):
+            outcomes = _fitted_folds(strategy, symbol, data, timeframe, combinations, folds_for, periods, workers)
+        else:
+            logger.info(f"{type(strategy).__name__} 不支援 walk-forward，略過")
+            return None
+    if not outcomes:
+        return None
+
+    returns = np.concatenate([r for _, _, r, _ in outcomes])
+    signals = np.concatenate([s for _, _, _, s in outcomes])
+    metrics = {key: float(value[0]) for key, value in returns_metrics(returns, *periods).items()}
+    fold_reports = []
+    for fold, best, fold_returns, _ in outcomes:
+        fold_metrics = returns_metrics(fold_returns, *periods)
+        fold_reports.append({**asdict(fold), 'params': combinations[best],
+                             **{key: float(value[0]) for key, value in fold_metrics.items()}})
+    report = {
+        **metrics,
+        'turnover': float(np.abs(np.diff(signals)).mean()) if len(signals) > 1 else 0.0,
+        'score': float(tournament_score(metrics['expected_return'], metrics['max_drawdown'])),
+        'n_folds': len(outcomes),
+        'mode': 'expanding' if expanding else 'rolling',
+        'folds': fold_reports,
+    }
+    logger.info(f"{symbol} {type(strategy).__name__} walk-forward {report['n_folds']} 折 ({report['mode']}): "
+                f"OOS Sharpe={report['sharpe_ratio']:.2f}, Expected Return={report['expected_return']:.2f}")
+    return report
@@ -2,28 +2,17 @@ import json
 import os
 from datetime import datetime
 from loguru import logger
-from copy import deepcopy
-from strategies.technical_strategy import TechnicalStrategy
-from strategies.ml_strategy import MLStrategy
-from strategies.bigline_strategy import BigLineStrategy
-from strategies.god_system_strategy import GodSystemStrategy
-from strategies.utils import get_param_combinations
-from config import get_market_data_path
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import ta
-import yfinance as yf
-from threading import Thread
 import schedule
 import time
 
+# 策略 (pandas / matplotlib / scikit-learn) 與市場數據在第一次使用時才載入
+
+from config import load_config
 # 統一 NIM API
 from nim_api import call_nim, ask_nim_json, list_available_models
 
 # Load config.json
-with open('config.json', 'r', encoding='utf-8') as f:
-    config = json.load(f)
+config = load_config()
 
 # Configure logging
 logger.add(config['logging']['file'], rotation=config['logging']['rotation'])
@@ -39,6 +28,10 @@ class StrategyEngine:
 
     def _load_strategies(self):
         """Load strategies, prioritize optimized params"""
+        from strategies.technical_strategy import TechnicalStrategy
+        from strategies.ml_strategy import MLStrategy
+        from strategies.bigline_strategy import BigLineStrategy
+        from strategies.god_system_strategy import GodSystemStrategy
         strategy_classes = {
             'technical': TechnicalStrategy,
             'ml': MLStrategy,
@@ -75,55 +68,81 @@ class StrategyEngine:
                 logger.error(f"Invalid JSON in {path}: {e}")
         return None
 
-    def run_strategy_tournament(self, symbol, data, timeframe='daily', index_symbol=None):
-        """Run strategy backtests"""
-        results = {}
-        best_results = {}
-        index_symbol = index_symbol or ('^TWII' if symbol == '0050.TW' else '^IXIC')
-        
-        for name, strategy in self.models.items():
-            param_combinations = get_param_combinations(strategy.params)
-            best_score = -float('inf')
-            best_param_result = None
-            
-            for params in param_combinations:
-                strategy.params = params
-                result = strategy.backtest(symbol, data, timeframe)
-                score = result.get('expected_return', 0) / (result.get('max_drawdown', 1) + 1e-9)
-                if score > best_score:
-                    best_score = score
-                    best_param_result = result
-                    best_param_result['params'] = params
-            
-            results[name] = best_param_result
-            best_results[name] = best_param_result
-            logger.info(f"{name} strategy for {symbol}: Sharpe={best_param_result['sharpe_ratio']:.2f}, "
-                       f"Max Drawdown={best_param_result['max_drawdown']:.2f}, "
-                       f"Expected Return={best_param_result['expected_return']:.2f}")
-        
+    def run_strategy_tournament(self, symbol, data, timeframe='daily', index_symbol=None, workers=None, rank_by=None):
+        """
+        Rank every parameter combination per strategy (vectorized grid pass, strategies/grid_evaluator.py),
+        then run the full backtest (signals) once for the winning combination. Charts of the winners are
+        rendered together afterwards (strategies/charts.py) — never per combination.
+        rank_by='oos' also scores each strategy walk-forward (strategies/walk_forward.py) and orders by that.
+        """
+        return self.run_tournament({symbol: data}, timeframe, workers, rank_by)[symbol]
+
+    def run_tournament(self, frames, timeframe='daily', workers=None, rank_by=None):
+        """
+        Tournament for several symbols at once on a process pool (strategies/tournament.py).
+        self.models only supplies each strategy's class and parameter grid; tasks build their own instances.
+        rank_by: 'in_sample' (default, config tournament.rank_by) keeps the strategy order;
+        'oos' adds result['oos'] (walk-forward report without the per-fold detail) and result['rank'],
+        and orders each symbol's strategies by out-of-sample score (strategies without a score last).
+        """
+        from strategies.tournament import run_tournament
+        from strategies.charts import chart_job, render_charts
+        rank_by = rank_by or config.get('tournament', {}).get('rank_by', 'in_sample')
+        specs = {name: (type(strategy), strategy.params) for name, strategy in self.models.items()}
+        results = run_tournament(frames, specs, timeframe, workers=workers)
+        if rank_by == 'oos':
+            results = {symbol: self._rank_out_of_sample(symbol, frames[symbol], timeframe, per_strategy, workers)
+                       for symbol, per_strategy in results.items()}
+
+        jobs = {}
+        for symbol, per_strategy in results.items():
+            for name, result in per_strategy.items():
+                jobs[(symbol, name)] = chart_job(symbol, timeframe, result, label=name)
+                logger.info(f"{name} strategy for {symbol} ({result['grid_size']} combinations): Sharpe={result['sharpe_ratio']:.2f}, "
+                            f"Max Drawdown={result['max_drawdown']:.2f}, "
+                            f"Expected Return={result['expected_return']:.2f}")
+        urls = render_charts(jobs.values())
+        for (symbol, name), job in jobs.items():
+            if job is not None:
+                results[symbol][name]['chart_url'] = urls.get(job.key)
         return results
 
+    def _rank_out_of_sample(self, symbol, data, timeframe, per_strategy, workers=None):
+        from strategies.walk_forward import walk_forward
+        scores = {}
+        for name, result in per_strategy.items():
+            report = walk_forward(self.models[name], symbol, data, timeframe, workers=workers)
+            if report is not None:
+                result['oos'] = {key: value for key, value in report.items() if key != 'folds'}
+                scores[name] = report['score']
+        ranked = sorted(per_strategy, key=lambda name: (name not in scores, -scores.get(name, 0.0)))
+        for rank, name in enumerate(ranked, start=1):
+            per_strategy[name]['rank'] = rank
+        logger.info(f"{symbol} 樣本外排名: {', '.join(f'{name}={scores[name]:.2f}' if name in scores else f'{name}=N/A' for name in ranked)}")
+        return {name: per_strategy[name] for name in ranked}
+
     def daily_backtest(self, mode='tw'):
         """Run daily backtest for all strategies using data from data_collector"""
+        from market_store import load_market_data
         logger.info(f"執行每日回測 for {mode} at {datetime.now()}")
         symbols = config['symbols'][mode]
-        
+
+        frames = {}
         for symbol in symbols:
             try:
-                csv_file = get_market_data_path(symbol, 'daily')
-                daily_df = pd.read_csv(csv_file)
-                daily_df['date'] = pd.to_datetime(daily_df['date'])
-                daily_df.set_index('date', inplace=True)
-                logger.info(f"Successfully loaded data for {symbol} from {csv_file}")
-            except FileNotFoundError:
-                logger.error(f"Data file not found for {symbol} at {csv_file}, skipping backtest.")
-                continue
+                daily_df = load_market_data(symbol, 'daily', market_dir=config['data_paths']['market'], index=True)
+                if daily_df is None:
+                    logger.error(f"Data file not found for {symbol}, skipping backtest.")
+                    continue
+                logger.info(f"Successfully loaded data for {symbol}")
+                frames[symbol] = daily_df
             except Exception as e:
                 logger.error(f"Failed to load data for {symbol}: {str(e)}")
                 continue
 
-            results = self.run_strategy_tournament(symbol, daily_df, timeframe='daily')
-            
+        all_results = self.run_tournament(frames, timeframe='daily')
+
+        for symbol, results in all_results.items():
             if 'god_system' in results:
                 god_result = results['god_system']
                 logger.info(f"GodSystemStrategy for {symbol}: "
@@ -0,0 +1,108 @@
+"""
+symbol_matcher.py - 新聞 → 標的 單次掃描比對器
+
+由標的代碼、content_creator.STOCK_NAMES 與 config.TW_MARKET_NAMES / US_MARKET_NAMES
+的中英文名稱建立一個合併的 regex，每則新聞 (title + description) 只掃描一次，
+即可找出所有提到的標的與位置 (供後續標示重點用)。
+
+    matcher = get_matcher(SYMBOLS["tw"])
+    news_by_symbol, matches = matcher.route(news_items)
+    # matches[i] = {"2330.TW": [("title", 0, 3)], ...}  對應 news_items[i]
+"""
+
+import re
+from functools import lru_cache
+
+_ASCII_WORD = re.compile(r"^[A-Za-z0-9]")
+_FIELDS = ("title", "description")
+
+
+def default_aliases(symbols):
+    """Ticker, bare code and every known display name for each symbol."""
+    from config import TW_MARKET_NAMES, US_MARKET_NAMES
+    from content_creator import STOCK_NAMES
+
+    aliases = {}
+    for symbol in symbols:
+        names = {symbol, symbol.lstrip("^")}
+        if symbol.endswith(".TW"):
+            names.add(symbol[:-3])
+        for table in (STOCK_NAMES, TW_MARKET_NAMES, US_MARKET_NAMES):
+            if symbol in table:
+                names.add(table[symbol])
+        aliases[symbol] = {n for n in names if n}
+    return aliases
+
+
+def _pattern(alias):
+    escaped = re.escape(alias)
+    # 英數別名需要字界，避免 "SPY" 命中 "SPYDER"；中文名稱不需要
+    if _ASCII_WORD.match(alias):
+        escaped = rf"(?<![A-Za-z0-9]){escaped}"
+    if re.search(r"[A-Za-z0-9]$", alias):
+        escaped = rf"{escaped}(?![A-Za-z0-9])"
+    return escaped
+
+
+class SymbolMatcher:
+    """Compiled multi-pattern matcher from aliases to symbols."""
+
+    def __init__(self, aliases):
+        self.symbols = list(aliases)
+        self.alias_to_symbols = {}
+        for symbol, names in aliases.items():
+            for name in names:
+                self.alias_to_symbols.setdefault(name, []).append(symbol)
+        # 長別名優先 (例如 "台積電ADR" 優先於 "台積電")
+        ordered = sorted(self.alias_to_symbols, key=len, reverse=True)
+        self.regex = re.compile("|".join(f"({_pattern(a)})" for a in ordered)) if ordered else None
+        self._group_alias = {i + 1: a for i, a in enumerate(ordered)}
+
+    def find(self, text):
+        """Return [(symbol, start, end)] for every alias occurrence in text."""
+        if not text or self.regex is None:
+            return []
+        hits = []
+        for m in self.regex.finditer(text):
+            alias = self._group_alias[m.lastindex]
+            for symbol in self.alias_to_symbols[alias]:
+                hits.append((symbol, m.start(), m.end()))
+        return hits
+
+    def match_item(self, item):
+        """Scan title + description once; returns {symbol: [(field, start, end)]}."""
+        parts = [item.get(f) or "" for f in _FIELDS]
+        text = "\n".join(parts)
+        bounds = []
+        offset = 0
+        for field, part in zip(_FIELDS, parts):
+            bounds.append((field, offset, offset + len(part)))
+            offset += len(part) + 1
+        found = {}
+        for symbol, start, end in self.find(text):
+            for field, lo, hi in bounds:
+                if lo <= start < hi:
+                    found.setdefault(symbol, []).append((field, start - lo, end - lo))
+                    break
+        return found
+
+    def route(self, items):
+        """Route every item to all matching symbols; returns (news_by_symbol, per-item matches)."""
+        news_by_symbol = {symbol: [] for symbol in self.symbols}
+        matches = []
+        for item in items:
+            found = self.match_item(item)
+            for symbol in found:
+                news_by_symbol[symbol].append(item)
+            matches.append(found)
+        return news_by_symbol, matches
+
+
+@lru_cache(maxsize=8)
+def _cached_matcher(symbols):
+    return SymbolMatcher(default_aliases(symbols))
+
+
+def get_matcher(symbols):
+    """Matcher for a symbol universe, built once per process."""
+    return _cached_matcher(tuple(symbols))
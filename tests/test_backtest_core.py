@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategies.backtest_core import evaluate_signals
+
+
+def _pandas_reference(close, signal, periods):
+    """The per-strategy pandas formulation the core replaces."""
+    df = pd.DataFrame({"close": close, "signal": signal})
+    df["strategy_returns"] = df["close"].pct_change() * df["signal"].shift(1)
+    std = df["strategy_returns"].std()
+    sharpe = df["strategy_returns"].mean() / std * np.sqrt(periods) if std != 0 else 0
+    cum = df["strategy_returns"].cumsum()
+    drawdown = (cum.cummax() - cum).max()
+    expected = df["strategy_returns"].mean() * periods
+    return [0 if np.isnan(v) else v for v in (sharpe, drawdown, expected)]
+
+
+def test_signal_matrix_matches_pandas_per_column():
+    rng = np.random.default_rng(7)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, 300))
+    close[150] = np.nan  # a missing bar propagates NaN returns, as in pandas
+    signals = np.column_stack([
+        np.sign(rng.normal(size=300)),
+        np.ones(300),
+        np.zeros(300),
+        np.where(np.arange(300) % 20 < 10, 1, -1),
+    ])
+
+    metrics = evaluate_signals(close, signals, sharpe_periods=252, return_periods=252)
+
+    for j in range(signals.shape[1]):
+        sharpe, drawdown, expected = _pandas_reference(close, signals[:, j], 252)
+        assert metrics["sharpe_ratio"][j] == pytest.approx(sharpe, abs=1e-9)
+        assert metrics["max_drawdown"][j] == pytest.approx(drawdown, abs=1e-12)
+        assert metrics["expected_return"][j] == pytest.approx(expected, abs=1e-12)
+    assert metrics["turnover"].tolist() == pytest.approx(
+        [np.abs(np.diff(signals[:, j])).mean() for j in range(signals.shape[1])]
+    )
+    assert metrics["position"].tolist() == signals[-1].tolist()
+    assert metrics["strategy_returns"].shape == signals.shape
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+import strategies.charts as charts
+from config import load_config
+from strategies.god_system_strategy import GodSystemStrategy
+
+
+def _frame(n=120):
+    rng = np.random.default_rng(5)
+    dates = pd.date_range("2024-01-01", periods=n, freq="D")
+    return pd.DataFrame({"date": dates, "close": 100 * np.cumprod(1 + rng.normal(0, 0.01, n))}).set_index("date", drop=False)
+
+
+def test_backtest_returns_curve_without_drawing(tmp_path, monkeypatch):
+    monkeypatch.setattr(charts, "PERFORMANCE_DIR", str(tmp_path))
+    result = GodSystemStrategy(load_config(), {"ma_month": 20}).backtest("^TWII", _frame(), "daily")
+
+    curve = result["equity_curve"]
+    assert len(curve.dates) == len(curve.values) == 120
+    assert list(tmp_path.iterdir()) == []
+
+    job = charts.chart_job("^TWII", "daily", result)
+    assert "equity_curve" not in result and job.curve is curve
+
+
+def test_render_charts_in_pool_without_upload(tmp_path, monkeypatch):
+    monkeypatch.setattr(charts, "PERFORMANCE_DIR", str(tmp_path))
+    curve = charts.EquityCurve(dates=np.asarray(pd.date_range("2024-01-01", periods=50)), values=np.linspace(0, 0.1, 50))
+    jobs = [charts.ChartJob("QQQ", "daily", curve, label=name) for name in ("bigline", "god_system")] + [None]
+
+    urls = charts.render_charts(jobs, workers=2, upload=False)
+
+    assert urls == {("QQQ", "daily", "bigline"): None, ("QQQ", "daily", "god_system"): None}
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "QQQ_daily_bigline_performance.png", "QQQ_daily_god_system_performance.png"]
+
+
+def test_disabled_charts_render_nothing(tmp_path, monkeypatch):
+    monkeypatch.setattr(charts, "PERFORMANCE_DIR", str(tmp_path))
+    charts.set_enabled(False)
+    try:
+        curve = charts.EquityCurve(dates=np.arange(3), values=np.zeros(3))
+        assert charts.render_charts([charts.ChartJob("QQQ", "daily", curve)]) == {}
+    finally:
+        charts.set_enabled(None)
+    assert list(tmp_path.iterdir()) == []
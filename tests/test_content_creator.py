@@ -72,3 +72,26 @@ def test_generate_script_fallback_retains_strategy_summary(monkeypatch):
     assert "QQQ: 最佳策略 bigline，預期回報 7.89%，訊號 LONG。" in fallback
     assert "bigline 回報 7.89% 訊號 LONG" in fallback
     assert "god_system 回報 6.00% 訊號 SHORT" in fallback
+
+
+def test_concurrent_modes_do_not_lose_score_or_feedback_entries(tmp_path, monkeypatch):
+    import json
+    import threading
+
+    monkeypatch.setattr(cc, "_SCORES", tmp_path / "scores.json")
+    monkeypatch.setattr(cc, "_FB_LOG", tmp_path / "fb_log.json")
+    monkeypatch.setattr(cc, "validate_quality", lambda script, mode: {"score": 9.0, "pass": True, "issues": [], "warnings": []})
+
+    def run(mode):
+        for _ in range(20):
+            cc.post_gen_eval(mode, "script")
+            cc._lfl(mode, "reason", "previous")
+
+    threads = [threading.Thread(target=run, args=(mode,)) for mode in ("tw", "us")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(json.loads((tmp_path / "scores.json").read_text(encoding="utf-8"))) == 40
+    assert len(json.loads((tmp_path / "fb_log.json").read_text(encoding="utf-8"))) == 40
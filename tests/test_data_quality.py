@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from data_collector import DataQualityChecker
+
+
+def _frame(dates, closes):
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame(
+        {
+            "date": pd.to_datetime(dates, utc=True),
+            "open": closes,
+            "high": np.where(closes > 0, closes + 1, 0.0),
+            "low": np.where(closes > 0, closes - 1, 0.0),
+            "close": closes,
+            "volume": np.where(closes > 0, 1000.0, 0.0),
+        }
+    )
+
+
+def test_validate_history_flags_each_issue_against_the_batch_calendar():
+    weekdays = pd.bdate_range("2025-01-06", periods=10)
+    clean = _frame(weekdays, 100 + np.arange(10) * np.array([1, -1] * 5))
+    # drops 01-08, repeats 01-09 (duplicate + stale), ends a day early (lagging),
+    # 01-13 is only a zero-filled placeholder (so also a gap) and 01-14 a 10x spike
+    broken_dates = [weekdays[i] for i in (0, 1, 3, 3, 4, 5, 6, 7, 8)]
+    broken = _frame(broken_dates, [100, 101, 102, 102, 103, 0, 1030, 104, 103])
+
+    report = DataQualityChecker().validate_history({"GOOD": {"daily": clean}, "BAD": {"daily": broken}})
+
+    assert report["GOOD"]["score"] == 1.0
+    issues = report["BAD"]["daily"]
+    assert (issues["gaps"], issues["duplicates"], issues["stale"], issues["lagging"]) == (2, 1, 1, 1)
+    assert (issues["placeholder"], issues["non_positive"], issues["outliers"]) == (1, 0, 2)
+    assert report["BAD"]["score"] < 0.5
+
+
+def test_one_fresh_symbol_does_not_hide_stale_ones():
+    now = pd.Timestamp.now(tz="UTC")
+    data = {
+        "FRESH": {"close": 100.0, "change": 0.1, "timestamp": now},
+        "STALE": {"close": 50.0, "change": 0.1, "timestamp": now - pd.Timedelta(days=30)},
+        "FAILED": {"close": 0, "change": 0},
+    }
+    checker = DataQualityChecker()
+
+    assert checker.stale_symbols(data, list(data)) == ["STALE", "FAILED"]
+    assert checker.validate(data, list(data))[1]["freshness"] is False
+    assert checker.validate(data, ["FRESH"])[1]["freshness"] is True
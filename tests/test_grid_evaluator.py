@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import strategies.god_system_strategy as god_module
+from config import load_config
+from strategies.grid_evaluator import _backtest_rows, evaluate_grid, save_grid
+
+
+def test_vectorized_grid_matches_per_combination_backtests(tmp_path):
+    rng = np.random.default_rng(3)
+    data = pd.DataFrame({"close": 100 * np.cumprod(1 + rng.normal(0, 0.01, 200))})
+    strategy = god_module.GodSystemStrategy(load_config(), {"ma_month": [5, 10, 20, 40]})
+
+    table = evaluate_grid(strategy, "^TWII", data, "daily", persist=False)
+    reference = _backtest_rows(strategy, "^TWII", data, "daily", [{"ma_month": w} for w in (5, 10, 20, 40)])
+
+    assert strategy.params == {"ma_month": [5, 10, 20, 40]}
+    assert list(table["score"]) == sorted(table["score"], reverse=True)
+    by_window = table.set_index(table["params"].map(lambda p: p["ma_month"]))
+    for window, row in zip((5, 10, 20, 40), reference):
+        for metric in ("sharpe_ratio", "max_drawdown", "expected_return"):
+            assert by_window.loc[window, metric] == pytest.approx(row[metric], abs=1e-12)
+        assert by_window.loc[window, "position"] == row["position"]
+
+    path = save_grid(table, "god_system", "^TWII", "daily", directory=str(tmp_path))
+    surface = pd.read_csv(path)
+    assert list(surface.columns[:2]) == ["ma_month", "sharpe_ratio"] and len(surface) == 4
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+import ta
+
+from strategies.indicator_cache import IndicatorCache
+from strategies import indicator_cache
+
+
+@pytest.fixture
+def close():
+    rng = np.random.default_rng(3)
+    return pd.Series(100 * np.cumprod(1 + rng.normal(0, 0.01, 400)))
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    fresh = IndicatorCache(max_entries=4)
+    monkeypatch.setattr(indicator_cache, "_cache", fresh)
+    return fresh
+
+
+def test_indicators_match_ta(cache, close):
+    np.testing.assert_array_equal(indicator_cache.rsi(close, 14), ta.momentum.RSIIndicator(close, window=14).rsi())
+    np.testing.assert_array_equal(indicator_cache.sma(close, 20), ta.trend.SMAIndicator(close, window=20).sma_indicator())
+    macd, signal, diff = indicator_cache.macd(close, 12, 26, 9)
+    reference = ta.trend.MACD(close, window_fast=12, window_slow=26, window_sign=9)
+    np.testing.assert_array_equal(macd, reference.macd())
+    np.testing.assert_array_equal(signal, reference.macd_signal())
+    high, low, _ = indicator_cache.bollinger(close)
+    np.testing.assert_array_equal(high, ta.volatility.BollingerBands(close).bollinger_hband())
+    np.testing.assert_array_equal(low, ta.volatility.BollingerBands(close).bollinger_lband())
+
+
+def test_repeat_requests_hit_and_new_data_misses(cache, close):
+    first = indicator_cache.sma(close, 20, "QQQ", "daily")
+    again = indicator_cache.sma(close.copy(), 20, "QQQ", "daily")
+    assert again is first
+    assert not first.flags.writeable
+    assert cache.stats()["hits"] == 1
+
+    updated = pd.concat([close, pd.Series([close.iloc[-1] * 1.01])], ignore_index=True)
+    assert len(indicator_cache.sma(updated, 20, "QQQ", "daily")) == len(close) + 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_lru_evicts_oldest(cache, close):
+    for window in (5, 10, 20, 50, 100):
+        indicator_cache.sma(close, window)
+    assert cache.stats()["entries"] == 4
+    indicator_cache.sma(close, 5)
+    assert cache.stats()["misses"] == 6
+
+
+def test_disk_tier_survives_a_new_process(tmp_path, monkeypatch, close):
+    monkeypatch.setattr(indicator_cache, "_cache", IndicatorCache(disk_dir=str(tmp_path)))
+    expected = indicator_cache.rsi(close, 14, "^TWII", "daily")
+    assert len(list(tmp_path.glob("TWII_daily_rsi_14_*.npy"))) == 1
+
+    restarted = IndicatorCache(disk_dir=str(tmp_path))
+    monkeypatch.setattr(indicator_cache, "_cache", restarted)
+    np.testing.assert_array_equal(indicator_cache.rsi(close, 14, "^TWII", "daily"), expected)
+    assert restarted.stats()["disk_hits"] == 1
@@ -20,7 +20,7 @@ def _make_strategy_class(name, payloads):
                 {
                     "strategy": name,
                     "symbol": symbol,
-                    "sentiments": tuple(df["sentiment_score"].unique()),
+                    "latest_sentiment": df["sentiment_score"].iloc[-1],
                     "timeframe": timeframe,
                 }
             )
@@ -144,7 +144,8 @@ def test_main_aggregates_dual_strategy_metrics(tmp_path, monkeypatch, temp_confi
         def __init__(self, config):
             self.config = config
 
-        def analyze_market(self, symbol):
+        def analyze_market(self, symbol, timeframe="daily", data=None):
+            assert data is not None and "close" in data.columns
             return {"trend": "UP", "volatility": 4.2, "report": f"{symbol} outlook"}
 
     monkeypatch.setattr(main_module, "collect_data", fake_collect_data)
@@ -171,11 +172,12 @@ def test_main_aggregates_dual_strategy_metrics(tmp_path, monkeypatch, temp_confi
     def lookup_sentiment(calls, strategy_name, symbol):
         for call in calls:
             if call["strategy"] == strategy_name and call["symbol"] == symbol:
-                return call["sentiments"]
+                return call["latest_sentiment"]
         raise AssertionError(f"No call recorded for {strategy_name} / {symbol}")
 
-    assert lookup_sentiment(GodStub.calls, "god_system", "SPY") == (0.8,)
-    assert lookup_sentiment(BigStub.calls, "bigline", "QQQ") == (0.25,)
+    # Only the latest bar carries today's live sentiment (earlier bars come from the history, else neutral).
+    assert lookup_sentiment(GodStub.calls, "god_system", "SPY") == pytest.approx(0.8)
+    assert lookup_sentiment(BigStub.calls, "bigline", "QQQ") == pytest.approx(0.25)
 
     strategy_results = captured["strategy_results"]
     assert set(strategy_results.keys()) == {"SPY", "QQQ"}
@@ -0,0 +1,69 @@
+import os
+
+import pandas as pd
+import pytest
+
+import market_store
+
+
+def _write_csv(market_dir, symbol="QQQ", closes=(100.0, 101.0, 102.5)):
+    df = pd.DataFrame(
+        {
+            "date": ["2026-08-18", "2026-08-19", "2026-08-20"][: len(closes)],
+            "symbol": symbol,
+            "open": closes,
+            "high": closes,
+            "low": closes,
+            "close": closes,
+            "change": [0.0, 1.0, 1.49][: len(closes)],
+            "volume": [1_000, 2_000, 3_000][: len(closes)],
+        }
+    )
+    path = market_dir / f"daily_{symbol}.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+def test_load_market_data_parses_csv_into_typed_frame(tmp_path):
+    _write_csv(tmp_path)
+
+    df = market_store.load_market_data("QQQ", "daily", market_dir=str(tmp_path))
+
+    assert str(df["date"].dt.tz) == "UTC"
+    assert isinstance(df["symbol"].dtype, pd.CategoricalDtype)
+    assert df["close"].tolist() == [100.0, 101.0, 102.5]
+    assert market_store.load_market_data("SPY", "daily", market_dir=str(tmp_path)) is None
+
+
+@pytest.mark.skipif(not market_store._ARROW_AVAILABLE, reason="pyarrow not installed")
+def test_migrate_then_export_round_trips_csv(tmp_path):
+    csv_path = _write_csv(tmp_path)
+    original = pd.read_csv(csv_path)
+
+    assert market_store.migrate_csv_to_store(str(tmp_path)) == 1
+    store_path = market_store.get_store_path("QQQ", "daily", str(tmp_path))
+    assert os.path.exists(store_path)
+
+    # The columnar file is newer than the CSV, so it is the one served.
+    os.remove(csv_path)
+    df = market_store.load_market_data("QQQ", "daily", market_dir=str(tmp_path), index=True)
+    assert df.index.name == "date"
+    assert len(df) == 3
+
+    market_store.export_store_to_csv(str(tmp_path))
+    exported = pd.read_csv(csv_path)
+    assert exported["date"].tolist() == original["date"].tolist()
+    assert exported["close"].tolist() == original["close"].tolist()
+
+
+@pytest.mark.skipif(not market_store._ARROW_AVAILABLE, reason="pyarrow not installed")
+def test_newer_csv_wins_over_stale_store(tmp_path):
+    _write_csv(tmp_path)
+    market_store.migrate_csv_to_store(str(tmp_path))
+    store_path = market_store.get_store_path("QQQ", "daily", str(tmp_path))
+    os.utime(store_path, (1, 1))
+
+    _write_csv(tmp_path, closes=(200.0, 201.0, 202.0))
+
+    df = market_store.load_market_data("QQQ", "daily", market_dir=str(tmp_path))
+    assert df["close"].iloc[-1] == 202.0
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import strategies.model_store as model_store
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_store, "model_dir", lambda: str(tmp_path))
+    monkeypatch.setattr(model_store, "_memory", {})
+    monkeypatch.setattr(model_store, "settings", lambda: {"reuse_bars": 5, "warm_start_bars": 30, "n_jobs": 1})
+    return tmp_path
+
+
+def _features(n, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(200, 3)), columns=["RSI", "MACD", "volume"]).iloc[:n]
+    return X, (X["RSI"] > 0).astype(int)
+
+
+def _get(X, y, calls, scheme="chronological"):
+    def fit(X, y):
+        calls.append(("fit", len(X)))
+        return {"rows": len(X)}
+
+    def refit(model, X, y):
+        calls.append(("warm_start", len(X)))
+        return {**model, "rows": len(X)}
+
+    return model_store.get_model("QQQ", "daily", list(X.columns), {"n_estimators": 10}, X, y, fit, refit, scheme=scheme)
+
+
+def test_status_follows_how_the_data_changed(store):
+    calls = []
+    statuses = []
+    for n in (150, 150, 153, 175):
+        X, y = _features(n)
+        model, info = _get(X, y, calls)
+        statuses.append(info["status"])
+    assert statuses == ["fit", "hit", "reuse", "warm_start"]
+    assert calls == [("fit", 150), ("warm_start", 175)]
+    assert model == {"rows": 175}
+    assert len(list(store.glob("QQQ_daily_RSI-MACD-volume_*.joblib"))) == 1
+
+    revised, y = _features(175, seed=1)  # history rewritten, not appended
+    assert _get(revised, y, calls)[1]["status"] == "fit"
+
+
+def test_models_survive_a_new_process(store, monkeypatch):
+    X, y = _features(120)
+    _get(X, y, [])
+    monkeypatch.setattr(model_store, "_memory", {})
+    assert _get(X, y, [])[1]["status"] == "hit"
+
+
+def test_models_trained_another_way_are_refit(store):
+    X, y = _features(120)
+    _get(X, y, [], scheme="shuffled-split")
+    calls = []
+    assert _get(X, y, calls)[1]["status"] == "fit" and calls == [("fit", 120)]
+    assert _get(X, y, calls)[1]["status"] == "hit"
+
+
+def test_revised_labels_are_not_reused(store):
+    X, y = _features(150)
+    _get(X, y, [])
+    grown, y_grown = _features(152)
+    y_grown = y_grown.copy()
+    y_grown.iloc[149] = 1 - y_grown.iloc[149]  # the old last label settles once the next bar arrives
+    calls = []
+    assert _get(grown, y_grown, calls)[1]["status"] == "fit" and calls == [("fit", 152)]
+
+    relabelled = y.copy()
+    relabelled.iloc[-1] = 1 - relabelled.iloc[-1]
+    assert _get(X, relabelled, calls)[1]["status"] == "fit"
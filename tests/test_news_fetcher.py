@@ -0,0 +1,47 @@
+import asyncio
+
+import httpx
+import pytest
+
+import news_fetcher
+
+MALFORMED_RSS = b"""<?xml version="1.0"?>
+<rss><channel>
+<item><title>Fed holds rates</title><description>Powell speaks</description></item>
+<item><title>TSMC&nbsp;beats</title><description>Revenue up &amp; guidance raised</description></item>
+</channel></rss>"""
+
+
+@pytest.fixture
+def no_disk_cache(monkeypatch):
+    saved = {}
+    monkeypatch.setattr(news_fetcher, "load_feed_cache", lambda: {})
+    monkeypatch.setattr(news_fetcher, "save_feed_cache", saved.update)
+    return saved
+
+
+def _fetch(handler, urls, timeout=5):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await news_fetcher.fetch_all_news_async(urls, limit=3, timeout=timeout, client=client)
+    return asyncio.run(run())
+
+
+def test_entity_laden_feed_is_parsed_leniently(no_disk_cache):
+    feeds = _fetch(lambda request: httpx.Response(200, content=MALFORMED_RSS), ["https://feed.example/rss"])
+
+    titles = [item["title"] for item in feeds["https://feed.example/rss"]]
+    assert titles[0] == "Fed holds rates" and len(titles) == 2
+    assert no_disk_cache["https://feed.example/rss"]["items"] == feeds["https://feed.example/rss"]
+
+
+def test_slow_feed_is_cut_off_at_timeout(no_disk_cache):
+    async def handler(request):
+        if request.url.host == "slow.example":
+            await asyncio.sleep(5)
+        return httpx.Response(200, content=MALFORMED_RSS.replace(b"&nbsp;", b" "))
+
+    feeds = _fetch(handler, ["https://slow.example/rss", "https://fast.example/rss"], timeout=0.2)
+
+    assert feeds["https://slow.example/rss"] == []
+    assert [item["title"] for item in feeds["https://fast.example/rss"]] == ["Fed holds rates", "TSMC beats"]
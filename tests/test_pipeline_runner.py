@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from pipeline_runner import MANIFEST_NAME, PipelineStop, StageRunner
+
+STAGES = ["a", "b", "c"]
+
+
+def _run(run_dir, calls, **kwargs):
+    runner = StageRunner(str(run_dir), STAGES, **kwargs)
+    try:
+        a = runner.run("a", lambda: calls.append("a") or 1, {"x": 1})
+        b = runner.run("b", lambda: calls.append("b") or a + 1, {"a": runner.digest("a")})
+        runner.run("c", lambda: calls.append("c") or b + 1, {"b": runner.digest("b")})
+    except PipelineStop:
+        pass
+    return runner.finish()
+
+
+def test_resume_from_and_only_stage_reuse_checkpoints(tmp_path):
+    calls = []
+    _run(tmp_path, calls)
+    assert calls == ["a", "b", "c"]
+
+    calls.clear()
+    manifest = _run(tmp_path, calls, resume=True)
+    assert calls == []
+    assert [s["status"] for s in manifest["stages"]] == ["cached"] * 3
+
+    calls.clear()
+    _run(tmp_path, calls, from_stage="b")
+    assert calls == ["b", "c"]
+
+    calls.clear()
+    manifest = _run(tmp_path, calls, only_stage="b")
+    assert calls == ["b"]
+    assert [s["name"] for s in manifest["stages"]] == ["a", "b"]
+
+    written = json.loads((tmp_path / MANIFEST_NAME).read_text(encoding="utf-8"))
+    assert written["only_stage"] == "b" and "total_seconds" in written
+
+    with pytest.raises(ValueError):
+        StageRunner(str(tmp_path), STAGES, from_stage="z")
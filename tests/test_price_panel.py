@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from price_panel import load_panel_for, symbol_frame, update_panel
+
+
+def _daily(n=30, seed=3, symbol="QQQ"):
+    rng = np.random.default_rng(seed)
+    close = 500 * np.cumprod(1 + rng.normal(0, 0.01, n))
+    return pd.DataFrame({"date": pd.date_range("2026-01-05", periods=n, freq="B", tz="UTC"), "symbol": symbol,
+                         "open": close, "high": close * 1.01, "low": close * 0.99, "close": close,
+                         "volume": rng.integers(1_000, 5_000, n).astype(float)})
+
+
+def test_symbol_frame_matches_source_and_meta_is_replaced(tmp_path):
+    df = _daily()
+    assert update_panel("us", "daily", market_dir=tmp_path, panel_dir=tmp_path, frames={"QQQ": df}) >= 1
+    assert not list(tmp_path.glob("*.tmp"))
+
+    view = symbol_frame("QQQ", "daily", panel_dir=tmp_path)
+    assert list(view.columns) == ["date", "symbol", "open", "high", "low", "close", "volume"]
+    np.testing.assert_allclose(view["close"].to_numpy(), df["close"].to_numpy())
+    assert symbol_frame("SPY", "daily", panel_dir=tmp_path) is None
+
+    panel = load_panel_for("QQQ", "daily", panel_dir=tmp_path)
+    assert panel.is_current("QQQ", df)
+    revised = df.copy()
+    revised.loc[revised.index[-1], "close"] *= 1.01
+    assert not panel.is_current("QQQ", revised)
+
+    update_panel("us", "daily", market_dir=tmp_path, panel_dir=tmp_path, frames={"QQQ": revised})
+    assert load_panel_for("QQQ", "daily", panel_dir=tmp_path).is_current("QQQ", revised)
+    assert symbol_frame("QQQ", "daily", panel_dir=tmp_path)["close"].iloc[-1] == revised["close"].iloc[-1]
@@ -0,0 +1,57 @@
+import pandas as pd
+
+from sentiment_history import attach_sentiment, record_day
+
+
+def test_attach_sentiment_joins_history_by_date_and_only_latest_bar_gets_today():
+    history = pd.DataFrame(
+        {
+            "date": pd.to_datetime(["2025-11-03", "2025-11-05"]),
+            "market": ["us", "us"],
+            "symbol": ["SPY", "SPY"],
+            "sentiment_score": [0.6, -0.4],
+            "news_count": [2, 1],
+        }
+    )
+    prices = pd.DataFrame(
+        {
+            "date": pd.date_range("2025-11-01", periods=7, tz="UTC"),
+            "close": range(7),
+        }
+    )
+
+    out = attach_sentiment(prices, "SPY", 0.9, history=history)
+
+    # days without history (before, between, after) are neutral; only 11-07 (today) gets the live score
+    assert list(out["sentiment_score"]) == [0.0, 0.0, 0.6, 0.0, -0.4, 0.0, 0.9]
+    assert "sentiment_score" not in prices.columns
+    assert list(attach_sentiment(prices, "QQQ", 0.25, history=history)["sentiment_score"]) == [0.0] * 6 + [0.25]
+
+
+def test_record_day_extends_history_and_replaces_same_day(tmp_path):
+    path = str(tmp_path / "history.csv")
+    record_day("2025-11-03", "us", {"SPY": (0.6, 2), "QQQ": (0.0, 0)}, "keyword", 1.0, path=path)
+    history = record_day("2025-11-03", "us", {"SPY": (0.2, 3)}, "keyword", 2.0, path=path)
+    history = record_day("2025-11-04", "us", {"SPY": (-0.1, 1)}, "keyword", 3.0, path=path)
+
+    assert history[["symbol", "sentiment_score"]].values.tolist() == [["SPY", 0.2], ["SPY", -0.1]]
+    prices = pd.DataFrame({"date": pd.date_range("2025-11-03", periods=3, tz="UTC"), "close": range(3)})
+    assert list(attach_sentiment(prices, "SPY", 0.5, history=history)["sentiment_score"]) == [0.2, -0.1, 0.5]
+
+
+def test_concurrent_markets_keep_each_others_rows(tmp_path):
+    import threading
+
+    path = str(tmp_path / "history.csv")
+
+    def run(market):
+        for day in pd.date_range("2025-11-03", periods=10).strftime("%Y-%m-%d"):
+            record_day(day, market, {f"{market}-SYM": (0.1, 1)}, "keyword", 1.0, path=path)
+
+    threads = [threading.Thread(target=run, args=(market,)) for market in ("tw", "us")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(pd.read_csv(path)) == 20
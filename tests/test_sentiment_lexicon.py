@@ -0,0 +1,46 @@
+import pytest
+
+from sentiment_lexicon import LexiconScorer, load_lexicon
+
+LEXICON = {
+    "negation_window": {"tw": 2, "us": 12},
+    "negations": {"tw": ["不"], "us": ["not"]},
+    "terms": {
+        "common": {"漲": 1, "跌": -1, "跌破": -2},
+        "tw": {"大漲": 1.5},
+        "us": {"beat": 1, "weak": -1},
+    },
+}
+
+
+def test_batch_scores_match_pipeline_shape_and_prefer_longest_terms():
+    scorer = LexiconScorer(LEXICON, "tw")
+
+    results = scorer.score(["台股大漲", "跌破季線", "沒有關鍵字", ""])
+
+    assert [r["label"] for r in results] == ["positive", "negative", "neutral", "neutral"]
+    assert results[0]["score"] == 0.55 + 1.5 * 0.05
+    assert results[1]["score"] == 0.55 + 2 * 0.05
+    assert results[2] == {"label": "neutral", "score": 0.5}
+
+
+def test_negation_window_word_boundaries_and_market_vocabulary():
+    us = LexiconScorer(LEXICON, "us")
+    bullish, bearish = us.totals(["Earnings not weak", "Not much to say. Weak", "beatbox", "Beat 大漲"])
+
+    # "大漲" is TW-only vocabulary; the US scorer sees the common "漲" instead
+    assert list(bullish) == [1.0, 0.0, 0.0, 2.0]
+    assert list(bearish) == [0.0, 1.0, 0.0, 0.0]
+    assert LexiconScorer(LEXICON, "tw").score(["不跌"])[0]["label"] == "positive"
+
+
+@pytest.mark.parametrize("headline, label", [
+    ("未來看好半導體", "positive"),
+    ("台積電未來成長可期", "positive"),
+    ("營收不斷成長", "positive"),
+    ("營收未成長", "negative"),
+    ("法人不看好", "negative"),
+])
+def test_negator_compounds_do_not_flip_the_next_term(headline, label):
+    # 未來 / 不斷 are ordinary words: the shipped lexicon lists them as zero-weight negation_exceptions
+    assert LexiconScorer(load_lexicon(), "tw").score([headline])[0]["label"] == label
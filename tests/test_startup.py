@@ -0,0 +1,38 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+ENTRY_POINTS = ["main", "scheduler", "strategy_mastermind", "run_daily_optimization"]
+# Imported on first use only; none of these may load while an entry point is imported.
+HEAVY_MODULES = {
+    "pandas", "numpy", "matplotlib", "transformers", "torch", "onnxruntime", "sklearn",
+    "yfinance", "bs4", "b2sdk", "feedgen", "slack_sdk", "pydub", "ta",
+}
+IMPORT_BUDGET_MS = 500
+
+
+def _import_profile(module):
+    """{module name: cumulative µs} from `python -X importtime -c "import <module>"`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    )
+    profile = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            profile[name.strip()] = int(cumulative)
+    return profile
+
+
+@pytest.mark.parametrize("module", ENTRY_POINTS)
+def test_entry_point_imports_stay_light(module):
+    profile = _import_profile(module)
+    heavy = sorted({name.split(".")[0] for name in profile} & HEAVY_MODULES)
+    assert heavy == [], f"{module} eagerly imports {heavy}"
+    assert profile[module] / 1000 < IMPORT_BUDGET_MS
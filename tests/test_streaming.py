@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import load_config
+from strategies import indicator_cache as indicators
+from strategies.god_system_strategy import GodSystemStrategy
+from strategies.streaming import StreamingSignalEngine, RollingStats, refresh
+
+
+def _hourly(n=300, seed=5):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2026-01-05 01:00", periods=n, freq="h", tz="UTC")
+    return pd.DataFrame({"date": dates, "symbol": "^TWII",
+                         "close": 20000 * np.cumprod(1 + rng.normal(0, 0.004, n))})
+
+
+def test_indicators_match_batch_computation():
+    df = _hourly()
+    engine = StreamingSignalEngine("^TWII", "hourly", ma_month=20)
+    assert engine.update_frame(df) == len(df)
+
+    close = df["close"].to_numpy()
+    macd, signal, diff = indicators.macd(close)
+    high, low, middle = indicators.bollinger(close)
+    expected = {"sma": indicators.sma(close, 20), "rsi": indicators.rsi(close), "macd": macd, "macd_signal": signal,
+                "macd_diff": diff, "bollinger_hband": high, "bollinger_lband": low, "bollinger_mavg": middle}
+    latest = engine.indicators()
+    for name, values in expected.items():
+        assert latest[name] == pytest.approx(values[-1], rel=1e-9), name
+
+
+def test_signals_match_god_system_backtest():
+    df = _hourly()
+    batch = GodSystemStrategy(load_config(), {"ma_month": 20}).backtest("^TWII", df, "hourly")
+    batch.pop("equity_curve")
+
+    engine = StreamingSignalEngine("^TWII", "hourly", ma_month=20)
+    engine.update_frame(df)
+    streamed = engine.signals()
+
+    assert streamed["signals"] == batch["signals"]
+    for key in ("sharpe_ratio", "max_drawdown", "expected_return", "turnover"):
+        assert streamed[key] == pytest.approx(batch[key], rel=1e-9), key
+
+
+def test_state_survives_restart_and_skips_seen_bars(tmp_path):
+    df = _hourly()
+    engine = StreamingSignalEngine("^TWII", "hourly", ma_month=20)
+    engine.update_frame(df.iloc[:200])
+    engine.save(tmp_path)
+
+    resumed = StreamingSignalEngine.load("^TWII", "hourly", ma_month=20, directory=tmp_path)
+    assert resumed.update_frame(df.iloc[:200]) == 0
+    assert resumed.update_frame(df) == 100
+
+    full = StreamingSignalEngine("^TWII", "hourly", ma_month=20)
+    full.update_frame(df)
+    assert resumed.signals()["signals"] == full.signals()["signals"]
+    assert resumed.signals()["sharpe_ratio"] == pytest.approx(full.signals()["sharpe_ratio"])
+    assert resumed.indicators() == pytest.approx(full.indicators())
+
+    assert StreamingSignalEngine.load("^TWII", "hourly", ma_month=10, directory=tmp_path).bars == 0
+
+
+def test_revised_last_bar_rebuilds_state():
+    df = _hourly(120)
+    engine = StreamingSignalEngine("^TWII", "hourly", ma_month=20)
+    engine.update_frame(df)
+    revised = df.copy()
+    revised.loc[revised.index[-1], "close"] *= 1.01
+
+    engine.update_frame(revised)
+
+    rebuilt = StreamingSignalEngine("^TWII", "hourly", ma_month=20)
+    rebuilt.update_frame(revised)
+    assert engine.bars == len(df) and engine.signals() == rebuilt.signals()
+
+
+def test_rolling_stats_window_variance():
+    values = np.random.default_rng(1).normal(100, 5, 50)
+    stats = RollingStats(10)
+    for value in values:
+        stats.update(value)
+    assert stats.value == pytest.approx(values[-10:].mean())
+    assert stats.std(ddof=1) == pytest.approx(values[-10:].std(ddof=1))
+
+
+def test_refresh_uses_given_frames(tmp_path):
+    results = refresh(["^TWII"], ["hourly"], frames={"hourly": {"^TWII": _hourly()}}, directory=tmp_path)
+    assert set(results["^TWII"]["hourly"]) >= {"sharpe_ratio", "max_drawdown", "expected_return", "signals"}
+    assert (tmp_path / "TWII_hourly.json").exists()
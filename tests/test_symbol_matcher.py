@@ -0,0 +1,29 @@
+from symbol_matcher import SymbolMatcher, get_matcher
+
+
+def test_route_matches_tickers_and_chinese_names_in_one_pass():
+    matcher = get_matcher(["^TWII", "0050.TW", "2330.TW"])
+    items = [
+        {"title": "台積電法說會報喜", "description": "加權指數早盤走高"},
+        {"title": "2330.TW 外資買超", "description": "無關內容"},
+        {"title": "美股收盤", "description": "科技股漲多拉回"},
+    ]
+
+    news_by_symbol, matches = matcher.route(items)
+
+    assert news_by_symbol["2330.TW"] == [items[0], items[1]]
+    assert news_by_symbol["^TWII"] == [items[0]]
+    assert news_by_symbol["0050.TW"] == []
+    assert matches[0]["2330.TW"] == [("title", 0, 3)]
+    assert matches[0]["^TWII"] == [("description", 0, 4)]
+    assert matches[2] == {}
+
+
+def test_ascii_aliases_respect_word_boundaries_and_prefer_longest():
+    matcher = SymbolMatcher({"SPY": {"SPY"}, "TSM": {"台積電ADR"}, "2330.TW": {"台積電"}})
+
+    found = matcher.match_item({"title": "SPYDER 不是 SPY", "description": "台積電ADR 與 台積電"})
+
+    assert found["SPY"] == [("title", 10, 13)]
+    assert found["TSM"] == [("description", 0, 6)]
+    assert found["2330.TW"] == [("description", 9, 12)]
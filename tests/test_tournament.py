@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from strategies.god_system_strategy import GodSystemStrategy
+from strategies.tournament import SharedFrame, run_tournament
+from strategies.tournament import _frame as task_frame
+
+
+def _frame(n=160):
+    rng = np.random.default_rng(11)
+    dates = pd.date_range("2023-01-02", periods=n, freq="D", tz="UTC", name="date")
+    return pd.DataFrame({
+        "symbol": pd.Categorical(["^TWII"] * n),
+        "close": 100 * np.cumprod(1 + rng.normal(0, 0.01, n)),
+        "volume": rng.integers(1_000, 5_000, n),
+    }, index=dates)
+
+
+def test_shared_frame_round_trip():
+    df = _frame()
+    df["date"] = df.index
+    descriptor, shm = SharedFrame.create(df)
+    try:
+        restored = descriptor.to_frame()
+    finally:
+        shm.close()
+        shm.unlink()
+
+    pd.testing.assert_index_equal(restored.index, df.index)
+    pd.testing.assert_series_equal(restored["date"], df["date"], check_names=False, check_freq=False)
+    np.testing.assert_array_equal(restored["close"], df["close"])
+    np.testing.assert_array_equal(restored["volume"], df["volume"].astype(float))
+    assert (restored["symbol"] == "^TWII").all()
+
+
+def test_each_task_gets_its_own_frame():
+    df = _frame()
+    descriptor, shm = SharedFrame.create(df)
+    try:
+        for source in (descriptor, df):
+            first = task_frame(source)
+            first["signal"] = 1
+            first["close"] *= 2
+            second = task_frame(source)
+            assert "signal" not in second.columns
+            np.testing.assert_array_equal(second["close"], df["close"])
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_pool_and_in_process_runs_agree():
+    frames = {"^TWII": _frame()}
+    strategies = {"god_system": (GodSystemStrategy, {"ma_month": [5, 10, 20, 40, 60]})}
+
+    serial = run_tournament(frames, strategies, workers=1, persist=False)
+    pooled = run_tournament(frames, strategies, workers=2, chunk_size=2, persist=False)
+
+    for results in (serial, pooled):
+        results["^TWII"]["god_system"].pop("equity_curve")
+    assert pooled == serial
+    assert serial["^TWII"]["god_system"]["grid_size"] == 5
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import load_config
+from strategies.god_system_strategy import GodSystemStrategy
+from strategies.walk_forward import Fold, make_folds, walk_forward
+
+
+def test_rolling_and_expanding_folds():
+    assert make_folds(100, train=40, test=20) == [Fold(0, 40, 60), Fold(20, 60, 80), Fold(40, 80, 100)]
+    assert [f.train_start for f in make_folds(100, train=40, test=20, expanding=True)] == [0, 0, 0]
+    assert make_folds(50, train=40, test=20) == []
+
+
+class _RecordingStrategy:
+    """Fit-style strategy whose 'model' predicts the majority training label; records every fit."""
+    fits = []
+
+    def __init__(self, config, params):
+        self.config, self.params = config, params
+
+    def walk_forward_data(self, symbol, data, timeframe):
+        close = data["close"].to_numpy(dtype=float)
+        X = np.arange(len(close), dtype=float)[:, None]  # feature = row number, to audit the windows
+        y = (np.roll(close, -1) > close).astype(int)
+        return close, X, y
+
+    def fit_predict(self, X_train, y_train, X_test):
+        _RecordingStrategy.fits.append((int(X_train[:, 0].max()), int(X_test[:, 0].min())))
+        return np.full(len(X_test), int(y_train.mean() >= self.params["cutoff"]))
+
+
+def _data(n=220, seed=2):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"close": 100 * np.cumprod(1 + rng.normal(0.001, 0.01, n))})
+
+
+def test_fitted_strategy_never_trains_on_what_it_predicts():
+    _RecordingStrategy.fits = []
+    strategy = _RecordingStrategy(load_config(), {"cutoff": [0.3, 0.7]})
+
+    report = walk_forward(strategy, "QQQ", _data(), "daily", train=100, test=20, workers=1)
+
+    assert report["n_folds"] == 6 and len(report["folds"]) == 6
+    assert _RecordingStrategy.fits and all(last_train < first_test for last_train, first_test in _RecordingStrategy.fits)
+    assert walk_forward(strategy, "QQQ", _data(), "daily", train=100, test=20, workers=2) == report
+
+
+def test_grid_strategy_rolling_and_expanding():
+    strategy = GodSystemStrategy(load_config(), {"ma_month": [5, 10, 20]})
+    data = _data(300)
+
+    rolling = walk_forward(strategy, "^TWII", data, "daily", train=120, test=30)
+    expanding = walk_forward(strategy, "^TWII", data, "daily", train=120, test=30, expanding=True)
+
+    assert rolling["n_folds"] == expanding["n_folds"] == 6
+    assert [fold["train_start"] for fold in expanding["folds"]] == [0] * 6
+    assert {fold["params"]["ma_month"] for fold in rolling["folds"]} <= {5, 10, 20}
+    assert rolling["score"] == pytest.approx(rolling["expected_return"] / (rolling["max_drawdown"] + 1e-9))
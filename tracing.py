@@ -0,0 +1,135 @@
+"""
+tracing.py - 單次執行的 span 追蹤 (Chrome / Perfetto trace JSON) 與逐 stage profiling
+
+    from tracing import span
+    with span("yfinance", cat="fetch", symbol="QQQ", timeframe="daily"):
+        hist = ticker.history(...)
+
+每個 span 記錄為 Chrome trace 的 complete event (ph="X"，ts / dur 為微秒)；
+asyncio 併發的 span (例如 RSS feed 抓取) 用 async=True 記成 b/e 事件對，避免同一執行緒上的區段互相交疊。
+write_trace() 將本次執行的事件寫成 logs/trace_{run}.json，可直接拖進 chrome://tracing 或 ui.perfetto.dev。
+
+Process-pool worker 的事件以 drain() 取出、隨結果送回主程序再 merge()。
+
+enable_profiling(directory) 後，profile_stage(label) 為每個 stage 另存：
+    {label}.prof              cProfile (只涵蓋執行該 stage 的執行緒；snakeviz / pstats 可讀)
+    {label}.tracemalloc.txt   stage 前後 tracemalloc snapshot 差異 (前 25 名) 與峰值
+tracemalloc 是全程序的：`--mode both` 兩個節目同時執行時差異會包含另一個執行緒的配置。
+"""
+
+import os
+import json
+import time
+import itertools
+import threading
+import datetime
+from contextlib import contextmanager
+from loguru import logger
+
+LOG_DIR = "logs"
+TOP_ALLOCATIONS = 25
+
+_events = []
+_lock = threading.Lock()
+_async_ids = itertools.count(1)
+_profile_dir = None
+
+
+def _now_us():
+    return time.perf_counter_ns() // 1000
+
+
+def _event(name, cat, ph, ts, args, **extra):
+    return {"name": name, "cat": cat, "ph": ph, "ts": ts, "pid": os.getpid(),
+            "tid": threading.get_ident(), "args": args, **extra}
+
+
+@contextmanager
+def span(name, cat="pipeline", asynchronous=False, **args):
+    """Record the duration of the block; exceptions are recorded in args and re-raised."""
+    started = _now_us()
+    try:
+        yield args
+    except BaseException as e:
+        args["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        ended = _now_us()
+        if asynchronous:
+            span_id = next(_async_ids)
+            events = [_event(name, cat, "b", started, args, id=span_id),
+                      _event(name, cat, "e", ended, {}, id=span_id)]
+        else:
+            events = [_event(name, cat, "X", started, args, dur=ended - started)]
+        with _lock:
+            _events.extend(events)
+
+
+def drain():
+    """Remove and return the recorded events (worker side: ship them back to the parent)."""
+    with _lock:
+        events = list(_events)
+        _events.clear()
+    return events
+
+
+def merge(events):
+    with _lock:
+        _events.extend(events)
+
+
+def _thread_names(events):
+    names = {t.ident: t.name for t in threading.enumerate()}
+    seen = sorted({(e["pid"], e["tid"]) for e in events})
+    return [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": names.get(tid, str(tid))}}
+            for pid, tid in seen if pid == os.getpid() and tid in names]
+
+
+def write_trace(label, log_dir=LOG_DIR):
+    """Write (and clear) every event recorded so far to logs/trace_{timestamp}_{label}.json."""
+    events = drain()
+    os.makedirs(log_dir, exist_ok=True)
+    stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = os.path.join(log_dir, f"trace_{stamp}_{label}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": _thread_names(events) + events, "displayTimeUnit": "ms"}, f, ensure_ascii=False, default=str)
+    logger.info(f"追蹤紀錄已寫入 {path} ({len(events)} 個事件)")
+    return path
+
+
+# ─────────────────────────────────────────────
+# Per-stage profiling (--profile)
+# ─────────────────────────────────────────────
+def enable_profiling(directory):
+    global _profile_dir
+    import tracemalloc
+    os.makedirs(directory, exist_ok=True)
+    _profile_dir = directory
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    logger.info(f"Profiling 已啟用，輸出至 {directory}")
+
+
+@contextmanager
+def profile_stage(label):
+    """cProfile + tracemalloc diff around one stage; a no-op unless enable_profiling() was called."""
+    if _profile_dir is None:
+        yield
+        return
+    import cProfile
+    import tracemalloc
+    profiler = cProfile.Profile()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        profiler.dump_stats(os.path.join(_profile_dir, f"{label}.prof"))
+        with open(os.path.join(_profile_dir, f"{label}.tracemalloc.txt"), "w", encoding="utf-8") as f:
+            f.write(f"peak traced memory: {peak / 1e6:.1f} MB\n")
+            for stat in after.compare_to(before, "lineno")[:TOP_ALLOCATIONS]:
+                f.write(f"{stat}\n")
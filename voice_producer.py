@@ -3,6 +3,7 @@ import asyncio
 from loguru import logger
 from dotenv import load_dotenv
 from pydub import AudioSegment
+from tracing import span
 
 load_dotenv()
 
@@ -193,11 +194,14 @@ def generate_audio(text_path, output_path):
     for name, func in tts_providers:
         try:
             logger.info(f"嘗試使用 {name}...")
-            temp_path = func(text, output_path)
+            with span("tts", cat="tts", provider=name, chars=len(text)):
+                temp_path = func(text, output_path)
             
             if temp_path:
                 # 進行後製處理
-                if post_process_audio(temp_path, output_path):
+                with span("tts.post_process", cat="tts", provider=name):
+                    processed = post_process_audio(temp_path, output_path)
+                if processed:
                     logger.success(f"✓ 使用 {name} 成功生成並處理音頻")
                     return
                 else: